@@ -1,10 +1,10 @@
-from lib.labeller import load_data, save_labels
-from lib.strategies.BuyAndHoldStrategy import BuyAndHoldStrategy
-from lib.strategies.SellAndHoldStrategy import SellAndHoldStrategy
-from lib.strategies.MeanReversionStrategy import MeanReversionStrategy
-
-import numpy as np
-from datetime import datetime
+# pandas, SQLAlchemy and the models are imported by the commands that use them, so
+# `--help`, `merge` and the scripts importing the helpers below start fast
+import argparse
+import os
+import time
+from datetime import date, datetime
+from typing import List, Optional, Tuple
 
 ticker_list = [
     "AAPL",
@@ -36,36 +36,170 @@ ticker_list = [
     "WMT",
     "XOM",
 ]
-label_set = {}
 window_size = 20
 
-for ticker in ticker_list:
-    ticker_df = load_data(ticker)
-    print(f"[DEBUG] Processing {ticker}...")
-    for offset in range(len(ticker_df)):
-        window_df = ticker_df.iloc[offset : offset + window_size]
-        if len(window_df) < window_size:
-            continue
-
-        start_date = window_df.index[0]
-        end_date = window_df.index[-1]
-
-        BaH_return_percentage = BuyAndHoldStrategy().execute(window_df)
-        SaH_return_percentage = SellAndHoldStrategy().execute(window_df)
-        MR_return_percentage = MeanReversionStrategy().execute(window_df)
-
-        label = np.argmax(
-            [BaH_return_percentage, MR_return_percentage, SaH_return_percentage]
-        )
-        pkey = f"{ticker}_{start_date.strftime('%Y-%m-%d')}"
-        timestamp = datetime.now().isoformat()
-        label_set[pkey] = {
-            "ticker": ticker,
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "end_date": end_date.strftime("%Y-%m-%d"),
-            "pattern": ["uptrend", "sideways", "downtrend"][label],
-            "timestamp": timestamp,
-        }
-    print(f"[DEBUG] Finished processing {ticker}")
-
-save_labels(label_set, filename="auto_labels.csv")
+def read_tickers_file(filename: str) -> List[str]:
+    """One ticker per line; blank lines and lines starting with # are ignored"""
+    with open(filename) as f:
+        tickers = [line.strip().upper() for line in f if line.strip() and not line.startswith('#')]
+    return list(dict.fromkeys(tickers))
+
+def parse_date_range(spec: Optional[str]) -> Tuple[Optional[date], Optional[date]]:
+    """Parse 'START:END' (either side may be empty) into dates"""
+    if not spec:
+        return None, None
+    start, _, end = spec.partition(':')
+    return (
+        date.fromisoformat(start) if start else None,
+        date.fromisoformat(end) if end else None,
+    )
+
+def label_shard(args):
+    from lib.db.session import create_engine_session, create_env_db_engine
+    from lib.db.window_returns import WINDOW_RETURN_COLUMNS, combine_window_returns, get_window_returns
+    from lib.labeller import LABEL_COLUMNS, count_ticker_rows, get_strategy_inputs, indicator_source, load_data
+    from lib.sharding import assign_shards, parse_shard, partition_filename, universe_hash, write_manifest
+    from lib.strategies.StrategyCache import StrategyCache
+    from lib.strategies.vectorized import label_windows
+    import pandas as pd
+
+    tickers = read_tickers_file(args.tickers_file) if args.tickers_file else ticker_list
+    shard, shards = parse_shard(args.shard)
+    start_date, end_date = parse_date_range(args.date_range)
+    db_context = create_engine_session(create_env_db_engine())
+
+    with db_context() as session:
+        row_counts = count_ticker_rows(session, tickers, start_date, end_date)
+    no_data = sorted(set(tickers) - set(row_counts))
+    if no_data:
+        print(f"[WARN] No market data for {len(no_data)} tickers: {', '.join(no_data[:10])}")
+    assigned = assign_shards(row_counts, shards)[shard]
+    print(f"[INFO] Shard {shard}/{shards}: {len(assigned)} of {len(row_counts)} tickers, "
+          f"{sum(row_counts[t] for t in assigned)} rows")
+
+    cache = StrategyCache(args.cache_dir) if args.cache_dir else None
+    indicators = args.indicators or indicator_source()
+    window_returns = {}
+    if args.sql_returns:
+        # Buy-and-Hold and Sell-and-Hold come back from the database as one row per window
+        with db_context() as session:
+            returns_df = get_window_returns(session, args.window_size, assigned, start_date, end_date)
+        window_returns = dict(tuple(returns_df.groupby('ticker')))
+    output = partition_filename(args.output, shard, shards) if shards > 1 else args.output
+    timestamp = datetime.now().isoformat()
+    windows = {}
+    started = time.perf_counter()
+    # Write to a temporary file so an interrupted shard never looks finished
+    with open(f"{output}.tmp", 'w', newline='') as f:
+        pd.DataFrame(columns=LABEL_COLUMNS).to_csv(f, index=False)
+        for ticker in assigned:
+            if args.sql_returns and indicators == 'stored':
+                # Only the columns Mean Reversion reads are transferred
+                with db_context() as session:
+                    ticker_df = get_strategy_inputs(session, ticker, start_date, end_date)
+                ticker_df = ticker_df if not ticker_df.empty else None
+            else:
+                ticker_df = load_data(ticker, db_context, start_date, end_date, indicators=indicators)
+            if ticker_df is None:
+                labels = pd.DataFrame(columns=LABEL_COLUMNS)
+            elif args.sql_returns:
+                returns = combine_window_returns(
+                    ticker_df, window_returns.get(ticker, pd.DataFrame(columns=WINDOW_RETURN_COLUMNS)), args.window_size
+                )
+                labels = label_windows(ticker_df, ticker, args.window_size, timestamp, returns=returns)
+            elif cache is not None:
+                returns, computed = cache.strategy_returns(ticker_df, ticker, args.window_size)
+                labels = label_windows(ticker_df, ticker, args.window_size, timestamp, returns=returns)
+                print(f"[DEBUG] Computed {computed} windows of {ticker}, the rest came from the cache")
+            else:
+                labels = label_windows(ticker_df, ticker, args.window_size, timestamp)
+            labels.to_csv(f, index=False, header=False)
+            windows[ticker] = len(labels)
+            print(f"[DEBUG] Labelled {len(labels)} windows of {ticker}")
+    os.replace(f"{output}.tmp", output)
+
+    write_manifest(output, {
+        'universe': universe_hash(list(row_counts)),
+        'tickers_total': len(row_counts),
+        'no_data': no_data,
+        'shard': shard,
+        'shards': shards,
+        'date_range': [str(start_date) if start_date else None, str(end_date) if end_date else None],
+        'window_size': args.window_size,
+        'windows': windows,
+        'elapsed_seconds': round(time.perf_counter() - started, 1),
+    })
+    print(f"[INFO] Wrote {sum(windows.values())} windows to {output}")
+
+def sql_returns(args):
+    from lib.db.session import create_engine_session, create_env_db_engine
+    from lib.db.window_returns import store_window_returns
+
+    tickers = read_tickers_file(args.tickers_file) if args.tickers_file else ticker_list
+    start_date, end_date = parse_date_range(args.date_range)
+    db_context = create_engine_session(create_env_db_engine())
+    started = time.perf_counter()
+    with db_context() as session:
+        count = store_window_returns(session, args.window_size, tickers, start_date, end_date)
+    print(f"[INFO] Stored {count} window returns in fyp.window_returns in {time.perf_counter() - started:.1f}s")
+
+def merge(args):
+    from lib.sharding import merge_partitions
+
+    labels, problems = merge_partitions(args.output, args.shards)
+    for problem in problems:
+        print(f"[ERROR] {problem}")
+    if problems and not args.allow_incomplete:
+        print("[ERROR] Coverage is incomplete, not writing merged labels (use --allow-incomplete to force)")
+        exit(1)
+    labels.to_csv(args.output, index=False)
+    print(f"[INFO] Merged {len(labels)} windows of {labels['ticker'].nunique()} tickers into {args.output}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Auto-label windows with the trading strategies')
+    subparsers = parser.add_subparsers(dest='command')
+
+    label_parser = subparsers.add_parser('label', help='Label one shard of the ticker universe (default)')
+    label_parser.add_argument('--tickers-file', type=str, help='File with one ticker per line (default: the Dow tickers)')
+    label_parser.add_argument('--date-range', type=str, help='START:END dates (YYYY-MM-DD), either side may be empty')
+    label_parser.add_argument('--shard', type=str, default='0/1', help='i/n: label the i-th of n balanced ticker slices')
+    label_parser.add_argument('--window-size', type=int, default=window_size, help='Trading days per window')
+    label_parser.add_argument('--indicators', type=str, choices=['stored', 'computed'],
+                              help='Join the stored equity_indicators or compute them from market_data closes (default: INDICATORS env, else stored)')
+    label_parser.add_argument('--sql-returns', action='store_true',
+                              help='Compute Buy-and-Hold and Sell-and-Hold in the database; only Mean Reversion runs here')
+    label_parser.add_argument('--cache-dir', type=str, help='Directory of cached per-window strategy returns; only missing or stale windows are recomputed (not with --sql-returns)')
+    label_parser.add_argument('--output', type=str, default='auto_labels.csv',
+                              help='Output CSV; shards of a multi-shard run write <name>.part-<i>-of-<n>.csv')
+
+    returns_parser = subparsers.add_parser('sql-returns', help='Materialize Buy-and-Hold/Sell-and-Hold returns into fyp.window_returns')
+    returns_parser.add_argument('--tickers-file', type=str, help='File with one ticker per line (default: the Dow tickers)')
+    returns_parser.add_argument('--date-range', type=str, help='START:END dates (YYYY-MM-DD), either side may be empty')
+    returns_parser.add_argument('--window-size', type=int, default=window_size, help='Trading days per window')
+
+    merge_parser = subparsers.add_parser('merge', help='Combine shard partitions and check coverage')
+    merge_parser.add_argument('--shards', type=int, required=True, help='Number of shards of the run')
+    merge_parser.add_argument('--output', type=str, default='auto_labels.csv', help='Output CSV of the run')
+    merge_parser.add_argument('--allow-incomplete', action='store_true', help='Write the merged labels even if coverage is incomplete')
+
+    # `python auto_labeller.py` with no arguments keeps labelling the Dow tickers into auto_labels.csv
+    args = parser.parse_args()
+    if args.command is None:
+        args = parser.parse_args(['label'])
+    if args.command == 'label' and args.sql_returns and args.cache_dir:
+        # The cache holds all three strategies' returns; --sql-returns computes two of them in the database
+        parser.error("--cache-dir cannot be combined with --sql-returns")
+
+    try:
+        if args.command == 'merge':
+            merge(args)
+        elif args.command == 'sql-returns':
+            sql_returns(args)
+        else:
+            label_shard(args)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
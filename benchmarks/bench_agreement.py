@@ -0,0 +1,42 @@
+"""
+Benchmark manual-vs-auto label agreement on synthetic label sets.
+
+    python -m benchmarks.bench_agreement --rows 3000000
+"""
+from lib.agreement import PATTERNS, agreement_report
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+def synthetic_labels(n_rows: int, n_tickers: int, seed: int) -> pd.DataFrame:
+    """Frame in the read_label_file format covering n_rows windows"""
+    rng = np.random.default_rng(seed)
+    per_ticker = n_rows // n_tickers
+    dates = pd.bdate_range('1990-01-01', periods=per_ticker).to_numpy()
+    return pd.DataFrame({
+        'ticker': pd.Categorical(np.repeat([f"T{i:04d}" for i in range(n_tickers)], per_ticker)),
+        'start_date': np.tile(dates, n_tickers),
+        'label': rng.integers(0, len(PATTERNS), per_ticker * n_tickers).astype(np.int8),
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark label agreement analytics')
+    parser.add_argument('--rows', type=int, default=3_000_000, help='Windows per label set')
+    parser.add_argument('--tickers', type=int, default=500, help='Number of tickers')
+    args = parser.parse_args()
+
+    manual = synthetic_labels(args.rows, args.tickers, seed=0)
+    # Shuffled and with a tenth of the windows missing, like a partial auto run
+    auto = synthetic_labels(args.rows, args.tickers, seed=1).sample(frac=0.9, random_state=0)
+
+    start = time.perf_counter()
+    report = agreement_report(manual, auto, period='year')
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(manual)} manual x {len(auto)} auto windows -> {len(report['joined'])} joined")
+    print(f"agreement_report: {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark session start-up label loading.
+
+Compares the original row-by-row `iterrows` loader with `lib.labeller.load_labels`
+reading the CSV columnwise and reading its Feather snapshot.
+
+    python -m benchmarks.bench_load_labels --file manual_labels.csv
+"""
+from lib.labeller import load_labels
+
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+
+def load_labels_iterrows(filename: str) -> dict:
+    """The original loader, kept as the baseline"""
+    df = pd.read_csv(filename)
+    labels = {}
+    for _, row in df.iterrows():
+        labels[row['key']] = {
+            'ticker': row['ticker'],
+            'start_date': row['start_date'],
+            'end_date': row['end_date'],
+            'pattern': row['pattern'],
+            'timestamp': row['timestamp']
+        }
+    return labels
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark label loading')
+    parser.add_argument('--file', type=str, default='manual_labels.csv', help='Path to label CSV file')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per loader; the best is reported')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'labels.feather')
+        baseline = load_labels_iterrows(args.file)
+        assert load_labels(args.file) == baseline, "Columnar loader disagrees with the baseline"
+        assert load_labels(args.file, snapshot=snapshot) == baseline
+        assert load_labels(args.file, snapshot=snapshot) == baseline, "Snapshot loader disagrees with the baseline"
+
+        results = {
+            'iterrows': best_of(lambda: load_labels_iterrows(args.file), args.repeat),
+            'columnar csv': best_of(lambda: load_labels(args.file), args.repeat),
+            'feather snapshot': best_of(lambda: load_labels(args.file, snapshot=snapshot), args.repeat),
+        }
+
+    print(f"{len(baseline)} labels from {args.file}")
+    for name, seconds in results.items():
+        print(f"{name:>18}: {seconds * 1000:8.1f} ms ({results['iterrows'] / seconds:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+from auto_labeller import read_tickers_file, ticker_list
+from lib.db.bootstrap import BOOTSTRAP_TABLES, check_index_scans, create_indexes, partition_by_ticker
+from lib.db.session import create_env_db_engine
+
+def main():
+    parser = argparse.ArgumentParser(description='Create the indexes (and optional partitions) of the fyp tables and check the query plans')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('indexes', help='Create the per-ticker indexes that do not exist yet')
+
+    partition_parser = subparsers.add_parser('partition', help='Rebuild a table as LIST-partitioned by ticker (Postgres)')
+    partition_parser.add_argument('--table', type=str, required=True, choices=[table.name for table in BOOTSTRAP_TABLES])
+    partition_parser.add_argument('--tickers-file', type=str, help='One partition per ticker in this file (default: the Dow tickers)')
+
+    explain_parser = subparsers.add_parser('explain', help='Check that the per-ticker queries use index scans')
+    explain_parser.add_argument('--ticker', type=str, default='AAPL', help='Ticker to plan the queries for')
+    explain_parser.add_argument('--verbose', action='store_true', help='Print every plan')
+
+    args = parser.parse_args()
+
+    try:
+        engine = create_env_db_engine()
+        if args.command == 'indexes':
+            created = create_indexes(engine)
+            print(f"Created {len(created)} indexes" + (f": {', '.join(created)}" if created else ""))
+        elif args.command == 'partition':
+            tickers = read_tickers_file(args.tickers_file) if args.tickers_file else ticker_list
+            table = next(table for table in BOOTSTRAP_TABLES if table.name == args.table)
+            backup = partition_by_ticker(engine, table, tickers)
+            print(f"Partitioned {args.table} into {len(tickers)} ticker partitions plus a default one; "
+                  f"the original rows are kept in {backup}")
+        else:
+            failed = False
+            for name, (uses_index, plan) in check_index_scans(engine, args.ticker).items():
+                failed |= not uses_index
+                print(f"{name}: {'index scan' if uses_index else 'FULL SCAN'}")
+                if args.verbose or not uses_index:
+                    print('\n'.join(f"    {line}" for line in plan))
+            exit(1 if failed else 0)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import pandas as pd
+from lib.db.session import create_engine_session, create_env_db_engine
+from lib.indicators import INDICATOR_COLUMNS, compare_indicators
+from lib.labeller import load_data
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare computed indicators with the stored equity_indicators columns')
+    parser.add_argument('--tickers', type=str, default='AAPL', help='Comma-separated tickers to check')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='Largest accepted absolute difference')
+    parser.add_argument('--skip', type=int, default=250, help='Leading days to ignore while the indicators warm up')
+    
+    args = parser.parse_args()
+    
+    try:
+        db_context = create_engine_session(create_env_db_engine())
+        failed = False
+        for ticker in [t.strip().upper() for t in args.tickers.split(',') if t.strip()]:
+            stored = load_data(ticker, db_context, indicators='stored')
+            computed = load_data(ticker, db_context, indicators='computed')
+            if stored is None or computed is None:
+                print(f"{ticker}: no data")
+                continue
+            report = compare_indicators(stored.iloc[args.skip:], computed, INDICATOR_COLUMNS)
+            # Days missing from equity_indicators are dropped by the stored join
+            missing = len(computed) - len(stored)
+            bad = report[report['max_abs_diff'] > args.tolerance]
+            failed |= not bad.empty
+            print(f"{ticker}: {len(computed)} market days, {missing} without stored indicators, "
+                  f"{len(bad)} of {len(report)} columns outside tolerance")
+            if not bad.empty:
+                with pd.option_context('display.float_format', '{:.4f}'.format):
+                    print(bad, '\n')
+        exit(1 if failed else 0)
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
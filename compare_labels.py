@@ -0,0 +1,47 @@
+import argparse
+import time
+import pandas as pd
+from lib.agreement import agreement_report, read_label_file
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare manual labels with auto labels')
+    parser.add_argument('--manual', type=str, default='manual_labels.csv', help='Path to manual label CSV file')
+    parser.add_argument('--auto', type=str, default='auto_labels.csv', help='Path to auto label CSV file')
+    parser.add_argument('--period', type=str, default='year', choices=['year', 'quarter', 'month'], help='Period for time-based agreement')
+    parser.add_argument('--min-windows', type=int, default=20, help='Minimum windows for a (ticker, period) hot spot')
+    parser.add_argument('--top', type=int, default=10, help='Number of hot spots to show')
+    
+    args = parser.parse_args()
+    
+    try:
+        start = time.perf_counter()
+        manual = read_label_file(args.manual)
+        auto = read_label_file(args.auto)
+        loaded = time.perf_counter()
+        report = agreement_report(manual, auto, args.period, args.min_windows, args.top)
+        finished = time.perf_counter()
+        
+        joined = report['joined']
+        known = (joined['manual'] >= 0) & (joined['auto'] >= 0)
+        agreement = (joined['manual'] == joined['auto'])[known].mean() if known.any() else 0.0
+        print(f"{len(manual)} manual and {len(auto)} auto labels, {len(joined)} windows in common, "
+              f"{(~known).sum()} with an unknown pattern")
+        print(f"Overall agreement: {agreement:.1%}")
+        print(f"Loaded in {loaded - start:.2f}s, compared in {finished - loaded:.2f}s\n")
+        
+        with pd.option_context('display.max_rows', None, 'display.float_format', '{:.3f}'.format):
+            print("Confusion matrix (rows: manual, columns: auto):")
+            print(report['confusion'], "\n")
+            print("Agreement by ticker:")
+            print(report['by_ticker'], "\n")
+            print(f"Agreement by {args.period}:")
+            print(report['by_period'], "\n")
+            print("Disagreement hot spots:")
+            print(report['hot_spots'])
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
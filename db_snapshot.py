@@ -0,0 +1,37 @@
+import argparse
+from auto_labeller import read_tickers_file
+from lib.db.session import EMBEDDED_BACKENDS, create_embedded_engine, create_env_db_engine
+from lib.db.snapshot import SNAPSHOT_FORMATS, SNAPSHOT_TABLES, dump_snapshot, load_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy the fyp tables between a database and snapshot files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    dump_parser = subparsers.add_parser('dump', help='Write the tables of the DB_* database to snapshot files')
+    dump_parser.add_argument('--dir', type=str, default='snapshot', help='Snapshot directory')
+    dump_parser.add_argument('--format', type=str, choices=SNAPSHOT_FORMATS, default='parquet', help='Snapshot file format')
+    dump_parser.add_argument('--tickers-file', type=str, help='Only dump these tickers (one per line)')
+    dump_parser.add_argument('--tables', type=str, help=f"Comma-separated tables (default: {','.join(SNAPSHOT_TABLES)})")
+
+    load_parser = subparsers.add_parser('load', help='Fill an embedded database from snapshot files')
+    load_parser.add_argument('--dir', type=str, default='snapshot', help='Snapshot directory')
+    load_parser.add_argument('--db', type=str, default='fyp.sqlite', help='Embedded database file')
+    load_parser.add_argument('--backend', type=str, choices=EMBEDDED_BACKENDS, default='sqlite', help='Embedded database')
+    load_parser.add_argument('--tables', type=str, help='Comma-separated tables (default: every snapshot file found)')
+
+    args = parser.parse_args()
+    tables = [table.strip() for table in args.tables.split(',')] if args.tables else None
+
+    try:
+        if args.command == 'dump':
+            tickers = read_tickers_file(args.tickers_file) if args.tickers_file else None
+            dump_snapshot(create_env_db_engine(), args.dir, tables, tickers, args.format)
+        else:
+            load_snapshot(create_embedded_engine(args.db, args.backend), args.dir, tables)
+            print(f"Use it with DB_BACKEND={args.backend} DB_PATH={args.db}")
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
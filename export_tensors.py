@@ -0,0 +1,60 @@
+import argparse
+import time
+import pandas as pd
+from sqlalchemy import select
+from lib.db.session import create_engine_session, create_env_db_engine
+from lib.labeller import load_data
+from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+from lib.tensors import FEATURE_COLUMNS, NORMALIZATIONS, export_tensors
+from upload import load_and_process_csv
+
+def load_dataset_labels(db_context) -> pd.DataFrame:
+    """Read the supervised_classifier_dataset table as ticker, start_date, end_date, label columns"""
+    query = select(
+        SupervisedClassifierDataset.ticker,
+        SupervisedClassifierDataset.start_date,
+        SupervisedClassifierDataset.end_date,
+        SupervisedClassifierDataset.label,
+    )
+    with db_context() as session:
+        rows = session.execute(query).all()
+    df = pd.DataFrame(rows, columns=['ticker', 'start_date', 'end_date', 'label'])
+    df['start_date'] = pd.to_datetime(df['start_date'])
+    df['end_date'] = pd.to_datetime(df['end_date'])
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description='Export labelled windows as feature tensors for training')
+    parser.add_argument('--file', type=str, help='Label CSV to export (default: the supervised_classifier_dataset table)')
+    parser.add_argument('--out', type=str, default='dataset', help='Output path prefix')
+    parser.add_argument('--format', type=str, default='npy', choices=['npy', 'arrow'], help='npy: <out>_X.npy, <out>_y.npy and <out>_windows.csv; arrow: <out>.arrow')
+    parser.add_argument('--window-size', type=int, default=20, help='Trading days per window')
+    parser.add_argument('--normalize', type=str, default='none', choices=NORMALIZATIONS, help='Per-window normalization')
+    parser.add_argument('--features', type=str, default=','.join(FEATURE_COLUMNS), help='Comma-separated feature columns')
+    parser.add_argument('--tickers', type=str, help='Comma-separated tickers to export (default: all labelled tickers)')
+    
+    args = parser.parse_args()
+    
+    try:
+        db_context = create_engine_session(create_env_db_engine())
+        
+        start = time.perf_counter()
+        labels = load_and_process_csv(args.file) if args.file else load_dataset_labels(db_context)
+        count = export_tensors(
+            labels,
+            lambda ticker: load_data(ticker, db_context),
+            args.out,
+            window_size=args.window_size,
+            features=args.features.split(','),
+            normalize=args.normalize,
+            fmt=args.format,
+            tickers=args.tickers.split(',') if args.tickers else None
+        )
+        print(f"Exported {count} of {len(labels)} labelled windows to {args.out} in {time.perf_counter() - start:.1f}s")
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
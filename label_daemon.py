@@ -0,0 +1,91 @@
+import argparse
+import time
+from datetime import date, datetime
+from auto_labeller import read_tickers_file, ticker_list, window_size
+from lib.db.session import create_engine_session, create_env_db_engine
+from lib.labeller import get_bars
+from lib.online import DirectoryWatcher, OnlineLabeller, append_labels, read_bar_file
+
+def seed(labeller: OnlineLabeller, db_context, tickers):
+    """Load each ticker's last window_size - 1 bars, so the next bar completes a window"""
+    with db_context() as session:
+        bars = get_bars(session, tickers, last_rows=labeller.window_size - 1)
+    labeller.update_bars(bars)
+    print(f"[INFO] Seeded {bars['ticker'].nunique()} tickers with their last {labeller.window_size - 1} bars")
+
+def emit(labeller: OnlineLabeller, bars, output: str) -> int:
+    labels = labeller.update_bars(bars, datetime.now().isoformat())
+    if len(labels):
+        append_labels(labels, output)
+        for ticker, end_date, pattern in zip(labels['ticker'], labels['end_date'], labels['pattern']):
+            print(f"[DEBUG] {ticker} window ending {end_date}: {pattern}")
+    return len(labels)
+
+def watch(args, labeller: OnlineLabeller):
+    watcher = DirectoryWatcher(args.watch)
+    while True:
+        for filename in watcher.pending():
+            try:
+                count = emit(labeller, read_bar_file(filename), args.output)
+                watcher.done(filename)
+                print(f"[INFO] {filename}: {count} new labels")
+            except ValueError as e:
+                print(f"[ERROR] {e}")
+                watcher.done(filename, failed=True)
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+def poll(args, labeller: OnlineLabeller, db_context, tickers):
+    while True:
+        # Each ticker is queried after its own latest bar. Tickers without bars yet (not
+        # loaded, delisted or misspelled) only fetch their latest window, like the seed
+        last_dates = {ticker: labeller.last_date(ticker) for ticker in tickers}
+        after_dates = {ticker: date.fromisoformat(last) for ticker, last in last_dates.items() if last is not None}
+        unseeded = [ticker for ticker, last in last_dates.items() if last is None]
+        with db_context() as session:
+            batches = [get_bars(session, list(after_dates), after_dates=after_dates)]
+            if unseeded:
+                batches.append(get_bars(session, unseeded, last_rows=labeller.window_size - 1))
+        count = sum(emit(labeller, bars, args.output) for bars in batches)
+        if count:
+            print(f"[INFO] {count} new labels")
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+def main():
+    parser = argparse.ArgumentParser(description='Label each newly completed window as daily bars arrive')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--watch', type=str, help='Directory to watch for bar CSV files (ticker, date, close, rsi_1..rsi_20)')
+    source.add_argument('--poll', action='store_true', help='Poll market_data and equity_indicators for new bars')
+    parser.add_argument('--tickers-file', type=str, help='File with one ticker per line (default: the Dow tickers)')
+    parser.add_argument('--window-size', type=int, default=window_size, help='Trading days per window')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between checks for new bars')
+    parser.add_argument('--output', type=str, default='live_labels.csv', help='CSV the new labels are appended to')
+    parser.add_argument('--no-seed', action='store_true', help='Start with empty buffers instead of the latest bars in the database (with --poll, each ticker is seeded on the first poll instead)')
+    parser.add_argument('--once', action='store_true', help='Handle the bars available now and exit')
+
+    args = parser.parse_args()
+
+    try:
+        tickers = read_tickers_file(args.tickers_file) if args.tickers_file else ticker_list
+        labeller = OnlineLabeller(args.window_size)
+        db_context = None
+        if args.poll or not args.no_seed:
+            db_context = create_engine_session(create_env_db_engine())
+        if not args.no_seed:
+            seed(labeller, db_context, tickers)
+        if args.watch:
+            watch(args, labeller)
+        else:
+            poll(args, labeller, db_context, tickers)
+
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+from lib.stores.registry import open_label_store
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export labels between a label store and CSV')
+    parser.add_argument('command', choices=['import', 'export'], help='import a CSV into the store, or export the store to a CSV')
+    parser.add_argument('--store', type=str, default='labels.db', help='Path to the label store (.db for SQLite, .csv for CSV)')
+    parser.add_argument('--file', type=str, required=True, help='Path to CSV file')
+    
+    args = parser.parse_args()
+    
+    try:
+        store = open_label_store(args.store)
+        if args.command == 'import':
+            count = store.import_csv(args.file)
+            print(f"Imported {count} labels from {args.file} into {args.store}")
+        else:
+            count = store.export_csv(args.file)
+            print(f"Exported {count} labels from {args.store} to {args.file}")
+        store.close()
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
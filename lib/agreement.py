@@ -0,0 +1,176 @@
+from lib.index.WindowIndex import pack_keys, to_days, unpack_keys
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import pandas as pd
+
+PATTERNS = ['downtrend', 'sideways', 'uptrend']  # label order used by upload.pattern_to_label
+PERIODS = ['year', 'quarter', 'month']
+
+def read_label_file(filename: str) -> pd.DataFrame:
+    """
+    Read a label CSV written by save_labels into typed columns.
+
+    Returns:
+        Frame with categorical ticker, datetime64 start_date and an int8
+        `label` code (index into PATTERNS, -1 for unknown patterns)
+    """
+    df = pd.read_csv(
+        filename,
+        usecols=['ticker', 'start_date', 'pattern'],
+        dtype={'ticker': 'category', 'start_date': str, 'pattern': 'category'}
+    )
+    return pd.DataFrame({
+        'ticker': df['ticker'],
+        'start_date': pd.to_datetime(df['start_date'], format='%Y-%m-%d'),
+        'label': pd.Categorical(df['pattern'], categories=PATTERNS).codes.astype(np.int8),
+    })
+
+def _ticker_codes(df: pd.DataFrame, tickers: pd.Index) -> np.ndarray:
+    """Position of every row's ticker in `tickers`, recoded through the categories"""
+    return pd.Categorical(df['ticker'], categories=tickers).codes.astype(np.int64)
+
+def _window_keys(df: pd.DataFrame, tickers: pd.Index) -> np.ndarray:
+    """Packed window key per row, with ticker ids taken from positions in `tickers`"""
+    return pack_keys(_ticker_codes(df, tickers), to_days(df['start_date'].to_numpy()))
+
+def join_labels(manual: pd.DataFrame, auto: pd.DataFrame) -> pd.DataFrame:
+    """
+    Inner join two label frames from read_label_file on (ticker, start_date).
+
+    Windows are matched on packed int64 keys with a sorted intersection
+    instead of a string merge.
+
+    Returns:
+        Frame with categorical ticker, start_date and the `manual` and `auto`
+        label codes
+    """
+    tickers = pd.Index(np.union1d(
+        pd.unique(manual['ticker']).astype(str), pd.unique(auto['ticker']).astype(str)
+    ))
+    manual_keys = _window_keys(manual, tickers)
+    _, manual_rows, auto_rows = np.intersect1d(
+        manual_keys, _window_keys(auto, tickers),
+        return_indices=True
+    )
+    return pd.DataFrame({
+        'ticker': pd.Categorical.from_codes(unpack_keys(manual_keys[manual_rows])[0], categories=tickers),
+        'start_date': manual['start_date'].to_numpy()[manual_rows],
+        'manual': manual['label'].to_numpy()[manual_rows],
+        'auto': auto['label'].to_numpy()[auto_rows],
+    })
+
+def confusion_matrix(joined: pd.DataFrame) -> pd.DataFrame:
+    """Window counts with manual labels as rows and auto labels as columns"""
+    known = (joined['manual'].to_numpy() >= 0) & (joined['auto'].to_numpy() >= 0)
+    n = len(PATTERNS)
+    counts = np.bincount(
+        joined['manual'].to_numpy()[known].astype(np.int64) * n + joined['auto'].to_numpy()[known],
+        minlength=n * n
+    ).reshape(n, n)
+    return pd.DataFrame(
+        counts,
+        index=pd.Index(PATTERNS, name='manual'),
+        columns=pd.Index(PATTERNS, name='auto')
+    )
+
+def _period_codes(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Dense codes for integer period numbers and the period number of every code"""
+    if len(values) == 0:
+        return values, values
+    first = values.min()
+    return values - first, np.arange(first, values.max() + 1)
+
+def _group_codes(joined: pd.DataFrame, by: str) -> Tuple[np.ndarray, pd.Index]:
+    """Integer group code per row and the labels of the codes"""
+    if by == 'ticker':
+        tickers = joined['ticker'].astype('category')
+        return tickers.cat.codes.to_numpy().astype(np.int64), pd.Index(tickers.cat.categories)
+    months = joined['start_date'].to_numpy().astype('datetime64[M]').astype(np.int64)
+    if by == 'year':
+        codes, years = _period_codes(months // 12)
+        return codes, pd.Index((years + 1970).astype(str))
+    if by == 'quarter':
+        codes, quarters = _period_codes(months // 3)
+        return codes, pd.Index([f"{q // 4 + 1970}Q{q % 4 + 1}" for q in quarters])
+    if by == 'month':
+        codes, months = _period_codes(months)
+        return codes, pd.Index(months.astype('datetime64[M]').astype(str))
+    raise ValueError(f"Unknown grouping {by!r}, expected 'ticker', 'year', 'quarter' or 'month'")
+
+def agreement_by(joined: pd.DataFrame, by: Union[str, List[str]] = 'ticker') -> pd.DataFrame:
+    """
+    Agreement rate per group.
+
+    Rows are counted on dense integer group codes with bincount, so only the
+    labels of the groups are formatted, never the rows.
+
+    Args:
+        joined: Output of join_labels
+        by: 'ticker', 'year', 'quarter', 'month' or a list of them
+
+    Returns:
+        Frame indexed by group with windows, agreed, disagreed, unknown and
+        agreement columns, sorted by group. Windows with an unknown pattern on
+        either side are only counted in `unknown`. Groups with no joined rows
+        are left out.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    codes = np.zeros(len(joined), dtype=np.int64)
+    levels = []
+    for key in by:
+        key_codes, labels = _group_codes(joined, key)
+        codes = codes * len(labels) + key_codes
+        levels.append(labels)
+    n_groups = int(np.prod([len(labels) for labels in levels]))
+
+    manual, auto = joined['manual'].to_numpy(), joined['auto'].to_numpy()
+    # Windows with an unknown pattern on either side are counted apart, as in confusion_matrix
+    known = (manual >= 0) & (auto >= 0)
+    agreed = known & (manual == auto)
+    rows = np.bincount(codes, minlength=n_groups)
+    windows = np.bincount(codes, weights=known, minlength=n_groups).astype(np.int64)
+    agreed_counts = np.bincount(codes, weights=agreed, minlength=n_groups).astype(np.int64)
+    groups = np.flatnonzero(rows)
+
+    # Decode the combined codes back to one label position per level
+    level_codes = []
+    remaining = groups
+    for labels in reversed(levels):
+        remaining, level = np.divmod(remaining, len(labels))
+        level_codes.insert(0, level)
+    index = pd.MultiIndex(levels=levels, codes=level_codes, names=by) if len(by) > 1 \
+        else levels[0][level_codes[0]].rename(by[0])
+
+    windows = windows[groups]
+    agreed_counts = agreed_counts[groups]
+    return pd.DataFrame({
+        'windows': windows,
+        'agreed': agreed_counts,
+        'disagreed': windows - agreed_counts,
+        'unknown': rows[groups] - windows,
+        'agreement': agreed_counts / np.maximum(windows, 1),
+    }, index=index)
+
+def disagreement_hot_spots(joined: pd.DataFrame, period: str = 'year', min_windows: int = 20, top: int = 10) -> pd.DataFrame:
+    """(ticker, period) groups with at least min_windows windows and the lowest agreement"""
+    per_group = agreement_by(joined, ['ticker', period])
+    per_group = per_group[per_group['windows'] >= min_windows]
+    return per_group.sort_values(['agreement', 'windows'], ascending=[True, False]).head(top)
+
+def agreement_report(manual: pd.DataFrame, auto: pd.DataFrame, period: str = 'year',
+                     min_windows: int = 20, top: int = 10) -> Dict[str, pd.DataFrame]:
+    """
+    Compare manual and auto labels in one pass.
+
+    Returns:
+        Dictionary with the joined frame, the confusion matrix, agreement by
+        ticker and by period, and the disagreement hot spots
+    """
+    joined = join_labels(manual, auto)
+    return {
+        'joined': joined,
+        'confusion': confusion_matrix(joined),
+        'by_ticker': agreement_by(joined, 'ticker'),
+        'by_period': agreement_by(joined, period),
+        'hot_spots': disagreement_hot_spots(joined, period, min_windows, top),
+    }
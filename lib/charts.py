@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.basedatatypes import BaseTraceType
+from typing import Callable, Dict, List, Sequence
+
+LABEL_COLORS = np.array(['red', 'gray', 'green'])  # downtrend, sideways, uptrend
+UNKNOWN_LABEL_COLOR = 'black'  # -1, from patterns upload.pattern_to_label does not know
+
+def volume_colors(df: pd.DataFrame) -> np.ndarray:
+    """Bar colour per row: red when the day closed below its open, green otherwise"""
+    return np.where(df['close'].to_numpy() < df['open'].to_numpy(), 'red', 'green')
+
+def label_colors(labels: pd.Series) -> np.ndarray:
+    """Marker colour per numeric label (0 = downtrend, 1 = sideways, 2 = uptrend, anything else unknown)"""
+    codes = labels.to_numpy(dtype=int)
+    known = (codes >= 0) & (codes < len(LABEL_COLORS))
+    return np.where(known, LABEL_COLORS[np.where(known, codes, 0)], UNKNOWN_LABEL_COLOR)
+
+def subplot_axes(row: int) -> Dict[str, str]:
+    """Axis references of a row in a single-column subplot grid, e.g. {'xaxis': 'x2', 'yaxis': 'y2'}"""
+    suffix = '' if row == 1 else str(row)
+    return {'xaxis': f'x{suffix}', 'yaxis': f'y{suffix}'}
+
+def build_subplot_layout(row_heights: Sequence[float], style: Callable[[go.Figure], None]) -> dict:
+    """
+    Build a reusable layout for a single-column subplot figure.
+
+    `make_subplots` and the per-axis `update_*` calls dominate figure
+    construction time for small windows, so they are run once here and the
+    resulting layout is reused for every window.
+
+    Args:
+        row_heights: Relative height of each row
+        style: Callback applying the static layout and axis styling
+
+    Returns:
+        Plotly layout as a plain dictionary
+    """
+    from plotly.subplots import make_subplots  # only needed when a layout is built
+
+    fig = make_subplots(
+        rows=len(row_heights), cols=1,
+        row_heights=list(row_heights),
+        vertical_spacing=0.05,
+        shared_xaxes=True
+    )
+    style(fig)
+    return fig.layout.to_plotly_json()
+
+def figure_from_layout(layout: dict, traces: List[BaseTraceType], **layout_updates) -> go.Figure:
+    """Create a figure from a prebuilt layout, with traces already bound to their subplot axes"""
+    return go.Figure(data=traces, layout={**layout, **layout_updates})
@@ -0,0 +1 @@
+LABEL_COLUMNS = ['key', 'ticker', 'start_date', 'end_date', 'pattern', 'timestamp']  # columns of a label CSV
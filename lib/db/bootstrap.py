@@ -0,0 +1,165 @@
+from lib.labeller import strategy_inputs_query, ticker_data_query
+from lib.models.EquityIndicators import EquityIndicators
+from lib.models.MarketData import MarketData
+from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Select, Table, inspect, literal, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+import re
+
+BOOTSTRAP_TABLES: List[Table] = [model.__table__ for model in (MarketData, EquityIndicators, SupervisedClassifierDataset)]
+
+def _effective_schema(engine: Engine, table: Table) -> Optional[str]:
+    """Schema a table is in once the engine's schema_translate_map (embedded backends) is applied"""
+    return engine.get_execution_options().get('schema_translate_map', {}).get(table.schema, table.schema)
+
+def create_indexes(engine: Engine) -> List[str]:
+    """
+    Create the indexes declared on the models that do not exist yet.
+
+    Safe to rerun. On Postgres the indexes are covering (INCLUDE); other
+    backends get the plain key columns.
+
+    Returns:
+        Names of the indexes created
+    """
+    created = []
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in BOOTSTRAP_TABLES:
+            schema = _effective_schema(engine, table)
+            if not inspector.has_table(table.name, schema=schema):
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name, schema=schema)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(index.name)
+        if connection.dialect.name == 'postgresql':
+            for table in BOOTSTRAP_TABLES:
+                connection.execute(text(f"ANALYZE {_qualified_name(connection, table)}"))
+        elif connection.dialect.name == 'sqlite':
+            connection.execute(text("ANALYZE"))
+    return created
+
+def _qualified_name(connection: Connection, table: Table, name: Optional[str] = None) -> str:
+    """Quoted, schema-qualified name of a table (or of another relation in its schema) for raw DDL"""
+    preparer = connection.dialect.identifier_preparer
+    schema = _effective_schema(connection.engine, table)
+    name = preparer.quote(name or table.name)
+    return f"{preparer.quote_schema(schema)}.{name}" if schema else name
+
+def partition_name(table: str, ticker: str) -> str:
+    """Name of a ticker's list partition, e.g. market_data_p_brk_b"""
+    return f"{table}_p_{re.sub(r'[^a-z0-9]+', '_', ticker.lower())}"
+
+def partition_by_ticker(engine: Engine, table: Table, tickers: List[str]) -> str:
+    """
+    Rebuild a Postgres table as a LIST-partitioned table with one partition
+    per ticker and a DEFAULT partition for the rest.
+
+    The rows are copied into a new partitioned table that then takes the
+    table's name in the same transaction; the original table is kept as
+    <table>_unpartitioned for rollback and can be dropped once verified.
+    The model's indexes are recreated on the partitioned table.
+
+    Returns:
+        Name the original table was renamed to
+    """
+    if engine.dialect.name != 'postgresql':
+        raise ValueError("List partitioning is only available on Postgres")
+    with engine.begin() as connection:
+        source = _qualified_name(connection, table)
+        staging = _qualified_name(connection, table, f"{table.name}_partitioned")
+        backup = f"{table.name}_unpartitioned"
+        key = ', '.join(connection.dialect.identifier_preparer.quote(column.name) for column in table.primary_key.columns)
+
+        connection.execute(text(
+            f"CREATE TABLE {staging} (LIKE {source} INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+            f"PRIMARY KEY ({key})) PARTITION BY LIST (ticker)"
+        ))
+        for ticker in sorted(set(tickers)):
+            value = literal(ticker).compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True})
+            connection.execute(text(
+                f"CREATE TABLE {_qualified_name(connection, table, partition_name(table.name, ticker))} "
+                f"PARTITION OF {staging} FOR VALUES IN ({value})"
+            ))
+        connection.execute(text(
+            f"CREATE TABLE {_qualified_name(connection, table, partition_name(table.name, 'default'))} "
+            f"PARTITION OF {staging} DEFAULT"
+        ))
+        connection.execute(text(f"INSERT INTO {staging} SELECT * FROM {source}"))
+
+        # Index names are unique per schema, so the backup gives its indexes up
+        for index in table.indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {_qualified_name(connection, table, index.name)}"))
+        connection.execute(text(f"ALTER TABLE {source} RENAME TO {connection.dialect.identifier_preparer.quote(backup)}"))
+        connection.execute(text(
+            f"ALTER TABLE {staging} RENAME TO {connection.dialect.identifier_preparer.quote(table.name)}"
+        ))
+        for index in table.indexes:
+            index.create(connection)
+        connection.execute(text(f"ANALYZE {source}"))
+    return backup
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (EXPLAIN QUERY PLAN on SQLite) of a statement, compiled like the statement itself"""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kwargs) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == 'sqlite' else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kwargs)
+
+def hot_queries(ticker: str) -> Dict[str, Select]:
+    """The per-ticker queries the labelling scripts run most"""
+    return {
+        'ticker_data': ticker_data_query(ticker),
+        'strategy_inputs': strategy_inputs_query(ticker),
+        'labels': (
+            select(SupervisedClassifierDataset.start_date, SupervisedClassifierDataset.label)
+            .where(SupervisedClassifierDataset.ticker == ticker)
+            .order_by(SupervisedClassifierDataset.start_date)
+        ),
+    }
+
+def explain(connection: Connection, query: Select) -> List[str]:
+    """Plan of a query, one line per plan node"""
+    rows = connection.execute(Explain(query)).all()
+    if connection.dialect.name == 'sqlite':
+        return [row[-1] for row in rows]  # (id, parent, notused, detail)
+    return [row[0] for row in rows]
+
+def full_scans(plan: List[str], tables: List[str]) -> List[str]:
+    """
+    Plan lines that read a whole table instead of searching an index.
+
+    SQLite reports 'SCAN <table>' (a full scan, with or without an index
+    for ordering) versus 'SEARCH <table> USING INDEX'; Postgres reports
+    'Seq Scan on <table>'. A sequential scan of one ticker's list partition
+    is partition pruning at work and is not counted; a scan of the DEFAULT
+    partition (<table>_p_default) means the ticker has no partition and is.
+    """
+    names = '|'.join(re.escape(table) for table in tables)
+    pattern = re.compile(rf"\b(?:SCAN|Seq Scan on) (?:\S+\.)?(?:{names})(?:_p_default)?\b")
+    return [line for line in plan if pattern.search(line)]
+
+def check_index_scans(engine: Engine, ticker: str) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    EXPLAIN every hot query for a ticker.
+
+    Returns:
+        Per query, whether it avoids full scans of the fyp tables and its plan
+    """
+    tables = [table.name for table in BOOTSTRAP_TABLES]
+    report = {}
+    with engine.connect() as connection:
+        for name, query in hot_queries(ticker).items():
+            plan = explain(connection, query)
+            report[name] = (not full_scans(plan, tables), plan)
+    return report
@@ -0,0 +1,131 @@
+from lib.labeller import MARKET_DATA_COLUMNS
+from lib.models.MarketData import MarketData
+from lib.models.EquityIndicators import EquityIndicators
+from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+
+from datetime import date
+from typing import Dict, Optional, Tuple
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+import pandas as pd
+
+MARKET_COLUMNS = [
+    MarketData.report_date.label('date'),
+    MarketData.close,
+    MarketData.open,
+    MarketData.high,
+    MarketData.low,
+    MarketData.volume,
+    EquityIndicators.ema_20,
+    EquityIndicators.ema_50,
+    EquityIndicators.ema_200
+]
+
+def _market_query(ticker: str, with_indicators: bool = True) -> Select:
+    """Market data columns for a specific ticker, joined with the stored indicators unless with_indicators is False."""
+    if not with_indicators:
+        return select(*MARKET_DATA_COLUMNS).where(MarketData.ticker == ticker)
+    return (
+        select(*MARKET_COLUMNS)
+        .join(
+            EquityIndicators,
+            (MarketData.ticker == EquityIndicators.ticker) &
+            (MarketData.report_date == EquityIndicators.report_date)
+        )
+        .where(MarketData.ticker == ticker)
+    )
+
+def _market_frame(rows, query: Select) -> pd.DataFrame:
+    market_df = pd.DataFrame(rows, columns=[column.name for column in query.selected_columns])
+    market_df.set_index('date', inplace=True)
+    return market_df
+
+def get_market_window(db_session: Session, ticker: str, start_date: Optional[date], window_size: int,
+                      with_indicators: bool = True) -> Tuple[pd.DataFrame, Optional[date]]:
+    """
+    Get one page of market data using keyset pagination on report_date.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        ticker: Stock ticker symbol
+        start_date: First report date of the page, or None for the first page
+        window_size: Number of trading days in the page
+        with_indicators: Join the stored EMA columns; otherwise only market_data is queried
+        
+    Returns:
+        Date-indexed DataFrame of the page, and the start date of the next page
+        (None on the last page)
+    """
+    query = _market_query(ticker, with_indicators)
+    if start_date is not None:
+        query = query.where(MarketData.report_date >= start_date)
+    # One extra row tells us where the next page starts without a second query
+    query = query.order_by(MarketData.report_date).limit(window_size + 1)
+    
+    market_df = _market_frame(db_session.execute(query).all(), query)
+    
+    next_start = market_df.index[window_size] if len(market_df) > window_size else None
+    return market_df.iloc[:window_size], next_start
+
+def get_previous_start(db_session: Session, ticker: str, start_date: date, window_size: int,
+                       with_indicators: bool = True) -> Optional[date]:
+    """Get the start date of the page before the page starting at start_date, over the same rows as get_market_window."""
+    query = (
+        _market_query(ticker, with_indicators)
+        .with_only_columns(MarketData.report_date, maintain_column_froms=True)
+        .where(MarketData.report_date < start_date)
+        .order_by(MarketData.report_date.desc())
+        .limit(window_size)
+    )
+    dates = db_session.execute(query).scalars().all()
+    return dates[-1] if dates else None
+
+def count_market_rows(db_session: Session, ticker: str, before: Optional[date] = None,
+                      with_indicators: bool = True) -> int:
+    """Count the rows get_market_window pages through for a ticker, optionally only those before a date."""
+    query = _market_query(ticker, with_indicators).with_only_columns(func.count(), maintain_column_froms=True)
+    if before is not None:
+        query = query.where(MarketData.report_date < before)
+    return db_session.execute(query).scalar_one()
+
+def get_window_labels(db_session: Session, ticker: str, start_date: date, end_date: date) -> pd.DataFrame:
+    """Get labels whose end_date falls between start_date and end_date."""
+    query = (
+        select(
+            SupervisedClassifierDataset.start_date,
+            SupervisedClassifierDataset.end_date,
+            SupervisedClassifierDataset.label
+        )
+        .where(
+            SupervisedClassifierDataset.ticker == ticker,
+            SupervisedClassifierDataset.end_date >= start_date,
+            SupervisedClassifierDataset.end_date <= end_date
+        )
+        .order_by(SupervisedClassifierDataset.end_date)
+    )
+    rows = db_session.execute(query).all()
+    return pd.DataFrame(rows, columns=['start_date', 'end_date', 'label'])
+
+def get_label_counts(db_session: Session, ticker: str) -> Dict[int, int]:
+    """Count the labels of a ticker per label value."""
+    query = (
+        select(SupervisedClassifierDataset.label, func.count())
+        .where(SupervisedClassifierDataset.ticker == ticker)
+        .group_by(SupervisedClassifierDataset.label)
+        .order_by(SupervisedClassifierDataset.label)
+    )
+    return dict(db_session.execute(query).all())
+
+def get_market_history(db_session: Session, ticker: str, with_indicators: bool = True) -> pd.DataFrame:
+    """Get the full market history of a ticker as a date-indexed DataFrame."""
+    query = _market_query(ticker, with_indicators).order_by(MarketData.report_date)
+    return _market_frame(db_session.execute(query).all(), query)
+
+def get_label_points(db_session: Session, ticker: str) -> pd.DataFrame:
+    """Get the end date and label of every label of a ticker."""
+    query = (
+        select(SupervisedClassifierDataset.end_date, SupervisedClassifierDataset.label)
+        .where(SupervisedClassifierDataset.ticker == ticker)
+        .order_by(SupervisedClassifierDataset.end_date)
+    )
+    return pd.DataFrame(db_session.execute(query).all(), columns=['end_date', 'label'])
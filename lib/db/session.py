@@ -1,19 +1,23 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
+from dotenv import load_dotenv
 from typing import ContextManager
+import os
 from sqlalchemy.orm import Session
 
-def create_db_session(
+def create_db_engine(
     user: str,
     password: str,
     host: str,
     port: str = "5432",
     database: str = "postgres",
     **kwargs
-) -> ContextManager[Session]:
+) -> Engine:
     """
-    Create and return a database session context manager.
+    Create a SQLAlchemy engine for the database.
     
     Args:
         user: Database username
@@ -24,13 +28,86 @@ def create_db_session(
         **kwargs: Additional arguments for create_engine
         
     Returns:
-        Context manager that yields database session
+        SQLAlchemy engine with its own connection pool
     """
     # Create database URL
     database_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
+    return create_engine(database_url, **kwargs)
+
+SCHEMA = 'fyp'
+EMBEDDED_BACKENDS = ['sqlite', 'duckdb']
+
+def create_embedded_engine(path: str = "fyp.sqlite", backend: str = "sqlite", **kwargs) -> Engine:
+    """
+    Create a SQLAlchemy engine for an embedded database file.
+
+    The models live in the 'fyp' schema on Postgres; embedded databases keep
+    the tables in their default schema and the engine translates the schema
+    away (schema_translate_map), so models and queries run unchanged.
+
+    Args:
+        path: Database file, or ':memory:' for a private in-memory database
+        backend: 'sqlite', or 'duckdb' if the duckdb-engine package is installed
+        **kwargs: Additional arguments for create_engine
+
+    Returns:
+        SQLAlchemy engine
+    """
+    if backend == 'sqlite':
+        if path == ':memory:':
+            # One shared connection, or every pooled connection would see its own empty database
+            kwargs.setdefault('poolclass', StaticPool)
+        engine = create_engine(f"sqlite:///{path}", connect_args={'check_same_thread': False}, **kwargs)
+
+        @event.listens_for(engine, 'connect')
+        def set_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    elif backend == 'duckdb':
+        try:
+            import duckdb_engine  # noqa: F401  (registers the duckdb:// dialect)
+        except ImportError:
+            raise ValueError("The duckdb backend needs the duckdb and duckdb-engine packages")
+        engine = create_engine(f"duckdb:///{path}", **kwargs)
+    else:
+        raise ValueError(f"Unknown embedded backend {backend!r}, expected one of {EMBEDDED_BACKENDS}")
+    return engine.execution_options(schema_translate_map={SCHEMA: None})
+
+def create_env_db_engine() -> Engine:
+    """
+    Create a database engine from the DB_* environment variables.
+
+    DB_BACKEND=sqlite or duckdb opens the embedded database file DB_PATH
+    (default fyp.sqlite / fyp.duckdb) instead of connecting to Postgres.
+    """
+    load_dotenv()
     
-    # Create SQLAlchemy engine and session
-    engine = create_engine(database_url, **kwargs)
+    backend = os.getenv("DB_BACKEND", "postgresql")
+    if backend in EMBEDDED_BACKENDS:
+        return create_embedded_engine(os.getenv("DB_PATH", f"fyp.{backend}"), backend)
+    return create_db_engine(
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT", "5432"),
+        database=os.getenv("DB_NAME", "postgres")
+    )
+
+def create_engine_session(engine: Engine) -> ContextManager[Session]:
+    """
+    Create a database session context manager bound to an existing engine.
+    
+    Reusing one engine (and its connection pool) across calls avoids paying
+    the connection setup cost on every query.
+    
+    Args:
+        engine: SQLAlchemy engine
+        
+    Returns:
+        Context manager that yields database session
+    """
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
     @contextmanager
@@ -41,4 +118,30 @@ def create_db_session(
         finally:
             db.close()
             
-    return get_db
\ No newline at end of file
+    return get_db
+
+def create_db_session(
+    user: str,
+    password: str,
+    host: str,
+    port: str = "5432",
+    database: str = "postgres",
+    **kwargs
+) -> ContextManager[Session]:
+    """
+    Create and return a database session context manager.
+    
+    Args:
+        user: Database username
+        password: Database password
+        host: Database host
+        port: Database port (default: "5432")
+        database: Database name (default: "postgres")
+        **kwargs: Additional arguments for create_engine
+        
+    Returns:
+        Context manager that yields database session
+    """
+    # Create SQLAlchemy engine and session
+    engine = create_db_engine(user, password, host, port, database, **kwargs)
+    return create_engine_session(engine)
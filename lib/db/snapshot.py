@@ -0,0 +1,178 @@
+from lib.models.EquityIndicators import EquityIndicators
+from lib.models.MarketData import MarketData
+from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+from typing import Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import BigInteger, Boolean, Date, Float, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Engine
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SNAPSHOT_TABLES = {
+    model.__tablename__: model.__table__
+    for model in (MarketData, EquityIndicators, SupervisedClassifierDataset)
+}
+SNAPSHOT_FORMATS = ['parquet', 'csv']
+CHUNK_ROWS = 100_000
+
+ARROW_TYPES = [  # checked in order, so subclasses (BigInteger) come before their bases (Integer)
+    (Date, pa.date32()),
+    (BigInteger, pa.int64()),
+    (Integer, pa.int64()),
+    (Float, pa.float64()),
+    (Boolean, pa.bool_()),
+    (String, pa.string()),
+]
+
+def arrow_schema(table: Table) -> pa.Schema:
+    """Parquet schema of a table, from its column types rather than from the values of a first chunk"""
+    fields = []
+    for column in table.columns:
+        arrow_type = next((arrow_type for sql_type, arrow_type in ARROW_TYPES if isinstance(column.type, sql_type)), None)
+        if arrow_type is None:
+            raise ValueError(f"No Parquet type for {table.name}.{column.name} ({column.type})")
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+def snapshot_files(directory: str) -> Dict[str, str]:
+    """Snapshot file of every known table found in a directory (<table>.parquet, <table>.csv or <table>.csv.gz)"""
+    files = {}
+    for name in SNAPSHOT_TABLES:
+        for suffix in ('.parquet', '.csv', '.csv.gz'):
+            path = os.path.join(directory, name + suffix)
+            if os.path.exists(path):
+                files[name] = path
+                break
+    return files
+
+def _check_tables(tables: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """Requested table names as a list, rejecting names that are not snapshot tables"""
+    if tables is None:
+        return None
+    tables = list(tables)
+    unknown = [name for name in tables if name not in SNAPSHOT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}; expected some of {', '.join(SNAPSHOT_TABLES)}")
+    return tables
+
+def _embedded_table(table: Table) -> Table:
+    """Copy of a model table, with its indexes, without the 'fyp' schema"""
+    return table.to_metadata(MetaData(), schema=None)
+
+def read_snapshot_chunks(filename: str, table: Table, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Chunks of a snapshot file with the table's columns it contains (others
+    are left NULL), dates as datetime.date and NaN as None.
+    """
+    if filename.endswith('.parquet'):
+        parquet = pq.ParquetFile(filename)
+        columns = [column.name for column in table.columns if column.name in parquet.schema_arrow.names]
+        batches = (batch.to_pandas() for batch in parquet.iter_batches(chunk_rows, columns=columns))
+    else:
+        header = pd.read_csv(filename, nrows=0).columns
+        columns = [column.name for column in table.columns if column.name in header]
+        batches = pd.read_csv(filename, usecols=columns, chunksize=chunk_rows)
+    missing = [column.name for column in table.primary_key.columns if column.name not in columns]
+    if missing:
+        raise ValueError(f"{filename} is missing key columns: {', '.join(missing)}")
+    for chunk in batches:
+        for column in table.columns:
+            if column.name in columns and isinstance(column.type, Date):
+                chunk[column.name] = pd.to_datetime(chunk[column.name]).dt.date
+        yield chunk[columns].astype(object).where(chunk[columns].notna(), None)
+
+def load_snapshot(engine: Engine, directory: str, tables: Optional[Iterable[str]] = None,
+                  chunk_rows: int = CHUNK_ROWS) -> Dict[str, int]:
+    """
+    Fill an embedded database from a directory of snapshot files.
+
+    Every table found is recreated, its rows inserted in chunks and then
+    its indexes (declared on the models) are built, so the rows are not
+    indexed one insert at a time. Without `tables`, known tables that have no
+    snapshot file are created empty if missing (e.g. for upload.py).
+
+    Args:
+        engine: Engine from create_embedded_engine
+        directory: Directory written by dump_snapshot (or by hand)
+        tables: Table names to load (default: every snapshot file found)
+        chunk_rows: Rows read and inserted at a time
+
+    Returns:
+        Rows loaded per table
+    """
+    tables = _check_tables(tables)
+    files = snapshot_files(directory)
+    counts = {}
+    for name in tables or list(files):
+        if name not in files:
+            raise ValueError(f"No snapshot of {name} in {directory}")
+        table = _embedded_table(SNAPSHOT_TABLES[name])
+        indexes = list(table.indexes)
+        table.indexes.clear()
+        with engine.begin() as connection:
+            table.drop(connection, checkfirst=True)
+            table.create(connection)
+            counts[name] = 0
+            for chunk in read_snapshot_chunks(files[name], table, chunk_rows):
+                connection.execute(table.insert(), chunk.to_dict('records'))
+                counts[name] += len(chunk)
+            for index in indexes:
+                index.create(connection)
+        print(f"[INFO] Loaded {counts[name]} rows into {name}")
+    if tables is None:
+        with engine.begin() as connection:
+            for name in SNAPSHOT_TABLES.keys() - files.keys():
+                _embedded_table(SNAPSHOT_TABLES[name]).create(connection, checkfirst=True)
+    if engine.dialect.name == 'sqlite':
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+    return counts
+
+def dump_snapshot(engine: Engine, directory: str, tables: Optional[Iterable[str]] = None,
+                  tickers: Optional[List[str]] = None, fmt: str = 'parquet',
+                  chunk_rows: int = CHUNK_ROWS) -> Dict[str, int]:
+    """
+    Write tables of a database (e.g. production Postgres) to snapshot files for load_snapshot.
+
+    Rows are streamed in chunks; `tickers` limits every table to those
+    tickers. Without `tables`, tables missing from the database are skipped.
+
+    Returns:
+        Rows written per table
+    """
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r}, expected one of {SNAPSHOT_FORMATS}")
+    tables = _check_tables(tables)
+    os.makedirs(directory, exist_ok=True)
+    schemas = engine.get_execution_options().get('schema_translate_map', {})
+    inspector = inspect(engine)
+    counts = {}
+    for name in tables or list(SNAPSHOT_TABLES):
+        table = SNAPSHOT_TABLES[name]
+        if tables is None and not inspector.has_table(name, schema=schemas.get(table.schema, table.schema)):
+            continue
+        query = select(table)
+        if tickers is not None:
+            query = query.where(table.c.ticker.in_(tickers))
+        path = os.path.join(directory, f"{name}.{fmt}")
+        counts[name] = 0
+        # From the column types, so a column that is all NULL in the first chunk does not become Arrow's null type
+        schema = arrow_schema(table) if fmt == 'parquet' else None
+        writer = None
+        with engine.connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(query)
+            while rows := result.fetchmany(chunk_rows):
+                chunk = pd.DataFrame(rows, columns=[column.name for column in table.columns])
+                if fmt == 'parquet':
+                    writer = writer or pq.ParquetWriter(f"{path}.tmp", schema)
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                else:
+                    chunk.to_csv(f"{path}.tmp", mode='a' if counts[name] else 'w', header=not counts[name], index=False)
+                counts[name] += len(chunk)
+        if writer is not None:
+            writer.close()
+        if counts[name]:
+            os.replace(f"{path}.tmp", path)
+        print(f"[INFO] Wrote {counts[name]} rows of {name} to {path}")
+    return counts
@@ -0,0 +1,68 @@
+from lib.db.bootstrap import (
+    BOOTSTRAP_TABLES, check_index_scans, create_indexes, full_scans, partition_by_ticker, partition_name
+)
+from lib.db.session import create_embedded_engine
+from sqlalchemy import MetaData, inspect
+
+def _engine_without_indexes():
+    """Embedded database with the fyp tables as an older deployment created them: primary keys only"""
+    engine = create_embedded_engine(':memory:')
+    with engine.begin() as connection:
+        for table in BOOTSTRAP_TABLES:
+            copy = table.to_metadata(MetaData(), schema=None)
+            copy.indexes.clear()
+            copy.create(connection)
+    return engine
+
+def test_create_indexes_and_explain_check():
+    engine = _engine_without_indexes()
+    report = check_index_scans(engine, 'AAPL')
+    assert set(report) == {'ticker_data', 'strategy_inputs', 'labels'}
+    # The label primary key leads with start_date, so a ticker's labels need a full scan
+    assert not report['labels'][0]
+
+    created = create_indexes(engine)
+    assert created == [
+        'ix_market_data_ticker_report_date',
+        'ix_equity_indicators_ticker_report_date',
+        'ix_supervised_classifier_dataset_ticker_start_date',
+    ]
+    assert create_indexes(engine) == []
+    index = next(i for i in inspect(engine).get_indexes('market_data') if i['name'] == created[0])
+    assert index['column_names'] == ['ticker', 'report_date']
+
+    report = check_index_scans(engine, 'AAPL')
+    for name, (uses_index, plan) in report.items():
+        assert uses_index, f"{name} still scans a whole table: {plan}"
+    assert any('ix_market_data_ticker_report_date' in line for line in report['ticker_data'][1])
+    print("Index bootstrap and EXPLAIN check test passed.")
+
+def test_full_scans():
+    tables = ['market_data', 'equity_indicators']
+    assert full_scans(['SCAN main.market_data USING INDEX sqlite_autoindex_market_data_1'], tables)
+    assert not full_scans(['SEARCH market_data USING INDEX ix_market_data_ticker_report_date (ticker=?)'], tables)
+    assert full_scans(['  ->  Seq Scan on market_data  (cost=0.00..1.00 rows=1 width=8)'], tables)
+    assert not full_scans([
+        'Index Scan using ix_equity_indicators_ticker_report_date on equity_indicators',
+        '  ->  Seq Scan on market_data_p_aapl market_data  (cost=0.00..1.00 rows=1 width=8)',
+    ], tables)
+    # An unlisted ticker falls into the DEFAULT partition, which holds every other ticker
+    assert full_scans(['Seq Scan on fyp.market_data_p_default market_data  (cost=0.00..1.00 rows=1 width=8)'], tables)
+    print("Full scan detection test passed.")
+
+def test_partitioning_requires_postgres():
+    assert partition_name('market_data', 'BRK.B') == 'market_data_p_brk_b'
+    try:
+        partition_by_ticker(create_embedded_engine(':memory:'), BOOTSTRAP_TABLES[0], ['AAPL'])
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("Partitioning guard test passed.")
+
+def main():
+    test_create_indexes_and_explain_check()
+    test_full_scans()
+    test_partitioning_requires_postgres()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import pandas as pd
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from lib.db.pages import count_market_rows, get_label_counts, get_market_window, get_previous_start, get_window_labels
+from lib.models.EquityIndicators import EquityIndicators
+from lib.models.MarketData import MarketData
+from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+
+DATES = list(pd.bdate_range('2020-01-01', periods=25).date)
+
+def _engine():
+    """In-memory SQLite database with 25 AAPL bars, indicators for all but the first two, and a few labels"""
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    event.listen(engine, 'connect', lambda dbapi, _: dbapi.execute("ATTACH DATABASE ':memory:' AS fyp"))
+    for model in (MarketData, EquityIndicators, SupervisedClassifierDataset):
+        model.metadata.create_all(engine)
+    bars = [
+        dict(ticker=ticker, report_date=day, close=float(i), open=0.0, high=0.0, low=0.0, volume=0, type='stock')
+        for ticker in ['AAPL', 'MSFT']
+        for i, day in enumerate(DATES)
+    ]
+    indicators = [dict(ticker='AAPL', report_date=day, ema_20=1.0, ema_50=1.0, ema_200=1.0) for day in DATES[2:]]
+    labels = [
+        dict(ticker='AAPL', start_date=DATES[0], end_date=DATES[4], label=0),
+        dict(ticker='AAPL', start_date=DATES[5], end_date=DATES[9], label=0),
+        dict(ticker='AAPL', start_date=DATES[10], end_date=DATES[14], label=2),
+        dict(ticker='MSFT', start_date=DATES[0], end_date=DATES[4], label=1),
+    ]
+    with engine.begin() as conn:
+        conn.execute(MarketData.__table__.insert(), bars)
+        conn.execute(EquityIndicators.__table__.insert(), indicators)
+        conn.execute(SupervisedClassifierDataset.__table__.insert(), labels)
+    return engine
+
+def test_market_window_pages():
+    with Session(_engine()) as session:
+        # Bars without indicators are not part of the joined pages
+        first, next_start = get_market_window(session, 'AAPL', None, 10)
+        assert list(first.index) == DATES[2:12] and next_start == DATES[12]
+        assert list(first.columns) == ['close', 'open', 'high', 'low', 'volume', 'ema_20', 'ema_50', 'ema_200']
+
+        last, next_start = get_market_window(session, 'AAPL', DATES[22], 10)
+        assert list(last.index) == DATES[22:] and next_start is None
+
+        empty, next_start = get_market_window(session, 'FOO', None, 10)
+        assert empty.empty and next_start is None
+
+        plain, next_start = get_market_window(session, 'AAPL', None, 10, with_indicators=False)
+        assert list(plain.index) == DATES[:10] and next_start == DATES[10]
+    print("Market window pages test passed.")
+
+def test_previous_start():
+    with Session(_engine()) as session:
+        assert get_previous_start(session, 'AAPL', DATES[2], 10) is None
+        assert get_previous_start(session, 'AAPL', DATES[12], 10) == DATES[2]
+        assert get_previous_start(session, 'AAPL', DATES[22], 10) == DATES[12]
+        # A page that did not start on a page boundary goes back to the first row
+        assert get_previous_start(session, 'AAPL', DATES[5], 10) == DATES[2]
+        assert get_previous_start(session, 'AAPL', DATES[2], 10, with_indicators=False) == DATES[0]
+    print("Previous start test passed.")
+
+def test_counts():
+    with Session(_engine()) as session:
+        assert count_market_rows(session, 'AAPL') == 23
+        assert count_market_rows(session, 'AAPL', with_indicators=False) == 25
+        assert count_market_rows(session, 'AAPL', before=DATES[12]) == 10
+        assert count_market_rows(session, 'AAPL', before=DATES[2]) == 0
+        assert get_label_counts(session, 'AAPL') == {0: 2, 2: 1}
+        assert get_label_counts(session, 'FOO') == {}
+
+        labels = get_window_labels(session, 'AAPL', DATES[5], DATES[14])
+        assert list(labels['end_date']) == [DATES[9], DATES[14]] and list(labels['label']) == [0, 2]
+    print("Counts test passed.")
+
+def main():
+    test_market_window_pages()
+    test_previous_start()
+    test_counts()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from lib.db.session import create_embedded_engine, create_engine_session
+from lib.db.snapshot import dump_snapshot, load_snapshot, snapshot_files
+from lib.db.window_returns import get_window_returns, store_window_returns
+from lib.labeller import get_ticker_data, load_data
+from lib.strategies.vectorized import RSI_COLUMNS
+
+def _write_snapshot(directory: str, n: int = 40):
+    """market_data as Parquet and equity_indicators as CSV for two tickers"""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2020-01-01', periods=n)
+    market, indicators = [], []
+    for ticker in ['AAPL', 'MSFT']:
+        close = 100 + rng.standard_normal(n).cumsum()
+        market.append(pd.DataFrame({
+            'report_date': dates.date, 'ticker': ticker, 'open': close, 'close': close,
+            'low': close - 1, 'high': close + 1, 'volume': np.arange(n), 'type': 'stock',
+        }))
+        frame = pd.DataFrame({'ticker': ticker, 'report_date': dates.strftime('%Y-%m-%d')})
+        for column in RSI_COLUMNS + ['ema_20', 'ema_50', 'ema_200']:
+            frame[column] = rng.uniform(0, 100, n)
+        frame.loc[3, 'rsi_2'] = np.nan
+        indicators.append(frame)
+    pd.concat(market).to_parquet(os.path.join(directory, 'market_data.parquet'), index=False)
+    pd.concat(indicators).to_csv(os.path.join(directory, 'equity_indicators.csv'), index=False)
+
+def test_load_snapshot_into_sqlite():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_snapshot(tmp)
+        assert set(snapshot_files(tmp)) == {'market_data', 'equity_indicators'}
+        engine = create_embedded_engine(os.path.join(tmp, 'fyp.sqlite'))
+        counts = load_snapshot(engine, tmp, chunk_rows=25)
+        assert counts == {'market_data': 80, 'equity_indicators': 80}
+
+        # Tables are in the default schema and indexed on (ticker, report_date)
+        inspector = inspect(engine)
+        assert {'market_data', 'equity_indicators'} <= set(inspector.get_table_names())
+        index = inspector.get_indexes('market_data')[0]
+        assert index['column_names'] == ['ticker', 'report_date']
+
+        # The fyp-schema models and queries run unchanged
+        db_context = create_engine_session(engine)
+        with db_context() as session:
+            assert len(get_ticker_data(session, 'AAPL')) == 40
+            assert store_window_returns(session, 20, ['AAPL']) == 21
+            assert len(get_window_returns(session, 20)) == 42
+        df = load_data('MSFT', db_context, indicators='stored')
+        assert len(df) == 40 and np.isnan(df['rsi_2'].iloc[3])
+        assert load_data('MSFT', db_context, indicators='computed')['rsi_14'].notna().sum() == 40 - 14
+
+        # Reloading replaces the rows instead of appending
+        assert load_snapshot(engine, tmp, tables=['market_data']) == {'market_data': 80}
+        engine.dispose()
+    print("Snapshot load test passed.")
+
+def test_dump_snapshot_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, 'source')
+        os.makedirs(source_dir)
+        _write_snapshot(source_dir)
+        source = create_embedded_engine(':memory:')
+        load_snapshot(source, source_dir)
+
+        for fmt in ['parquet', 'csv']:
+            dump_dir = os.path.join(tmp, fmt)
+            counts = dump_snapshot(source, dump_dir, tickers=['MSFT'], fmt=fmt, chunk_rows=15)
+            assert counts == {'market_data': 40, 'equity_indicators': 40, 'supervised_classifier_dataset': 0}
+            assert set(snapshot_files(dump_dir)) == {'market_data', 'equity_indicators'}
+
+            copy = create_embedded_engine(':memory:')
+            load_snapshot(copy, dump_dir)
+            db_context = create_engine_session(copy)
+            expected = load_data('MSFT', create_engine_session(source), indicators='stored')
+            pd.testing.assert_frame_equal(load_data('MSFT', db_context, indicators='stored'), expected)
+            assert load_data('AAPL', db_context, indicators='stored') is None
+    print("Snapshot dump round trip test passed.")
+
+def test_dump_parquet_with_late_values():
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, 'source')
+        os.makedirs(source_dir)
+        _write_snapshot(source_dir)
+        source = create_embedded_engine(':memory:')
+        load_snapshot(source, source_dir)
+        # Nullable columns of each kind that are NULL only in the first chunk of 15 rows
+        with source.begin() as connection:
+            connection.execute(text("UPDATE market_data SET type = NULL, volume = NULL WHERE rowid <= 15"))
+            connection.execute(text("UPDATE equity_indicators SET rsi_3 = NULL WHERE rowid <= 15"))
+
+        dump_dir = os.path.join(tmp, 'dump')
+        counts = dump_snapshot(source, dump_dir, tables=['market_data', 'equity_indicators'], chunk_rows=15)
+        assert counts == {'market_data': 80, 'equity_indicators': 80}
+
+        copy = create_embedded_engine(':memory:')
+        load_snapshot(copy, dump_dir)
+        for table, column in [('market_data', 'type'), ('market_data', 'volume'), ('equity_indicators', 'rsi_3')]:
+            query = text(f"SELECT COUNT({column}) FROM {table}")
+            with source.connect() as connection:
+                expected = connection.execute(query).scalar_one()
+            with copy.connect() as connection:
+                assert connection.execute(query).scalar_one() == expected == 65, (table, column)
+    print("Snapshot dump with late values test passed.")
+
+def test_unknown_tables_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_snapshot(tmp)
+        engine = create_embedded_engine(':memory:')
+        load_snapshot(engine, tmp)
+        dump_dir = os.path.join(tmp, 'dump')
+        for run in (lambda: dump_snapshot(engine, dump_dir, tables=['market_data', 'market_dta']),
+                    lambda: load_snapshot(engine, tmp, tables=['market_dta'])):
+            try:
+                run()
+                assert False, "Expected ValueError"
+            except ValueError as error:
+                assert 'market_dta' in str(error)
+        assert not os.path.exists(dump_dir), "Nothing should be written before the names are checked"
+    print("Snapshot unknown tables test passed.")
+
+def main():
+    test_load_snapshot_into_sqlite()
+    test_dump_snapshot_round_trip()
+    test_dump_parquet_with_late_values()
+    test_unknown_tables_rejected()
+
+if __name__ == "__main__":
+    main()
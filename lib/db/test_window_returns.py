@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from lib.db.window_returns import combine_window_returns, get_window_returns, store_window_returns
+from lib.models.MarketData import MarketData
+from lib.models.WindowReturns import WindowReturns
+from lib.strategies.vectorized import RSI_COLUMNS, strategy_returns
+
+def _engine(n: int = 60):
+    """In-memory SQLite database with the fyp schema attached and random closes for two tickers"""
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    event.listen(engine, 'connect', lambda dbapi, _: dbapi.execute("ATTACH DATABASE ':memory:' AS fyp"))
+    MarketData.metadata.create_all(engine)
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2020-01-01', periods=n).date
+    rows = [
+        dict(ticker=ticker, report_date=day, close=float(close), open=0.0, high=0.0, low=0.0, volume=0, type='stock')
+        for ticker in ['AAPL', 'MSFT']
+        for day, close in zip(dates, 100 + rng.standard_normal(n).cumsum())
+    ]
+    with engine.begin() as conn:
+        conn.execute(MarketData.__table__.insert(), rows)
+    return engine
+
+def _ticker_df(session: Session, ticker: str) -> pd.DataFrame:
+    rows = session.execute(
+        select(MarketData.report_date, MarketData.close).where(MarketData.ticker == ticker).order_by(MarketData.report_date)
+    ).all()
+    df = pd.DataFrame(rows, columns=['date', 'close']).set_index('date')
+    for column in RSI_COLUMNS:
+        df[column] = 50.0
+    return df
+
+def test_window_returns_match_client_side():
+    with Session(_engine()) as session:
+        returns = get_window_returns(session, 20)
+        assert len(returns) == 2 * 41, f"Expected 82 windows, got {len(returns)}"
+
+        df = _ticker_df(session, 'AAPL')
+        expected = strategy_returns(df, 20)
+        aapl = returns[returns['ticker'] == 'AAPL']
+        assert list(aapl['start_date']) == list(expected.index)
+        assert np.allclose(aapl['buy_and_hold'], expected['buy_and_hold'])
+        assert np.allclose(aapl['sell_and_hold'], expected['sell_and_hold'])
+        assert aapl['end_date'].iloc[0] == df.index[19]
+
+        ranged = get_window_returns(session, 20, ['MSFT'], start_date=df.index[10], end_date=df.index[40])
+        assert len(ranged) == 12 and set(ranged['ticker']) == {'MSFT'}
+    print("window returns test passed.")
+
+def test_store_window_returns_replaces_rows():
+    with Session(_engine()) as session:
+        assert store_window_returns(session, 20, ['AAPL']) == 41
+        assert store_window_returns(session, 20, ['AAPL']) == 41
+        assert store_window_returns(session, 10, ['AAPL', 'MSFT']) == 2 * 51
+        counts = dict(session.execute(
+            select(WindowReturns.window_size, func.count()).group_by(WindowReturns.window_size)
+        ).all())
+        assert counts == {10: 102, 20: 41}, f"Unexpected row counts {counts}"
+    print("store window returns test passed.")
+
+def test_combine_window_returns():
+    with Session(_engine()) as session:
+        df = _ticker_df(session, 'AAPL')
+        returns = get_window_returns(session, 20, ['AAPL'])
+    expected = strategy_returns(df, 20)
+    pd.testing.assert_frame_equal(combine_window_returns(df, returns, 20), expected)
+    shifted = combine_window_returns(df, returns.assign(buy_and_hold=returns['buy_and_hold'] + 1), 20)
+    assert np.allclose(shifted['buy_and_hold'], expected['buy_and_hold'] + 1), "Matched windows should use the database values"
+
+    # Windows missing from the database result are computed client-side
+    pd.testing.assert_frame_equal(combine_window_returns(df, returns.iloc[5:], 20), expected)
+    pd.testing.assert_frame_equal(combine_window_returns(df, returns.iloc[:0], 20), expected)
+    print("combine window returns test passed.")
+
+def main():
+    test_window_returns_match_client_side()
+    test_store_window_returns_replaces_rows()
+    test_combine_window_returns()
+
+if __name__ == "__main__":
+    main()
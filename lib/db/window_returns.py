@@ -0,0 +1,128 @@
+from lib.models.MarketData import MarketData
+from lib.models.WindowReturns import WindowReturns
+from lib.strategies.vectorized import STRATEGIES, _window_starts
+from datetime import date
+from typing import Iterable, List, Optional
+from sqlalchemy import Float, Integer, Select, cast, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+import numpy as np
+import pandas as pd
+
+WINDOW_RETURN_COLUMNS = ['ticker', 'start_date', 'end_date', 'buy_and_hold', 'sell_and_hold']
+
+def window_returns_query(window_size: int = 20, tickers: Optional[Iterable[str]] = None,
+                         start_date: Optional[date] = None, end_date: Optional[date] = None) -> Select:
+    """
+    Buy-and-Hold and Sell-and-Hold returns of every full window, computed in the database.
+
+    The close `window_size - 1` rows ahead is read with LEAD over each
+    ticker's rows ordered by report_date, so only one row per window leaves
+    the database. Windows must fit between start_date and end_date, like the
+    windows of load_data over the same range.
+
+    Returns:
+        Query selecting WINDOW_RETURN_COLUMNS
+    """
+    ahead = window_size - 1
+    window = dict(partition_by=MarketData.ticker, order_by=MarketData.report_date)
+    market = select(
+        MarketData.ticker,
+        MarketData.report_date.label('start_date'),
+        func.lead(MarketData.report_date, ahead, type_=MarketData.report_date.type).over(**window).label('end_date'),
+        cast(MarketData.close, Float(53)).label('start_close'),
+        cast(func.lead(MarketData.close, ahead).over(**window), Float(53)).label('end_close'),
+    )
+    if tickers is not None:
+        market = market.where(MarketData.ticker.in_(list(tickers)))
+    if start_date is not None:
+        market = market.where(MarketData.report_date >= start_date)
+    if end_date is not None:
+        market = market.where(MarketData.report_date <= end_date)
+    market = market.subquery('windows')
+
+    buy_and_hold = (market.c.end_close - market.c.start_close) / func.nullif(market.c.start_close, 0) * 100
+    return (
+        select(
+            market.c.ticker,
+            market.c.start_date,
+            market.c.end_date,
+            buy_and_hold.label('buy_and_hold'),
+            (-buy_and_hold).label('sell_and_hold'),
+        )
+        .where(market.c.end_date.is_not(None))
+        .order_by(market.c.ticker, market.c.start_date)
+    )
+
+def get_window_returns(db_session: Session, window_size: int = 20, tickers: Optional[Iterable[str]] = None,
+                       start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+    """Fetch window_returns_query as a DataFrame with WINDOW_RETURN_COLUMNS"""
+    rows = db_session.execute(window_returns_query(window_size, tickers, start_date, end_date)).all()
+    return pd.DataFrame(rows, columns=WINDOW_RETURN_COLUMNS)
+
+def store_window_returns(db_session: Session, window_size: int = 20, tickers: Optional[List[str]] = None,
+                         start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+    """
+    Materialize window_returns_query into fyp.window_returns with INSERT ... SELECT.
+
+    Existing rows of the same tickers and window size are replaced, and
+    nothing but the row count is sent back to the client.
+
+    Returns:
+        Number of windows written
+    """
+    WindowReturns.__table__.create(db_session.get_bind(), checkfirst=True)
+    query = window_returns_query(window_size, tickers, start_date, end_date)
+
+    stale = delete(WindowReturns).where(WindowReturns.window_size == window_size)
+    if tickers is not None:
+        stale = stale.where(WindowReturns.ticker.in_(tickers))
+    if start_date is not None:
+        stale = stale.where(WindowReturns.start_date >= start_date)
+    if end_date is not None:
+        stale = stale.where(WindowReturns.start_date <= end_date)
+
+    rows = query.subquery('window_returns')
+    fill = insert(WindowReturns).from_select(
+        ['ticker', 'start_date', 'window_size', 'end_date', 'buy_and_hold', 'sell_and_hold'],
+        select(rows.c.ticker, rows.c.start_date, literal(window_size, Integer),
+               rows.c.end_date, rows.c.buy_and_hold, rows.c.sell_and_hold)
+    )
+    db_session.execute(stale)
+    count = db_session.execute(fill).rowcount
+    db_session.commit()
+    return count
+
+def combine_window_returns(df: pd.DataFrame, window_returns: pd.DataFrame, window_size: int = 20) -> pd.DataFrame:
+    """
+    strategy_returns of a ticker with Buy-and-Hold and Sell-and-Hold taken from the database.
+
+    Only Mean Reversion, which needs per-day state, is computed here. Windows
+    the database result does not cover with the same end date (e.g. days
+    missing from the client-side frame) are computed client-side as well.
+
+    Args:
+        df: Date-indexed frame with close and rsi_1..rsi_20 columns
+        window_returns: Rows of get_window_returns for the ticker
+        window_size: Trading days per window
+
+    Returns:
+        Frame laid out like strategy_returns(df, window_size)
+    """
+    starts = _window_starts(len(df), window_size)
+    start_dates = df.index[starts]
+    end_dates = df.index[starts + window_size - 1]
+    database = window_returns.drop_duplicates('start_date').set_index('start_date').reindex(start_dates)
+    matched = (database['end_date'].to_numpy() == np.asarray(end_dates)) & database['buy_and_hold'].notna().to_numpy()
+
+    returns = {}
+    for name, (_, _, compute) in STRATEGIES.items():
+        if name in database.columns:
+            values = database[name].to_numpy(dtype=np.float64)
+            missing = np.flatnonzero(~matched)
+        else:
+            values = np.full(len(starts), np.nan)
+            missing = np.arange(len(starts))
+        if len(missing):
+            values[missing] = compute(df, window_size, starts[missing])
+        returns[name] = values
+    return pd.DataFrame(returns, index=start_dates)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+def bucket_starts(n_rows: int, n_buckets: int) -> np.ndarray:
+    """
+    Start positions of `n_buckets` contiguous, near-equal buckets over `n_rows` rows.
+
+    Fewer buckets are returned when there are fewer rows than buckets, so
+    every bucket holds at least one row.
+    """
+    n_buckets = max(1, min(n_buckets, n_rows))
+    return np.unique(np.linspace(0, n_rows, n_buckets, endpoint=False).astype(np.int64))
+
+def ohlc_downsample(df: pd.DataFrame, n_buckets: int) -> pd.DataFrame:
+    """
+    Aggregate a date-indexed OHLCV frame into at most `n_buckets` rows.
+
+    Each bucket keeps the first open, the highest high, the lowest low, the
+    last close and the summed volume of its rows, so the extremes of the
+    full series survive downsampling. Any other columns (e.g. EMAs) keep
+    their last value in the bucket.
+
+    Args:
+        df: Date-indexed frame with open, high, low, close and volume columns
+        n_buckets: Maximum number of rows in the result
+
+    Returns:
+        Frame indexed by the first date of each bucket, with a `rows` column
+        holding the number of trading days aggregated into it
+    """
+    if df.empty:
+        return df.assign(rows=pd.Series(dtype=np.int64))
+
+    starts = bucket_starts(len(df), n_buckets)
+    ends = np.append(starts[1:], len(df)) - 1
+
+    result = pd.DataFrame(index=df.index[starts])
+    result['open'] = df['open'].to_numpy()[starts]
+    result['high'] = np.maximum.reduceat(df['high'].to_numpy(dtype=np.float64), starts)
+    result['low'] = np.minimum.reduceat(df['low'].to_numpy(dtype=np.float64), starts)
+    result['close'] = df['close'].to_numpy()[ends]
+    result['volume'] = np.add.reduceat(df['volume'].to_numpy(dtype=np.int64), starts)
+    for column in df.columns.difference(['open', 'high', 'low', 'close', 'volume'], sort=False):
+        result[column] = df[column].to_numpy()[ends]
+    result['rows'] = ends - starts + 1
+    return result
+
+def label_bands(bucket_dates: pd.Index, label_dates, labels, n_labels: int = 3) -> pd.DataFrame:
+    """
+    Count labels per downsampled bucket.
+
+    Args:
+        bucket_dates: First date of each bucket, ascending
+        label_dates: Date each label is plotted at (its window end date)
+        labels: Numeric label values in [0, n_labels); others (e.g. -1 for
+            unknown patterns) are not counted
+        n_labels: Number of distinct label values
+
+    Returns:
+        Frame indexed like `bucket_dates` with one count column per label,
+        `total`, and `dominant` (the most frequent label, -1 for no labels)
+    """
+    bucket_keys = pd.to_datetime(pd.Index(bucket_dates)).to_numpy()
+    label_keys = pd.to_datetime(pd.Index(label_dates)).to_numpy()
+    labels = np.asarray(labels, dtype=np.int64)
+
+    bucket = np.searchsorted(bucket_keys, label_keys, side='right') - 1
+    inside = (bucket >= 0) & (labels >= 0) & (labels < n_labels)
+    counts = np.bincount(
+        bucket[inside] * n_labels + labels[inside],
+        minlength=len(bucket_keys) * n_labels
+    ).reshape(len(bucket_keys), n_labels)
+
+    bands = pd.DataFrame(counts, index=bucket_dates, columns=list(range(n_labels)))
+    bands['total'] = counts.sum(axis=1)
+    bands['dominant'] = np.where(bands['total'] > 0, counts.argmax(axis=1), -1)
+    return bands
@@ -0,0 +1,104 @@
+from lib.index.WindowIndex import TradingCalendar, day_to_date, to_day, to_days
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Union
+
+class LabelIndex:
+    """
+    Per-ticker index of labelled windows over the ticker's trading days.
+
+    Window start dates are held as integer day ordinals in a TradingCalendar;
+    every lookup works on a boolean mask over the row positions of the
+    ticker's DataFrame, so checks are O(1) and next-unlabelled searches are a
+    single vectorized scan. Dates are only formatted when asked for.
+    """
+    def __init__(self, dates: pd.Index):
+        self.dates = dates
+        self.calendar = TradingCalendar(dates)
+        self._mask = np.zeros(len(dates), dtype=bool)
+        self._count = 0
+        self._labelled_dates = None
+
+    @classmethod
+    def from_labels(cls, dates: pd.Index, labels: dict, ticker: str) -> "LabelIndex":
+        """
+        Build the index for a ticker from a label dictionary.
+
+        Args:
+            dates: Trading dates of the ticker, in row order
+            labels: Label dictionary (string or packed WindowIndex keys)
+            ticker: Stock ticker symbol
+
+        Returns:
+            LabelIndex with every labelled start date of the ticker marked
+        """
+        index = cls(dates)
+        start_dates = [value['start_date'] for value in labels.values() if value['ticker'] == ticker]
+        positions = index.calendar.positions(to_days(start_dates))
+        index._mask[positions[positions >= 0]] = True
+        index._count = int(index._mask.sum())
+        return index
+
+    def __len__(self) -> int:
+        return len(self._mask)
+
+    @property
+    def labelled_count(self) -> int:
+        return self._count
+
+    def position(self, start_date: Union[str, int]) -> Optional[int]:
+        """Row position of a 'YYYY-MM-DD' start date or day ordinal, or None if not a trading day"""
+        return self.calendar.position(start_date if isinstance(start_date, int) else to_day(start_date))
+
+    def start_date(self, pos: int) -> str:
+        """'YYYY-MM-DD' start date of the window at `pos`"""
+        return day_to_date(self.calendar.days[pos])
+
+    def start_dates(self, positions: np.ndarray) -> List[str]:
+        """'YYYY-MM-DD' start dates of the windows at `positions`"""
+        return list(np.datetime_as_string(self.calendar.days[positions].astype('datetime64[D]')))
+
+    def unlabelled_positions(self, stop: Optional[int] = None) -> np.ndarray:
+        """Positions before `stop` (default: all) whose window is unlabelled"""
+        return np.flatnonzero(~self._mask[:stop])
+
+    def is_labelled(self, pos: int) -> bool:
+        return bool(self._mask[pos])
+
+    def mark(self, pos: int):
+        """Mark the window starting at `pos` as labelled"""
+        if not self._mask[pos]:
+            self._mask[pos] = True
+            self._count += 1
+            self._labelled_dates = None
+
+    def unmark(self, pos: int):
+        """Mark the window starting at `pos` as unlabelled"""
+        if self._mask[pos]:
+            self._mask[pos] = False
+            self._count -= 1
+            self._labelled_dates = None
+
+    def next_unlabelled(self, start: int = 0, among: Optional[np.ndarray] = None) -> Optional[int]:
+        """
+        Find the first unlabelled position at or after `start`.
+
+        Wraps around to the earliest unlabelled position if everything after
+        `start` is labelled, and returns None if every position is labelled.
+        `among` optionally restricts the search to positions where it is True.
+        """
+        free = ~self._mask if among is None else ~self._mask & among
+        for lo in (start, 0):
+            remaining = free[lo:]
+            if len(remaining) == 0:
+                continue
+            offset = int(np.argmax(remaining))
+            if remaining[offset]:
+                return lo + offset
+        return None
+
+    def labelled_dates(self) -> List:
+        """Trading dates whose window is labelled, in row order"""
+        if self._labelled_dates is None:
+            self._labelled_dates = list(self.dates[self._mask])
+        return self._labelled_dates
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+DateLike = Union[str, date, np.datetime64]
+DAY_BIAS = 1 << 31  # Added to day ordinals so keys sort by date, including dates before 1970
+
+def to_day(value: DateLike) -> int:
+    """Day ordinal (days since 1970-01-01) of a 'YYYY-MM-DD' string or date"""
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+def to_days(dates) -> np.ndarray:
+    """int64 day ordinals of an array-like of dates or 'YYYY-MM-DD' strings"""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+def day_to_date(day: int) -> str:
+    """'YYYY-MM-DD' string of a day ordinal"""
+    return str(np.datetime64(int(day), 'D'))
+
+def pack_key(ticker_id: int, day: int) -> int:
+    """int64 window key of a ticker id (high 32 bits) and day ordinal (low 32 bits)"""
+    return (ticker_id << 32) | (day + DAY_BIAS)
+
+def pack_keys(ticker_ids, days) -> np.ndarray:
+    """Vectorized pack_key; keys sort by ticker id, then date"""
+    return (np.asarray(ticker_ids, dtype=np.int64) << 32) | (np.asarray(days, dtype=np.int64) + DAY_BIAS)
+
+def unpack_keys(keys) -> Tuple[np.ndarray, np.ndarray]:
+    """Ticker ids and day ordinals of int64 window keys"""
+    keys = np.asarray(keys, dtype=np.int64)
+    return keys >> 32, (keys & 0xFFFFFFFF) - DAY_BIAS
+
+class TradingCalendar:
+    """
+    Trading days of one ticker with O(1) conversion between day ordinals and
+    row positions.
+
+    Positions are looked up in a dense array covering every calendar day
+    between the first and last trading day, so a lookup is a subtraction
+    and an array read.
+    """
+    def __init__(self, dates):
+        self.days = to_days(dates)
+        if len(self.days):
+            self._first = int(self.days[0])
+            self._lookup = np.full(int(self.days[-1]) - self._first + 1, -1, dtype=np.int64)
+            self._lookup[self.days - self._first] = np.arange(len(self.days))
+        else:
+            self._first = 0
+            self._lookup = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def position(self, day: int) -> Optional[int]:
+        """Row position of a day ordinal, or None if it is not a trading day"""
+        offset = day - self._first
+        if offset < 0 or offset >= len(self._lookup):
+            return None
+        pos = self._lookup[offset]
+        return int(pos) if pos >= 0 else None
+
+    def positions(self, days: np.ndarray) -> np.ndarray:
+        """Row positions of an array of day ordinals, -1 where not a trading day"""
+        offsets = np.asarray(days, dtype=np.int64) - self._first
+        inside = (offsets >= 0) & (offsets < len(self._lookup))
+        result = np.full(len(offsets), -1, dtype=np.int64)
+        result[inside] = self._lookup[offsets[inside]]
+        return result
+
+class WindowIndex:
+    """
+    Integer identifiers for label windows.
+
+    Every ticker gets a small int id (in order of first use) and every date
+    an int day ordinal, so a window is the pair (ticker_id, day) or the
+    packed int64 key `ticker_id << 32 | day`. String keys like
+    "AAPL_1997-01-02" are only built when labels are written out
+    (`key_strings`, `save_labels`) or passed to a label store.
+    Registering a ticker's trading dates with `add_calendar` adds O(1)
+    conversion between day ordinals and the ticker's row positions.
+    """
+    def __init__(self, tickers: Iterable[str] = ()):
+        self._tickers: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._calendars: Dict[int, TradingCalendar] = {}
+        for ticker in tickers:
+            self.ticker_id(ticker)
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self._tickers)
+
+    def ticker_id(self, ticker: str) -> int:
+        """Id of a ticker, assigning the next free id on first use"""
+        ticker_id = self._ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = self._ids[ticker] = len(self._tickers)
+            self._tickers.append(ticker)
+        return ticker_id
+
+    def ticker(self, ticker_id: int) -> str:
+        return self._tickers[ticker_id]
+
+    def ticker_ids(self, tickers) -> np.ndarray:
+        """Ids of an array-like of tickers, assigning ids to new ones"""
+        tickers = pd.Categorical(tickers)
+        category_ids = np.array([self.ticker_id(ticker) for ticker in tickers.categories], dtype=np.int64)
+        return category_ids[tickers.codes]
+
+    def add_calendar(self, ticker: str, dates) -> TradingCalendar:
+        """Register the trading dates (row order) of a ticker"""
+        calendar = self._calendars[self.ticker_id(ticker)] = TradingCalendar(dates)
+        return calendar
+
+    def calendar(self, ticker: str) -> Optional[TradingCalendar]:
+        ticker_id = self._ids.get(ticker)
+        return None if ticker_id is None else self._calendars.get(ticker_id)
+
+    def window_key(self, ticker: str, start_date: DateLike) -> int:
+        """Packed int64 key of a window"""
+        return pack_key(self.ticker_id(ticker), to_day(start_date))
+
+    def window_keys(self, tickers, start_dates) -> np.ndarray:
+        """Packed int64 keys of arrays of tickers and start dates"""
+        return pack_keys(self.ticker_ids(tickers), to_days(start_dates))
+
+    def window(self, key: int) -> Tuple[str, str]:
+        """(ticker, 'YYYY-MM-DD' start date) of a packed key"""
+        return self._tickers[key >> 32], day_to_date((key & 0xFFFFFFFF) - DAY_BIAS)
+
+    def key_string(self, key: int) -> str:
+        """Label dictionary key ("<ticker>_<start_date>") of a packed key"""
+        ticker, start_date = self.window(key)
+        return f"{ticker}_{start_date}"
+
+    def key_strings(self, keys) -> List[str]:
+        """Label dictionary keys ("<ticker>_<start_date>") of an array of packed keys"""
+        ticker_ids, days = unpack_keys(keys)
+        tickers = np.array(self._tickers, dtype=str)[ticker_ids] if len(ticker_ids) else np.array([], dtype=str)
+        return np.char.add(np.char.add(tickers, '_'), np.datetime_as_string(days.astype('datetime64[D]'))).tolist()
+
+    def pack_labels(self, labels: dict) -> Dict[int, dict]:
+        """A label dictionary re-keyed by packed keys, built from every label's ticker and start_date"""
+        values = list(labels.values())
+        keys = self.window_keys([value['ticker'] for value in values], [value['start_date'] for value in values])
+        return dict(zip(keys.tolist(), values))
+
+    def parse_key(self, key: str) -> int:
+        """Packed key of a label dictionary key ("<ticker>_<start_date>")"""
+        ticker, start_date = key.rsplit('_', 1)
+        return self.window_key(ticker, start_date)
+
+    def position(self, key: int) -> Optional[int]:
+        """Row position of a window in its ticker's calendar, None if unknown"""
+        calendar = self._calendars.get(key >> 32)
+        return None if calendar is None else calendar.position((key & 0xFFFFFFFF) - DAY_BIAS)
+
+    def position_key(self, ticker: str, pos: int) -> int:
+        """Packed key of the window starting at row `pos` of a ticker registered with add_calendar"""
+        calendar = self.calendar(ticker)
+        if calendar is None:
+            raise ValueError(f"No trading calendar for {ticker}")
+        return pack_key(self._ids[ticker], int(calendar.days[pos]))
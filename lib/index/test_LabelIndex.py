@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from lib.index.LabelIndex import LabelIndex
+
+def _dates():
+    return pd.Index([date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 3), date(2020, 1, 6)])
+
+def test_label_index_from_labels():
+    labels = {
+        'AAPL_2020-01-01': {'ticker': 'AAPL', 'start_date': '2020-01-01'},
+        'AAPL_2020-01-03': {'ticker': 'AAPL', 'start_date': '2020-01-03'},
+        'MSFT_2020-01-02': {'ticker': 'MSFT', 'start_date': '2020-01-02'},
+    }
+    index = LabelIndex.from_labels(_dates(), labels, 'AAPL')
+
+    assert index.labelled_count == 2, f"Expected 2, got {index.labelled_count}"
+    assert index.is_labelled(0) and not index.is_labelled(1) and index.is_labelled(2)
+    assert index.labelled_dates() == [date(2020, 1, 1), date(2020, 1, 3)]
+    print("LabelIndex from_labels test passed.")
+
+def test_label_index_next_unlabelled():
+    index = LabelIndex(_dates())
+    index.mark(0)
+    index.mark(1)
+    index.mark(3)
+
+    assert index.next_unlabelled(0) == 2
+    assert index.next_unlabelled(3) == 2, "Expected search to wrap around to the earliest gap"
+    assert index.next_unlabelled(0, among=np.array([True, True, False, True])) is None
+    index.mark(2)
+    assert index.next_unlabelled(0) is None
+    print("LabelIndex next_unlabelled test passed.")
+
+def test_label_index_mark_and_unmark():
+    index = LabelIndex(_dates())
+    index.mark(1)
+    index.mark(1)
+    assert index.labelled_count == 1, "Marking twice should not double count"
+    assert index.labelled_dates() == [date(2020, 1, 2)]
+
+    index.unmark(1)
+    index.unmark(1)
+    assert index.labelled_count == 0, "Unmarking twice should not go negative"
+    assert index.labelled_dates() == []
+    assert index.position('2020-01-06') == 3
+    assert index.position('2020-01-04') is None
+    assert index.start_date(3) == '2020-01-06'
+    index.mark(2)
+    assert list(index.unlabelled_positions()) == [0, 1, 3]
+    assert list(index.unlabelled_positions(stop=3)) == [0, 1]
+    print("LabelIndex mark/unmark test passed.")
+
+def main():
+    test_label_index_from_labels()
+    test_label_index_next_unlabelled()
+    test_label_index_mark_and_unmark()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from lib.index.WindowIndex import TradingCalendar, WindowIndex, day_to_date, pack_keys, to_day, unpack_keys
+
+def test_day_ordinals():
+    assert to_day('1970-01-02') == 1
+    assert to_day(date(1997, 1, 2)) == to_day('1997-01-02')
+    assert day_to_date(to_day('1965-06-30')) == '1965-06-30'
+    ticker_ids, days = unpack_keys(pack_keys([3, 0], [to_day('1965-06-30'), 10]))
+    assert list(ticker_ids) == [3, 0] and list(days) == [to_day('1965-06-30'), 10]
+    assert pack_keys([0], [-1])[0] < pack_keys([0], [0])[0], "Keys should sort by date before 1970 too"
+    print("day ordinal test passed.")
+
+def test_trading_calendar():
+    calendar = TradingCalendar(pd.Index([date(2020, 1, 2), date(2020, 1, 3), date(2020, 1, 6)]))
+    assert calendar.position(to_day('2020-01-06')) == 2
+    assert calendar.position(to_day('2020-01-04')) is None, "Weekends are not trading days"
+    assert calendar.position(to_day('2019-12-31')) is None
+    assert calendar.position(to_day('2020-01-07')) is None
+    positions = calendar.positions(np.array([to_day('2020-01-03'), to_day('2020-01-05'), to_day('2021-01-01')]))
+    assert list(positions) == [1, -1, -1]
+    assert len(TradingCalendar([])) == 0 and TradingCalendar([]).position(0) is None
+    print("TradingCalendar test passed.")
+
+def test_window_index_keys():
+    index = WindowIndex(['AAPL'])
+    assert index.ticker_id('AAPL') == 0 and index.ticker_id('MSFT') == 1
+    assert index.ticker(1) == 'MSFT' and len(index) == 2
+
+    key = index.parse_key('MSFT_1997-01-03')
+    assert key == index.window_key('MSFT', date(1997, 1, 3))
+    assert index.window(key) == ('MSFT', '1997-01-03')
+    assert index.key_string(key) == 'MSFT_1997-01-03'
+
+    keys = index.window_keys(['MSFT', 'IBM', 'AAPL'], ['1997-01-03', '1997-01-06', '1997-01-02'])
+    assert keys[0] == key
+    assert index.key_string(keys[1]) == 'IBM_1997-01-06' and index.ticker_id('IBM') == 2
+    assert index.key_strings(keys) == ['MSFT_1997-01-03', 'IBM_1997-01-06', 'AAPL_1997-01-02']
+    print("WindowIndex key test passed.")
+
+def test_window_index_positions():
+    index = WindowIndex()
+    index.add_calendar('AAPL', pd.Index([date(2020, 1, 2), date(2020, 1, 3), date(2020, 1, 6)]))
+    assert index.position(index.window_key('AAPL', '2020-01-03')) == 1
+    assert index.position(index.window_key('AAPL', '2020-01-04')) is None
+    assert index.position(index.window_key('MSFT', '2020-01-03')) is None, "No calendar registered for MSFT"
+    assert index.key_string(index.position_key('AAPL', 2)) == 'AAPL_2020-01-06'
+    assert index.calendar('AAPL') is not None and index.calendar('IBM') is None
+    print("WindowIndex position test passed.")
+
+def test_position_key_requires_calendar():
+    index = WindowIndex()
+    index.add_calendar('AAPL', pd.Index([date(2020, 1, 2), date(2020, 1, 3)]))
+    try:
+        index.position_key('FOO', 1)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    assert index.tickers == ['AAPL'], "A failed lookup should not assign a ticker id"
+    print("WindowIndex position key guard test passed.")
+
+def main():
+    test_day_ordinals()
+    test_trading_calendar()
+    test_window_index_keys()
+    test_window_index_positions()
+    test_position_key_requires_calendar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from lib.strategies.vectorized import RSI_COLUMNS
+from typing import Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+RSI_PERIODS = list(range(1, 21))
+EMA_PERIODS = [20, 50, 200]
+EMA_COLUMNS = [f'ema_{period}' for period in EMA_PERIODS]
+INDICATOR_COLUMNS = RSI_COLUMNS + EMA_COLUMNS
+BLOCK_SIZE = 64
+
+def smooth(x: np.ndarray, alphas: np.ndarray, initial: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Exponential smoothing y[t] = (1 - a) * y[t-1] + a * x[t] of every column.
+
+    Each column has its own `alpha`. The recurrence is evaluated a block of
+    BLOCK_SIZE rows at a time as a matrix product with the block's decay
+    weights, so all columns advance together without a Python loop per day,
+    and decay factors never exceed 1.
+
+    Args:
+        x: (n_rows, n_columns) inputs
+        alphas: (n_columns,) smoothing factors in (0, 1]
+        initial: (n_columns,) value of y[-1] (default: zeros)
+
+    Returns:
+        (n_rows, n_columns) smoothed values
+    """
+    x = np.asarray(x, dtype=np.float64)
+    alphas = np.asarray(alphas, dtype=np.float64)
+    decay = 1.0 - alphas
+    n_rows, n_columns = x.shape
+    y = np.empty_like(x)
+    previous = np.zeros(n_columns) if initial is None else np.asarray(initial, dtype=np.float64)
+
+    steps = np.arange(BLOCK_SIZE)
+    lags = steps[:, None] - steps[None, :]
+    # weights[c, t, k] = a * (1 - a) ** (t - k) for k <= t, the contribution of x[k] to y[t]
+    with np.errstate(divide='ignore'):
+        weights = np.where(lags >= 0, decay[:, None, None] ** np.maximum(lags, 0), 0.0) * alphas[:, None, None]
+    carry = decay[None, :] ** (steps[:, None] + 1)  # contribution of y[-1] to y[t]
+
+    for start in range(0, n_rows, BLOCK_SIZE):
+        block = x[start:start + BLOCK_SIZE]
+        size = len(block)
+        y[start:start + size] = np.einsum('ctk,kc->tc', weights[:, :size, :size], block) + carry[:size] * previous
+        previous = y[start + size - 1]
+    return y
+
+def seeded_smooth(values: np.ndarray, periods: Iterable[int], alphas: np.ndarray, seed_rows: np.ndarray) -> np.ndarray:
+    """
+    Smooth one series per period, seeding each with a simple average.
+
+    Column j is NaN before seed_rows[j], equals the mean of the `periods[j]`
+    values ending at seed_rows[j] there, and follows the exponential
+    recurrence afterwards. This is the TA-Lib convention for Wilder's RSI
+    averages and for EMAs.
+
+    Returns:
+        (n_rows, n_periods) smoothed values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    periods = np.asarray(list(periods))
+    rows = np.arange(len(values))
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+
+    valid = seed_rows < len(values)
+    seeds = np.minimum(seed_rows, max(len(values) - 1, 0))
+    seed_means = (cumulative[seeds + 1] - cumulative[np.maximum(seeds - periods + 1, 0)]) / periods
+
+    # Zero the inputs before the seed and place mean / alpha at the seed row, so the
+    # recurrence started from zero reaches exactly the mean there
+    x = np.where(rows[:, None] > seeds[None, :], values[:, None], 0.0)
+    if len(values):
+        x[seeds, np.arange(len(periods))] = seed_means / alphas
+    y = smooth(x, alphas)
+    y[(rows[:, None] < seeds[None, :]) | ~valid[None, :]] = np.nan
+    return y
+
+def rsi(close: np.ndarray, periods: List[int] = RSI_PERIODS) -> np.ndarray:
+    """
+    Wilder's RSI of every period in one pass.
+
+    Returns:
+        (n_days, n_periods) RSI values, NaN until a period has enough history
+        and 50 when prices did not move over the averaging period
+    """
+    close = np.asarray(close, dtype=np.float64)
+    change = np.diff(close, prepend=close[:1])
+    periods_array = np.asarray(periods)
+    alphas = 1.0 / periods_array
+    # Averages at row t cover the changes up to t; the first one needs `period` changes
+    gains = seeded_smooth(np.maximum(change, 0), periods, alphas, periods_array)
+    losses = seeded_smooth(np.maximum(-change, 0), periods, alphas, periods_array)
+    total = gains + losses
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, 100.0 * gains / total, np.where(np.isnan(total), np.nan, 50.0))
+
+def ema(close: np.ndarray, periods: List[int] = EMA_PERIODS) -> np.ndarray:
+    """(n_days, n_periods) EMAs seeded with the simple average of the first `period` closes"""
+    periods_array = np.asarray(periods)
+    return seeded_smooth(close, periods, 2.0 / (periods_array + 1), periods_array - 1)
+
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    rsi_1..rsi_20 and ema_20/50/200 computed from a date-indexed frame of closes.
+
+    The frame must hold the ticker's full history up to its last row, since
+    both indicators depend on every earlier close.
+    """
+    close = df['close'].to_numpy(dtype=np.float64)
+    return pd.DataFrame(
+        np.hstack([rsi(close), ema(close)]),
+        index=df.index,
+        columns=INDICATOR_COLUMNS
+    )
+
+def compare_indicators(stored: pd.DataFrame, computed: pd.DataFrame,
+                       columns: List[str] = INDICATOR_COLUMNS) -> pd.DataFrame:
+    """
+    Differences between stored and computed indicators on their common dates.
+
+    Returns:
+        Frame indexed by column with the number of rows compared (both values
+        present), the maximum and mean absolute difference
+    """
+    stored, computed = stored.align(computed, join='inner', axis=0)
+    report = {}
+    for column in columns:
+        a = stored[column].to_numpy(dtype=np.float64)
+        b = computed[column].to_numpy(dtype=np.float64)
+        present = ~np.isnan(a) & ~np.isnan(b)
+        difference = np.abs(a[present] - b[present])
+        report[column] = {
+            'rows': int(present.sum()),
+            'max_abs_diff': float(difference.max()) if len(difference) else np.nan,
+            'mean_abs_diff': float(difference.mean()) if len(difference) else np.nan,
+        }
+    return pd.DataFrame.from_dict(report, orient='index')
@@ -1,27 +1,128 @@
 from lib.models.MarketData import MarketData
 from lib.models.EquityIndicators import EquityIndicators
-from typing import List, Tuple
-from sqlalchemy import select
-from lib.db.session import create_db_session
+from lib.constants import LABEL_COLUMNS
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterable, List, Optional
+from datetime import date
+from sqlalchemy import Select, false, func, or_, select
+from lib.db.session import create_engine_session, create_env_db_engine
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 import os
 import pandas as pd
 
-def get_ticker_data(db_session: Session, ticker: str) -> List[Tuple[MarketData, EquityIndicators]]:
+# PyArrow, the indicators and WindowIndex are imported in the functions that use
+# them, so commands that only query the database do not load them
+if TYPE_CHECKING:
+    from lib.index.WindowIndex import WindowIndex
+
+# The columns load_data returns; the (ticker, report_date) indexes INCLUDE exactly
+# these on Postgres, so ticker_data_query can be answered by index-only scans
+TICKER_DATA_COLUMNS = [
+    MarketData.report_date.label('date'),
+    MarketData.close,
+    MarketData.open,
+    MarketData.high,
+    MarketData.low,
+    MarketData.volume,
+    *[getattr(EquityIndicators, f'rsi_{i}') for i in range(1, 21)],
+    EquityIndicators.ema_20,
+    EquityIndicators.ema_50,
+    EquityIndicators.ema_200,
+]
+
+def ticker_data_query(ticker: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Select:
+    """Query joining the TICKER_DATA_COLUMNS of a ticker's market_data and equity_indicators rows, ordered by report date"""
+    query = (
+        select(*TICKER_DATA_COLUMNS)
+        .join(
+            EquityIndicators,
+            (MarketData.ticker == EquityIndicators.ticker) &
+            (MarketData.report_date == EquityIndicators.report_date)
+        )
+        .where(MarketData.ticker == ticker)
+        .order_by(MarketData.report_date)
+    )
+    if start_date is not None:
+        query = query.where(MarketData.report_date >= start_date)
+    if end_date is not None:
+        query = query.where(MarketData.report_date <= end_date)
+    return query
+
+def get_ticker_data(db_session: Session, ticker: str, start_date: Optional[date] = None,
+                    end_date: Optional[date] = None) -> List[Row]:
     """
     Get combined market data and equity indicators for a specific ticker.
     
     Args:
         db_session: SQLAlchemy database session
         ticker: Stock ticker symbol
+        start_date: Optional first report date to include
+        end_date: Optional last report date to include
         
     Returns:
-        List of tuples containing joined MarketData and EquityIndicators records
+        Rows of the joined TICKER_DATA_COLUMNS
     """
-    # Create a query that joins MarketData and EquityIndicators tables
+    # Execute the query and return results
+    result = db_session.execute(ticker_data_query(ticker, start_date, end_date)).all()
+    return result
+
+def count_ticker_rows(db_session: Session, tickers: Iterable[str], start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> Dict[str, int]:
+    """Count the market data rows of each ticker in one GROUP BY query; tickers without rows are left out"""
+    query = (
+        select(MarketData.ticker, func.count())
+        .where(MarketData.ticker.in_(list(tickers)))
+        .group_by(MarketData.ticker)
+    )
+    if start_date is not None:
+        query = query.where(MarketData.report_date >= start_date)
+    if end_date is not None:
+        query = query.where(MarketData.report_date <= end_date)
+    return dict(db_session.execute(query).all())
+
+def get_trading_dates(db_session: Session, tickers: Iterable[str], start_date: Optional[date] = None,
+                      end_date: Optional[date] = None) -> List[date]:
+    """Sorted distinct report dates on which any of the tickers has market data"""
     query = (
-        select(MarketData, EquityIndicators)
+        select(MarketData.report_date)
+        .where(MarketData.ticker.in_(list(tickers)))
+        .distinct()
+        .order_by(MarketData.report_date)
+    )
+    if start_date is not None:
+        query = query.where(MarketData.report_date >= start_date)
+    if end_date is not None:
+        query = query.where(MarketData.report_date <= end_date)
+    return list(db_session.scalars(query))
+
+MARKET_DATA_COLUMNS = [
+    MarketData.report_date.label('date'),
+    MarketData.close,
+    MarketData.open,
+    MarketData.high,
+    MarketData.low,
+    MarketData.volume
+]
+
+def get_market_data(db_session: Session, ticker: str, end_date: Optional[date] = None) -> pd.DataFrame:
+    """Get the market_data rows of a ticker up to end_date as a date-indexed DataFrame, without indicators"""
+    query = select(*MARKET_DATA_COLUMNS).where(MarketData.ticker == ticker).order_by(MarketData.report_date)
+    if end_date is not None:
+        query = query.where(MarketData.report_date <= end_date)
+    rows = db_session.execute(query).all()
+    df = pd.DataFrame(rows, columns=[column.name for column in MARKET_DATA_COLUMNS])
+    df.set_index('date', inplace=True)
+    return df
+
+STRATEGY_INPUT_COLUMNS = [MarketData.report_date.label('date'), MarketData.close] + [
+    getattr(EquityIndicators, f'rsi_{i}') for i in range(1, 21)
+]
+
+def strategy_inputs_query(ticker: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Select:
+    """Query for only the close and rsi_1..rsi_20 columns the strategies read, ordered by report date"""
+    query = (
+        select(*STRATEGY_INPUT_COLUMNS)
         .join(
             EquityIndicators,
             (MarketData.ticker == EquityIndicators.ticker) &
@@ -30,83 +131,190 @@ def get_ticker_data(db_session: Session, ticker: str) -> List[Tuple[MarketData,
         .where(MarketData.ticker == ticker)
         .order_by(MarketData.report_date)
     )
-    
-    # Execute the query and return results
-    result = db_session.execute(query).all()
-    return result
+    if start_date is not None:
+        query = query.where(MarketData.report_date >= start_date)
+    if end_date is not None:
+        query = query.where(MarketData.report_date <= end_date)
+    return query
+
+def get_strategy_inputs(db_session: Session, ticker: str, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None) -> pd.DataFrame:
+    """Get only the close and rsi_1..rsi_20 columns the strategies read, as a date-indexed DataFrame"""
+    rows = db_session.execute(strategy_inputs_query(ticker, start_date, end_date)).all()
+    df = pd.DataFrame(rows, columns=[column.name for column in STRATEGY_INPUT_COLUMNS])
+    df.set_index('date', inplace=True)
+    return df
+
+def get_bars(db_session: Session, tickers: Iterable[str], after_date: Optional[date] = None,
+             last_rows: Optional[int] = None, after_dates: Optional[Dict[str, date]] = None) -> pd.DataFrame:
+    """
+    Daily bars (ticker, date, close and rsi_1..rsi_20) of several tickers, ordered by date and ticker.
+
+    Args:
+        db_session: SQLAlchemy database session
+        tickers: Stock ticker symbols
+        after_date: Only bars after this date
+        after_dates: Only each ticker's bars after its own date; tickers
+            sharing a date are filtered together, so the condition stays
+            small when most tickers are up to date
+        last_rows: Only each ticker's latest `last_rows` bars, numbered with
+            ROW_NUMBER in the database
+    """
+    rsi_columns = [getattr(EquityIndicators, f'rsi_{i}') for i in range(1, 21)]
+    columns = [MarketData.ticker, MarketData.report_date.label('date'), MarketData.close, *rsi_columns]
+    if last_rows is not None:
+        columns.append(
+            func.row_number().over(partition_by=MarketData.ticker, order_by=MarketData.report_date.desc()).label('age')
+        )
+    query = (
+        select(*columns)
+        .join(
+            EquityIndicators,
+            (MarketData.ticker == EquityIndicators.ticker) &
+            (MarketData.report_date == EquityIndicators.report_date)
+        )
+        .where(MarketData.ticker.in_(list(tickers)))
+    )
+    if after_date is not None:
+        query = query.where(MarketData.report_date > after_date)
+    if after_dates is not None:
+        groups: Dict[date, List[str]] = {}
+        for ticker, after in after_dates.items():
+            groups.setdefault(after, []).append(ticker)
+        query = query.where(or_(false(), *[
+            MarketData.ticker.in_(group) & (MarketData.report_date > after) for after, group in sorted(groups.items())
+        ]))
+    if last_rows is not None:
+        bars = query.subquery('bars')
+        query = select(*[bars.c[column.name] for column in columns[:-1]]).where(bars.c.age <= last_rows)
+        query = query.order_by(bars.c.date, bars.c.ticker)
+    else:
+        query = query.order_by(MarketData.report_date, MarketData.ticker)
+    rows = db_session.execute(query).all()
+    return pd.DataFrame(rows, columns=['ticker', 'date', 'close'] + [column.name for column in rsi_columns])
 
-def load_data(ticker: str):
-    """Load and prepare data for the given ticker"""
+def indicator_source() -> str:
+    """'stored' to join fyp.equity_indicators, or 'computed' (INDICATORS=computed) to compute them from closes"""
     load_dotenv()
+    return os.getenv("INDICATORS", "stored")
+
+def load_data(ticker: str, db_context: Optional[ContextManager[Session]] = None,
+              start_date: Optional[date] = None, end_date: Optional[date] = None,
+              indicators: Optional[str] = None):
+    """
+    Load and prepare data for the given ticker
     
-    db_context = create_db_session(
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST"),
-        port=os.getenv("DB_PORT"),
-        database=os.getenv("DB_NAME")
-    )
+    Args:
+        ticker: Stock ticker symbol
+        db_context: Session context manager to reuse; a new engine is created
+            from the environment when omitted
+        start_date: Optional first date to load
+        end_date: Optional last date to load
+        indicators: 'stored' to join the equity_indicators table, 'computed'
+            to query market_data alone and compute the indicators from the
+            closes (default: the INDICATORS environment variable, else 'stored')
+    """
+    if db_context is None:
+        db_context = create_engine_session(create_env_db_engine())
+    if indicators is None:
+        indicators = indicator_source()
+    
+    if indicators == 'computed':
+        with db_context() as session:
+            # Indicators depend on every earlier close, so load the history before start_date too
+            df = get_market_data(session, ticker, end_date)
+        if df.empty:
+            return None
+        from lib.indicators import compute_indicators
+        df = df.join(compute_indicators(df))
+        return df if start_date is None else df[df.index >= start_date]
+    if indicators != 'stored':
+        raise ValueError(f"Unknown indicator source {indicators!r}, expected 'stored' or 'computed'")
     
     with db_context() as session:
-        data = get_ticker_data(session, ticker)
+        rows = get_ticker_data(session, ticker, start_date, end_date)
+    if not rows:
+        return None
+    df = pd.DataFrame(rows, columns=[column.name for column in TICKER_DATA_COLUMNS])
+    df.set_index('date', inplace=True)
+    return df
+    
+SNAPSHOT_SOURCE_KEY = b'fyp.source'
+
+def _source_stamp(filename: str) -> bytes:
+    """Size and nanosecond mtime of a file, recorded in (and compared with) its snapshot"""
+    stat = os.stat(filename)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+def _read_label_frame(filename: str, snapshot: Optional[str]) -> pd.DataFrame:
+    """Read the label CSV, or its Feather snapshot when it was built from the CSV as it is now"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    stamp = _source_stamp(filename)
+    if snapshot is not None and os.path.exists(snapshot):
+        try:
+            table = feather.read_table(snapshot, columns=LABEL_COLUMNS)
+        except (OSError, pa.ArrowException):
+            table = None
+        if table is not None and (table.schema.metadata or {}).get(SNAPSHOT_SOURCE_KEY) == stamp:
+            return table.to_pandas()
+    
+    df = pd.read_csv(filename, usecols=LABEL_COLUMNS, dtype={column: str for column in LABEL_COLUMNS})
+    if snapshot is not None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        try:
+            feather.write_feather(table.replace_schema_metadata({**table.schema.metadata, SNAPSHOT_SOURCE_KEY: stamp}), snapshot)
+        except OSError:
+            pass  # The snapshot is only an accelerator
+    return df
+
+def load_labels(filename: str = "labels.csv", snapshot: Optional[str] = None) -> dict:
+    """
+    Load labels from a CSV file
+    
+    The dictionary is built straight from the column arrays instead of
+    iterating over DataFrame rows.
+    
+    Args:
+        filename: Label CSV written by save_labels
+        snapshot: Optional Feather file caching the parsed CSV; it is read
+            instead of the CSV when the CSV's size and mtime match the ones
+            it was built from, and rewritten otherwise
         
-        if not data:
-            return None
-            
-        # Convert to DataFrame
-        records = []
-        for market_data, indicators in data:
-            record = {
-                'date': market_data.report_date,
-                'close': market_data.close,
-                'open': market_data.open,  # Add open
-                'high': market_data.high,  # Add high
-                'low': market_data.low,    # Add low
-                'volume': market_data.volume,  # Added volume
-                'rsi_1': indicators.rsi_1,  # Add RSI 1
-                'rsi_2': indicators.rsi_2,  # Add RSI 2
-                'rsi_3': indicators.rsi_3,  # Add RSI 3
-                'rsi_4': indicators.rsi_4,  # Add RSI 4
-                'rsi_5': indicators.rsi_5,  # Add RSI 5
-                'rsi_6': indicators.rsi_6,  # Add RSI 6
-                'rsi_7': indicators.rsi_7,  # Add RSI 7
-                'rsi_8': indicators.rsi_8,  # Add RSI 8
-                'rsi_9': indicators.rsi_9,  # Add RSI 9
-                'rsi_10': indicators.rsi_10,  # Add RSI 10
-                'rsi_11': indicators.rsi_11,  # Add RSI 11
-                'rsi_12': indicators.rsi_12,  # Add RSI 12
-                'rsi_13': indicators.rsi_13,  # Add RSI 13
-                'rsi_14': indicators.rsi_14,  # Add RSI 14
-                'rsi_15': indicators.rsi_15,  # Add RSI 15
-                'rsi_16': indicators.rsi_16,  # Add RSI 16
-                'rsi_17': indicators.rsi_17,  # Add RSI 17
-                'rsi_18': indicators.rsi_18,  # Add RSI 18
-                'rsi_19': indicators.rsi_19,  # Add RSI 19
-                'rsi_20': indicators.rsi_20,  # Add RSI 20
-                'ema_20': indicators.ema_20,
-                'ema_50': indicators.ema_50,
-                'ema_200': indicators.ema_200
-            }
-            records.append(record)
-            
-        df = pd.DataFrame(records)
-        df.set_index('date', inplace=True)
-        return df
+    Returns:
+        Label dictionary keyed by "<ticker>_<start_date>", empty if the file does not exist
+    """
+    try:
+        df = _read_label_frame(filename, snapshot)
+    except FileNotFoundError:
+        return {}
     
-def save_labels(labels: dict, filename: str = "labels.csv"):
-    """Save labels to a CSV file"""
-    # Convert dictionary to DataFrame
-    records = []
-    for key, value in labels.items():
-        record = {
-            'key': key,
-            'ticker': value['ticker'],
-            'start_date': value['start_date'],
-            'end_date': value['end_date'],
-            'pattern': value['pattern'],
-            'timestamp': value['timestamp']
+    keys, tickers, start_dates, end_dates, patterns, timestamps = (df[column].tolist() for column in LABEL_COLUMNS)
+    return {
+        key: {
+            'ticker': ticker,
+            'start_date': start_date,
+            'end_date': end_date,
+            'pattern': pattern,
+            'timestamp': timestamp
         }
-        records.append(record)
-    
-    df = pd.DataFrame(records)
+        for key, ticker, start_date, end_date, pattern, timestamp
+        in zip(keys, tickers, start_dates, end_dates, patterns, timestamps)
+    }
+
+def save_labels(labels: dict, filename: str = "labels.csv", window_index: Optional['WindowIndex'] = None):
+    """
+    Save labels to a CSV file
+
+    Args:
+        labels: Label dictionary keyed by "<ticker>_<start_date>", or by
+            packed keys of `window_index`
+        filename: Output CSV
+        window_index: Index the packed keys belong to; their string keys are
+            only built here, for the whole file at once
+    """
+    keys = window_index.key_strings(list(labels)) if window_index is not None else list(labels)
+    df = pd.DataFrame.from_records(list(labels.values()), columns=LABEL_COLUMNS[1:])
+    df.insert(0, 'key', keys)
     df.to_csv(filename, index=False)
\ No newline at end of file
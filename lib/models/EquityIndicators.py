@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Date, Float, BigInteger, String, schema
+from sqlalchemy import Column, Date, Float, BigInteger, Index, String, schema
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 class EquityIndicators(Base):
     __tablename__ = 'equity_indicators'
-    __table_args__ = {'schema': 'fyp'}
+    __table_args__ = (
+        # INCLUDE (Postgres) holds the indicator columns of labeller.TICKER_DATA_COLUMNS
+        # (rsi_1..rsi_20 are also all strategy_inputs_query reads), and nothing else
+        Index('ix_equity_indicators_ticker_report_date', 'ticker', 'report_date',
+              postgresql_include=[f'rsi_{i}' for i in range(1, 21)] + ['ema_20', 'ema_50', 'ema_200']),
+        {'schema': 'fyp'}
+    )
 
     # Composite primary key
     ticker = Column(String, primary_key=True)
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Date, Float, Integer, String, schema
+from sqlalchemy import Column, Date, Float, Index, Integer, String, schema
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 class MarketData(Base):
     __tablename__ = 'market_data'
-    __table_args__ = {'schema': 'fyp'}
+    __table_args__ = (
+        # The primary key leads with report_date; per-ticker queries need ticker first.
+        # INCLUDE (Postgres) holds the market_data columns of labeller.TICKER_DATA_COLUMNS, so
+        # ticker_data_query and strategy_inputs_query can use index-only scans
+        Index('ix_market_data_ticker_report_date', 'ticker', 'report_date',
+              postgresql_include=['close', 'open', 'high', 'low', 'volume']),
+        {'schema': 'fyp'}
+    )
 
     report_date = Column(Date, primary_key=True)
     ticker = Column(String, primary_key=True)
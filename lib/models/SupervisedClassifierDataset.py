@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, String, Integer, schema
+from sqlalchemy import Column, Date, Index, String, Integer, schema
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -9,7 +9,11 @@ class SupervisedClassifierDataset(Base):
     This table stores labeled data for training/testing classification models.
     """
     __tablename__ = 'supervised_classifier_dataset'
-    __table_args__ = {'schema': 'fyp'}  # As shown in the image
+    __table_args__ = (
+        Index('ix_supervised_classifier_dataset_ticker_start_date', 'ticker', 'start_date',
+              postgresql_include=['end_date', 'label']),
+        {'schema': 'fyp'}  # As shown in the image
+    )
 
     # Primary key columns (assuming composite key of start_date, end_date, ticker)
     start_date = Column(Date, primary_key=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Date, Float, Integer, String, schema
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+class WindowReturns(Base):
+    """
+    SQLAlchemy model for per-window strategy returns computed in the database.
+    Rows are filled with INSERT ... SELECT from market_data (see lib.db.window_returns).
+    """
+    __tablename__ = 'window_returns'
+    __table_args__ = {'schema': 'fyp'}
+
+    ticker = Column(String, primary_key=True)
+    start_date = Column(Date, primary_key=True)
+    window_size = Column(Integer, primary_key=True)
+    end_date = Column(Date)
+    buy_and_hold = Column(Float(53))
+    sell_and_hold = Column(Float(53))
+
+    def __repr__(self):
+        return (f"<WindowReturns("
+                f"ticker={self.ticker}, "
+                f"start_date={self.start_date}, "
+                f"window_size={self.window_size})>")
@@ -0,0 +1,150 @@
+from lib.constants import LABEL_COLUMNS
+from lib.strategies.vectorized import DECISION_ORDER, RSI_COLUMNS, mean_reversion_returns, rsi_decisions
+from lib.index.WindowIndex import day_to_date, to_day
+from typing import Dict, Iterable, List, Optional
+import os
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ['ticker', 'date', 'close'] + RSI_COLUMNS
+
+class TickerBuffer:
+    """
+    The last `window_size` bars of one ticker in a ring buffer.
+
+    Only what the strategies need is kept: the day, the close and the Mean
+    Reversion decision of every bar (decided when the bar arrives, since it
+    only depends on that day's RSI values).
+    """
+    def __init__(self, window_size: int = 20):
+        self.window_size = window_size
+        self.days = np.zeros(window_size, dtype=np.int64)
+        self.closes = np.zeros(window_size, dtype=np.float64)
+        self.decisions = np.zeros(window_size, dtype=np.int8)
+        self.count = 0  # bars seen, so the buffer is full once count >= window_size
+        self.last_day: Optional[int] = None
+
+    def push(self, day: int, close: float, decision: int):
+        slot = self.count % self.window_size
+        self.days[slot] = day
+        self.closes[slot] = close
+        self.decisions[slot] = decision
+        self.count += 1
+        self.last_day = day
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.window_size
+
+    def window(self):
+        """(days, closes, decisions) of the buffered bars, oldest first"""
+        order = (self.count + np.arange(self.window_size)) % self.window_size
+        return self.days[order], self.closes[order], self.decisions[order]
+
+class OnlineLabeller:
+    """
+    Labels windows as daily bars arrive, one bar at a time.
+
+    Every ticker has a TickerBuffer; a bar that fills it completes exactly
+    one window (ending on that bar), which is labelled from the buffer in
+    O(window_size) with the same vectorized strategy code as the batch
+    labeller, so labels match auto_labeller.py on the same history.
+
+    Bars must arrive in date order per ticker; a bar not newer than the
+    ticker's last one is ignored, so replaying overlapping input is safe.
+    """
+    def __init__(self, window_size: int = 20):
+        self.window_size = window_size
+        self.buffers: Dict[str, TickerBuffer] = {}
+
+    def last_date(self, ticker: str) -> Optional[str]:
+        """'YYYY-MM-DD' date of the ticker's latest bar, or None"""
+        buffer = self.buffers.get(ticker)
+        return None if buffer is None or buffer.last_day is None else day_to_date(buffer.last_day)
+
+    def _buffer(self, ticker: str) -> TickerBuffer:
+        buffer = self.buffers.get(ticker)
+        if buffer is None:
+            buffer = self.buffers[ticker] = TickerBuffer(self.window_size)
+        return buffer
+
+    def update(self, ticker: str, date, close: float, rsi: Iterable[float], timestamp: str = '') -> Optional[dict]:
+        """
+        Add one bar.
+
+        Returns:
+            The label row (LABEL_COLUMNS) of the window ending on this bar, or
+            None if the ticker has fewer than window_size bars or the bar is
+            not newer than its last one
+        """
+        day = to_day(date)
+        buffer = self._buffer(ticker)
+        if buffer.last_day is not None and day <= buffer.last_day:
+            return None
+        decision = rsi_decisions(np.asarray(rsi, dtype=np.float64).reshape(1, -1))[0]
+        buffer.push(day, float(close), decision)
+        if not buffer.full:
+            return None
+
+        days, closes, decisions = buffer.window()
+        buy_and_hold = (closes[-1] - closes[0]) / closes[0] * 100
+        mean_reversion = mean_reversion_returns(closes, decisions, self.window_size, np.zeros(1, dtype=np.int64))[0]
+        start_date = day_to_date(days[0])
+        return {
+            'key': f"{ticker}_{start_date}",
+            'ticker': ticker,
+            'start_date': start_date,
+            'end_date': day_to_date(days[-1]),
+            'pattern': DECISION_ORDER[int(np.argmax([buy_and_hold, mean_reversion, -buy_and_hold]))],
+            'timestamp': timestamp,
+        }
+
+    def update_bars(self, bars: pd.DataFrame, timestamp: str = '') -> pd.DataFrame:
+        """Add a frame of bars (BAR_COLUMNS) in date order and return the labels they completed"""
+        labels = []
+        rsi = bars[RSI_COLUMNS].to_numpy(dtype=np.float64)
+        for i, (ticker, date, close) in enumerate(zip(bars['ticker'], bars['date'], bars['close'])):
+            label = self.update(str(ticker), date, close, rsi[i], timestamp)
+            if label is not None:
+                labels.append(label)
+        return pd.DataFrame(labels, columns=LABEL_COLUMNS)
+
+def read_bar_file(filename: str) -> pd.DataFrame:
+    """Bars from a CSV with BAR_COLUMNS, sorted by date"""
+    bars = pd.read_csv(filename, dtype={'ticker': str, 'date': str})
+    missing = [column for column in BAR_COLUMNS if column not in bars.columns]
+    if missing:
+        raise ValueError(f"{filename} is missing columns: {', '.join(missing)}")
+    return bars.sort_values('date', kind='stable', ignore_index=True)
+
+class DirectoryWatcher:
+    """
+    New bar files dropped into a directory.
+
+    Writers should create files under a name starting with '.' or ending in
+    '.tmp' and rename them into place, so half-written files are never read.
+    Handled files are moved to `processed/` (or `failed/`) in the directory.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.processed = os.path.join(directory, 'processed')
+        self.failed = os.path.join(directory, 'failed')
+        os.makedirs(self.processed, exist_ok=True)
+        os.makedirs(self.failed, exist_ok=True)
+
+    def pending(self) -> List[str]:
+        """Paths of the files waiting to be handled, in name order"""
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if not name.startswith('.') and not name.endswith('.tmp')
+            and os.path.isfile(os.path.join(self.directory, name))
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def done(self, filename: str, failed: bool = False):
+        os.replace(filename, os.path.join(self.failed if failed else self.processed, os.path.basename(filename)))
+
+def append_labels(labels: pd.DataFrame, filename: str):
+    """Append label rows to a CSV in the auto_labels.csv layout, writing the header for a new file"""
+    new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+    labels[LABEL_COLUMNS].to_csv(filename, mode='a', index=False, header=new_file)
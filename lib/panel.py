@@ -0,0 +1,229 @@
+from lib.index.WindowIndex import to_days
+from lib.labeller import get_trading_dates, load_data
+from lib.strategies.vectorized import (
+    DECISION_ORDER, RSI_COLUMNS, buy_and_hold_returns, mean_reversion_returns, rsi_decisions
+)
+from typing import ContextManager, Dict, Iterable, List, Optional
+from datetime import date
+import json
+import os
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS = ['close'] + RSI_COLUMNS
+TICKER_BLOCK = 256  # Tickers labelled together; bounds the working set of memory-mapped panels
+
+def available_memory() -> Optional[int]:
+    """Bytes of physical memory currently free, or None where the OS does not report it"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+class Panel:
+    """
+    Date-aligned values of many tickers.
+
+    `values` is a dense (dates, tickers, fields) float32 array on the union of
+    the tickers' trading dates and `valid` a (dates, tickers) mask of the
+    cells a ticker actually has data for (the others hold NaN). A panel kept
+    in a directory is memory-mapped from values.npy, valid.npy and
+    panel.json, so it can be larger than RAM.
+
+    Windows are runs of `window_size` consecutive panel dates; a ticker's
+    window is valid only when the ticker has data on all of them, so a window
+    spanning a day the ticker did not trade is skipped rather than stretched.
+    """
+    def __init__(self, dates: Iterable, tickers: List[str], fields: List[str],
+                 values: np.ndarray, valid: np.ndarray, directory: Optional[str] = None):
+        self.days = to_days(dates).astype(np.int64)
+        self.dates = pd.Index(np.asarray(self.days, dtype='datetime64[D]').astype(object), name='date')
+        self.tickers = list(tickers)
+        self.fields = list(fields)
+        self.values = values
+        self.valid = valid
+        self.directory = directory
+        self._ticker_positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    @classmethod
+    def allocate(cls, dates: Iterable, tickers: List[str], fields: List[str] = PANEL_FIELDS,
+                 directory: Optional[str] = None) -> "Panel":
+        """
+        Empty panel (all cells invalid).
+
+        The arrays are memory-mapped files in `directory` when one is given, or
+        in a new temporary directory when they would not fit in free memory.
+        """
+        days = to_days(dates)
+        shape = (len(days), len(tickers), len(fields))
+        memory = available_memory()
+        if directory is None and memory is not None and np.prod(shape) * 4 > memory:
+            directory = tempfile.mkdtemp(prefix='panel-')
+        if directory is None:
+            values = np.full(shape, np.nan, dtype=np.float32)
+            valid = np.zeros(shape[:2], dtype=bool)
+        else:
+            os.makedirs(directory, exist_ok=True)
+            values = np.lib.format.open_memmap(os.path.join(directory, 'values.npy'), 'w+', np.float32, shape)
+            values[:] = np.nan
+            valid = np.lib.format.open_memmap(os.path.join(directory, 'valid.npy'), 'w+', bool, shape[:2])
+            with open(os.path.join(directory, 'panel.json'), 'w') as f:
+                json.dump({'days': days.tolist(), 'tickers': list(tickers), 'fields': list(fields)}, f)
+        return cls(days.astype('datetime64[D]'), tickers, fields, values, valid, directory)
+
+    @classmethod
+    def open(cls, directory: str, mode: str = 'r') -> "Panel":
+        """Memory-map a panel written by allocate (mode 'r' or 'r+')"""
+        with open(os.path.join(directory, 'panel.json')) as f:
+            meta = json.load(f)
+        return cls(
+            np.array(meta['days'], dtype='datetime64[D]'), meta['tickers'], meta['fields'],
+            np.load(os.path.join(directory, 'values.npy'), mmap_mode=mode),
+            np.load(os.path.join(directory, 'valid.npy'), mmap_mode=mode),
+            directory
+        )
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], fields: List[str] = PANEL_FIELDS,
+                    directory: Optional[str] = None) -> "Panel":
+        """Panel of date-indexed ticker frames (as returned by load_data) on the union of their dates"""
+        days = np.unique(np.concatenate([to_days(df.index) for df in frames.values()] or [np.empty(0, np.int64)]))
+        panel = cls.allocate(days.astype('datetime64[D]'), list(frames), fields, directory)
+        for ticker, df in frames.items():
+            panel.set_ticker(ticker, df)
+        panel.flush()
+        return panel
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def set_ticker(self, ticker: str, df: pd.DataFrame):
+        """Fill a ticker's cells from its date-indexed frame; dates outside the panel are ignored"""
+        t = self._ticker_positions[ticker]
+        days = to_days(df.index)
+        rows = np.minimum(np.searchsorted(self.days, days), max(len(self.days) - 1, 0))
+        present = (self.days[rows] == days) if len(self.days) else np.zeros(len(days), dtype=bool)
+        self.values[rows[present], t, :] = df[self.fields].to_numpy(dtype=np.float32)[present]
+        self.valid[rows[present], t] = True
+
+    def flush(self):
+        for array in (self.values, self.valid):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def field(self, name: str) -> np.ndarray:
+        """(dates, tickers) view of one field"""
+        return self.values[:, :, self.fields.index(name)]
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """A ticker's valid rows as a date-indexed frame"""
+        t = self._ticker_positions[ticker]
+        rows = np.flatnonzero(self.valid[:, t])
+        return pd.DataFrame(self.values[rows, t, :], index=self.dates[rows], columns=self.fields)
+
+    def aggregate(self, name: str, how: str = 'mean') -> pd.Series:
+        """Per-date mean, median, sum, min, max or count of a field over the tickers with data"""
+        functions = {'mean': np.nanmean, 'median': np.nanmedian, 'sum': np.nansum, 'min': np.nanmin, 'max': np.nanmax}
+        if how != 'count' and how not in functions:
+            raise ValueError(f"Unknown aggregate {how!r}, expected one of {['count'] + list(functions)}")
+        values = np.where(self.valid, self.field(name), np.nan)
+        if how == 'count':
+            result = (~np.isnan(values)).sum(axis=1)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN dates
+                result = functions[how](values, axis=1)
+        return pd.Series(result, index=self.dates, name=f"{name}_{how}")
+
+    def window_starts(self, window_size: int) -> np.ndarray:
+        return np.arange(max(len(self.days) - window_size + 1, 0))
+
+    def window_validity(self, window_size: int = 20) -> np.ndarray:
+        """(windows, tickers) mask of the windows a ticker has data for on every day"""
+        starts = self.window_starts(window_size)
+        counts = np.concatenate([np.zeros((1, len(self.tickers)), np.int64), np.cumsum(self.valid, axis=0)])
+        return counts[starts + window_size] - counts[starts] == window_size
+
+    def strategy_returns(self, window_size: int = 20, block: int = TICKER_BLOCK) -> np.ndarray:
+        """
+        (windows, tickers, 3) returns of Buy-and-Hold, Mean Reversion and
+        Sell-and-Hold (in DECISION_ORDER), NaN for invalid windows.
+
+        All tickers of a block are simulated together; only one block of the
+        panel is read into memory at a time.
+        """
+        starts = self.window_starts(window_size)
+        close_field = self.fields.index('close')
+        rsi_fields = [self.fields.index(column) for column in RSI_COLUMNS]
+        returns = np.full((len(starts), len(self.tickers), len(DECISION_ORDER)), np.nan)
+        for first in range(0, len(self.tickers), block):
+            tickers = slice(first, first + block)
+            close = np.ascontiguousarray(self.values[:, tickers, close_field].T, dtype=np.float64)
+            rsi = np.asarray(self.values[:, tickers, :][:, :, rsi_fields], dtype=np.float64).transpose(1, 0, 2)
+            decisions = rsi_decisions(rsi.reshape(-1, len(rsi_fields))).reshape(close.shape)
+
+            buy_and_hold = buy_and_hold_returns(close, window_size, starts).T
+            returns[:, tickers, 0] = buy_and_hold
+            returns[:, tickers, 1] = mean_reversion_returns(close, decisions, window_size, starts).T
+            returns[:, tickers, 2] = -buy_and_hold
+        returns[~self.window_validity(window_size)] = np.nan
+        return returns
+
+    def label_windows(self, window_size: int = 20, relative: bool = False,
+                      returns: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (windows, tickers) int8 label of every window as an index into
+        vectorized.DECISION_ORDER, -1 for invalid windows.
+
+        With `relative`, every strategy's return is taken relative to its
+        mean over the tickers with a valid window that day, so a window is an
+        uptrend when holding it beat holding the universe.
+        """
+        if returns is None:
+            returns = self.strategy_returns(window_size)
+        valid = ~np.isnan(returns[:, :, 0])
+        if relative:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # Dates without valid windows
+                returns = returns - np.nanmean(returns, axis=1, keepdims=True)
+        labels = np.argmax(np.where(valid[:, :, None], returns, -np.inf), axis=2).astype(np.int8)
+        labels[~valid] = -1
+        return labels
+
+    def cross_section(self, labels: np.ndarray) -> pd.DataFrame:
+        """
+        Share of each pattern among the tickers with a valid window, per window start date.
+
+        Returns:
+            Frame indexed by start date with the number of `tickers` and one
+            share column per pattern
+        """
+        counts = np.stack([(labels == code).sum(axis=1) for code in range(len(DECISION_ORDER))], axis=1)
+        tickers = counts.sum(axis=1)
+        shares = counts / np.maximum(tickers, 1)[:, None]
+        report = pd.DataFrame(shares, index=self.dates[:len(labels)], columns=DECISION_ORDER)
+        report.insert(0, 'tickers', tickers)
+        return report
+
+def load_panel(tickers: Iterable[str], db_context: ContextManager, start_date: Optional[date] = None,
+               end_date: Optional[date] = None, fields: List[str] = PANEL_FIELDS,
+               directory: Optional[str] = None, indicators: Optional[str] = None) -> Panel:
+    """
+    Panel of tickers loaded with load_data, one ticker at a time.
+
+    The trading dates are queried first, so the panel (memory-mapped when
+    `directory` is given or it would not fit in memory) is filled in place
+    without holding every ticker's frame.
+    """
+    tickers = list(tickers)
+    with db_context() as session:
+        dates = get_trading_dates(session, tickers, start_date, end_date)
+    panel = Panel.allocate(dates, tickers, fields, directory)
+    for ticker in tickers:
+        df = load_data(ticker, db_context, start_date, end_date, indicators=indicators)
+        if df is not None:
+            panel.set_ticker(ticker, df)
+    panel.flush()
+    return panel
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+import threading
+
+class Prefetcher:
+    """
+    Bounded cache of results computed ahead of time on a small thread pool.
+
+    Jobs are identified by a hashable key. `submit` schedules a job in the
+    background if its key is not already cached; `get` returns the cached
+    result (waiting for it if still running) or computes it in the calling
+    thread. The least recently used entries are dropped once `max_entries`
+    is exceeded.
+    """
+    def __init__(self, max_workers: int = 2, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._entries: "OrderedDict[Hashable, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, key: Hashable, future: Future):
+        self._entries[key] = future
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            evicted.cancel()
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) in the background unless key is already cached"""
+        with self._lock:
+            if key in self._entries:
+                return
+            self._store(key, self._executor.submit(fn, *args, **kwargs))
+
+    def get(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Return the result for key, computing it in the calling thread on a miss"""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception:
+                # A failed background job is retried in the foreground so the error surfaces here
+                pass
+        result = fn(*args, **kwargs)
+        done = Future()
+        done.set_result(result)
+        with self._lock:
+            self._store(key, done)
+        return result
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return the result for key if it is ready, without waiting or computing it; counts as a use"""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return default
+        return future.result()
+
+    def discard(self, key: Hashable):
+        """Drop a cached entry so the next get recomputes it"""
+        with self._lock:
+            future = self._entries.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,114 @@
+from lib.constants import LABEL_COLUMNS
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import heapq
+import json
+import os
+import pandas as pd
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse an 'i/n' shard spec (0 <= i < n)"""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}, expected 'i/n'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {spec!r}, expected 0 <= i < n")
+    return index, count
+
+def universe_hash(tickers: List[str]) -> str:
+    """Short fingerprint of a ticker universe, so partitions of different runs are not merged"""
+    return hashlib.sha1('\n'.join(sorted(tickers)).encode()).hexdigest()[:12]
+
+def assign_shards(row_counts: Dict[str, int], n_shards: int) -> List[List[str]]:
+    """
+    Split tickers into n_shards groups with balanced total row counts.
+
+    Tickers are placed largest first on the currently lightest shard (ties
+    broken by ticker name and shard number), so every node computes the same
+    assignment from the same row counts.
+
+    Returns:
+        Sorted ticker list of every shard
+    """
+    shards: List[List[str]] = [[] for _ in range(n_shards)]
+    loads = [(0, shard) for shard in range(n_shards)]
+    for ticker, rows in sorted(row_counts.items(), key=lambda item: (-item[1], item[0])):
+        load, shard = heapq.heappop(loads)
+        shards[shard].append(ticker)
+        heapq.heappush(loads, (load + rows, shard))
+    return [sorted(tickers) for tickers in shards]
+
+def partition_filename(output: str, index: int, count: int) -> str:
+    """Partition file of shard index/count, e.g. auto_labels.part-003-of-016.csv"""
+    root, ext = os.path.splitext(output)
+    return f"{root}.part-{index:03d}-of-{count:03d}{ext or '.csv'}"
+
+def manifest_filename(partition: str) -> str:
+    return f"{partition}.json"
+
+def write_manifest(partition: str, manifest: dict):
+    """Write the manifest of a finished partition; merge only trusts partitions that have one"""
+    with open(manifest_filename(partition), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def read_manifest(partition: str) -> Optional[dict]:
+    try:
+        with open(manifest_filename(partition)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def merge_partitions(output: str, count: int) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Combine the partitions of a sharded run and check that coverage is complete.
+
+    Every partition needs its manifest. The manifests must come from the same
+    run (same universe, shard count, date range and window size), their
+    tickers must cover the whole universe exactly once, and each ticker must
+    have as many windows in its partition as its manifest says.
+
+    Returns:
+        Tuple of the merged labels (sorted by ticker and start date) and the
+        list of problems found; the labels are only complete if it is empty
+    """
+    problems = []
+    frames = []
+    manifests = {}
+    for index in range(count):
+        partition = partition_filename(output, index, count)
+        manifest = read_manifest(partition)
+        if manifest is None or not os.path.exists(partition):
+            problems.append(f"Shard {index}/{count} is missing or unfinished ({partition})")
+            continue
+        manifests[index] = manifest
+        frames.append(pd.read_csv(partition, dtype={column: str for column in LABEL_COLUMNS}))
+
+    run_fields = ['universe', 'shards', 'date_range', 'window_size']
+    runs = {tuple(json.dumps(manifest[field]) for field in run_fields) for manifest in manifests.values()}
+    if len(runs) > 1:
+        problems.append(f"Partitions come from different runs (differing {', '.join(run_fields)})")
+
+    labels = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=LABEL_COLUMNS)
+    expected = {}
+    owners: Dict[str, int] = {}
+    for index, manifest in manifests.items():
+        for ticker, windows in manifest['windows'].items():
+            if ticker in owners:
+                problems.append(f"{ticker} was labelled by shards {owners[ticker]} and {index}")
+            owners[ticker] = index
+            expected[ticker] = windows
+    if manifests:
+        universe = next(iter(manifests.values()))['tickers_total']
+        if len(manifests) == count and len(owners) != universe:
+            problems.append(f"Partitions cover {len(owners)} of {universe} tickers")
+
+    actual = labels.groupby('ticker').size().to_dict() if len(labels) else {}
+    for ticker, windows in sorted(expected.items()):
+        if actual.get(ticker, 0) != windows:
+            problems.append(f"{ticker}: expected {windows} windows, found {actual.get(ticker, 0)}")
+    duplicates = labels.duplicated('key').sum() if len(labels) else 0
+    if duplicates:
+        problems.append(f"{duplicates} windows appear in more than one partition")
+
+    return labels.sort_values(['ticker', 'start_date'], ignore_index=True), problems
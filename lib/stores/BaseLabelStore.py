@@ -0,0 +1,43 @@
+from lib.labeller import load_labels, save_labels
+
+class BaseLabelStore:
+    """
+    Storage backend for manual labels.
+
+    Labels use the same dictionary format as `lib.labeller.load_labels`:
+    keyed by "<ticker>_<start_date>", each value holding ticker, start_date,
+    end_date, pattern and timestamp.
+    """
+    def __init__(self):
+        pass
+    def load(self) -> dict:
+        pass
+    def upsert(self, key: str, label: dict):
+        pass
+    def delete(self, key: str):
+        pass
+    def labels_for_ticker(self, ticker: str) -> dict:
+        return {key: label for key, label in self.load().items() if label['ticker'] == ticker}
+    def upsert_many(self, labels: dict):
+        for key, label in labels.items():
+            self.upsert(key, label)
+    def import_csv(self, filename: str) -> int:
+        """Upsert every label of a CSV written by save_labels, returning how many were read"""
+        labels = load_labels(filename)
+        self.upsert_many(labels)
+        return len(labels)
+    def export_csv(self, filename: str) -> int:
+        """Write every label to a CSV in the save_labels format, returning how many were written"""
+        labels = self.load()
+        save_labels(labels, filename)
+        return len(labels)
+    def enqueue_windows(self, ticker: str, start_dates) -> int:
+        """Add unlabelled windows to the shared work queue; stores without one return 0"""
+        return 0
+    def lease_windows(self, owner: str, batch_size: int = 20, lease_seconds: float = 600, ticker=None, now=None) -> list:
+        """Lease a batch of unlabelled window keys to an annotator; stores without a work queue return none"""
+        return []
+    def release_leases(self, owner: str, ticker=None):
+        pass
+    def close(self):
+        pass
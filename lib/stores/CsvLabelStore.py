@@ -0,0 +1,27 @@
+from lib.stores.BaseLabelStore import BaseLabelStore
+from lib.labeller import load_labels, save_labels
+from typing import Optional
+import threading
+
+class CsvLabelStore(BaseLabelStore):
+    """Label store backed by one CSV file that is rewritten whole on every change"""
+    def __init__(self, filename: str = "labels.csv", snapshot: Optional[str] = None):
+        super().__init__()
+        self.filename = filename
+        self._labels = load_labels(filename, snapshot=snapshot)
+        self._lock = threading.Lock()
+    def load(self) -> dict:
+        with self._lock:
+            return dict(self._labels)
+    def upsert(self, key: str, label: dict):
+        with self._lock:
+            self._labels[key] = label
+            save_labels(self._labels, self.filename)
+    def delete(self, key: str):
+        with self._lock:
+            if self._labels.pop(key, None) is not None:
+                save_labels(self._labels, self.filename)
+    def upsert_many(self, labels: dict):
+        with self._lock:
+            self._labels.update(labels)
+            save_labels(self._labels, self.filename)
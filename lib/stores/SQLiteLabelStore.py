@@ -0,0 +1,229 @@
+from lib.stores.BaseLabelStore import BaseLabelStore
+from typing import Iterable, List, Optional
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    ticker TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    PRIMARY KEY (ticker, start_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS labels_pattern_idx ON labels (ticker, pattern);
+CREATE TABLE IF NOT EXISTS work_queue (
+    ticker TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticker, start_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS work_queue_ticker_idx ON work_queue (ticker, lease_expires, start_date);
+CREATE INDEX IF NOT EXISTS work_queue_global_idx ON work_queue (lease_expires, ticker, start_date);
+CREATE INDEX IF NOT EXISTS work_queue_owner_idx ON work_queue (lease_owner, lease_expires);
+"""
+
+UPSERT = """
+INSERT INTO labels (ticker, start_date, end_date, pattern, timestamp)
+VALUES (:ticker, :start_date, :end_date, :pattern, :timestamp)
+ON CONFLICT (ticker, start_date) DO UPDATE SET
+    end_date = excluded.end_date,
+    pattern = excluded.pattern,
+    timestamp = excluded.timestamp
+"""
+
+class SQLiteLabelStore(BaseLabelStore):
+    """
+    Label store backed by a local SQLite database in WAL mode.
+
+    WAL lets any number of annotator processes read while one writes, and
+    every label change is a single-row upsert or delete on the
+    (ticker, start_date) primary key instead of a full file rewrite.
+    """
+    def __init__(self, filename: str = "labels.db", timeout: float = 5.0):
+        super().__init__()
+        self.filename = filename
+        self._conn = sqlite3.connect(filename, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _to_label(row: sqlite3.Row) -> dict:
+        return {
+            'ticker': row['ticker'],
+            'start_date': row['start_date'],
+            'end_date': row['end_date'],
+            'pattern': row['pattern'],
+            'timestamp': row['timestamp']
+        }
+
+    @staticmethod
+    def _split_key(key: str):
+        ticker, start_date = key.rsplit('_', 1)
+        return ticker, start_date
+
+    def _query(self, sql: str, params=()) -> dict:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return {f"{row['ticker']}_{row['start_date']}": self._to_label(row) for row in rows}
+
+    def load(self) -> dict:
+        return self._query("SELECT * FROM labels ORDER BY ticker, start_date")
+
+    def labels_for_ticker(self, ticker: str) -> dict:
+        return self._query("SELECT * FROM labels WHERE ticker = ? ORDER BY start_date", (ticker,))
+
+    def get(self, key: str):
+        ticker, start_date = self._split_key(key)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM labels WHERE ticker = ? AND start_date = ?", (ticker, start_date)
+            ).fetchone()
+        return self._to_label(row) if row is not None else None
+
+    def _transaction(self, statements):
+        """Run (sql, params, many) statements in one write transaction; the caller holds the lock"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            results = [
+                self._conn.executemany(sql, params) if many else self._conn.execute(sql, params)
+                for sql, params, many in statements
+            ]
+            self._conn.execute("COMMIT")
+            return results
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def upsert(self, key: str, label: dict):
+        # A labelled window leaves the work queue in the same transaction
+        with self._lock:
+            self._transaction([
+                (UPSERT, label, False),
+                ("DELETE FROM work_queue WHERE ticker = :ticker AND start_date = :start_date", label, False),
+            ])
+
+    def delete(self, key: str):
+        # An unlabelled window goes back to the work queue, free to lease
+        ticker, start_date = self._split_key(key)
+        with self._lock:
+            self._transaction([
+                ("DELETE FROM labels WHERE ticker = ? AND start_date = ?", (ticker, start_date), False),
+                ("INSERT OR IGNORE INTO work_queue (ticker, start_date) SELECT ?, ? WHERE changes() > 0",
+                 (ticker, start_date), False),
+            ])
+
+    def upsert_many(self, labels: dict):
+        with self._lock:
+            self._transaction([
+                (UPSERT, list(labels.values()), True),
+                ("DELETE FROM work_queue WHERE ticker = :ticker AND start_date = :start_date", list(labels.values()), True),
+            ])
+
+    def enqueue_windows(self, ticker: str, start_dates: Iterable[str]) -> int:
+        """
+        Add unlabelled windows of a ticker to the work queue.
+        
+        Windows that are already queued keep their lease, and windows that
+        are already labelled are skipped.
+        
+        Returns:
+            Number of windows of the ticker waiting in the queue
+        """
+        with self._lock:
+            self._transaction([
+                (
+                    "INSERT OR IGNORE INTO work_queue (ticker, start_date) "
+                    "SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM labels WHERE ticker = ? AND start_date = ?)",
+                    [(ticker, start_date, ticker, start_date) for start_date in start_dates],
+                    True
+                ),
+            ])
+            return self._conn.execute("SELECT COUNT(*) FROM work_queue WHERE ticker = ?", (ticker,)).fetchone()[0]
+
+    def lease_windows(self, owner: str, batch_size: int = 20, lease_seconds: float = 600,
+                      ticker: Optional[str] = None, now: Optional[float] = None) -> List[str]:
+        """
+        Lease a batch of unlabelled windows to an annotator.
+        
+        The owner's unexpired leases are renewed and topped up with never
+        leased windows in start date order, then with windows whose lease has
+        expired, so concurrent annotators get disjoint batches. Each pull is
+        an index range scan.
+        
+        Args:
+            owner: Annotator name
+            batch_size: Number of windows the owner should hold
+            lease_seconds: Lease duration from now
+            ticker: Only lease windows of this ticker
+            now: Current time as a UNIX timestamp (default: time.time())
+            
+        Returns:
+            Keys of the windows leased to the owner, in start date order
+        """
+        now = time.time() if now is None else now
+        expires = now + lease_seconds
+        ticker_filter = "AND ticker = :ticker " if ticker is not None else ""
+        # Matches the column order of the ticker or global queue index, so no sort is needed
+        queue_order = "lease_expires, start_date" if ticker is not None else "lease_expires, ticker, start_date"
+        params = {'owner': owner, 'now': now, 'expires': expires, 'ticker': ticker, 'limit': batch_size}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE work_queue SET lease_expires = :expires "
+                    f"WHERE lease_owner = :owner AND lease_expires > :now {ticker_filter}",
+                    params
+                )
+                held = self._conn.execute(
+                    "SELECT COUNT(*) FROM work_queue "
+                    f"WHERE lease_owner = :owner AND lease_expires = :expires {ticker_filter}",
+                    params
+                ).fetchone()[0]
+                if held < batch_size:
+                    params['limit'] = batch_size - held
+                    free = self._conn.execute(
+                        "SELECT ticker, start_date FROM work_queue "
+                        f"WHERE lease_expires <= :now {ticker_filter}"
+                        f"ORDER BY {queue_order} LIMIT :limit",
+                        params
+                    ).fetchall()
+                    self._conn.executemany(
+                        "UPDATE work_queue SET lease_owner = ?, lease_expires = ? WHERE ticker = ? AND start_date = ?",
+                        [(owner, expires, row['ticker'], row['start_date']) for row in free]
+                    )
+                rows = self._conn.execute(
+                    "SELECT ticker, start_date FROM work_queue "
+                    f"WHERE lease_owner = :owner AND lease_expires = :expires {ticker_filter}"
+                    "ORDER BY start_date",
+                    params
+                ).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [f"{row['ticker']}_{row['start_date']}" for row in rows]
+
+    def release_leases(self, owner: str, ticker: Optional[str] = None):
+        """Return the owner's leased windows to the queue"""
+        ticker_filter = " AND ticker = :ticker" if ticker is not None else ""
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE work_queue SET lease_owner = NULL, lease_expires = 0 WHERE lease_owner = :owner{ticker_filter}",
+                {'owner': owner, 'ticker': ticker}
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,23 @@
+from lib.stores.BaseLabelStore import BaseLabelStore
+from lib.stores.CsvLabelStore import CsvLabelStore
+from lib.stores.SQLiteLabelStore import SQLiteLabelStore
+from typing import Optional
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+def open_label_store(path: str = "labels.csv", snapshot: Optional[str] = None, **kwargs) -> BaseLabelStore:
+    """
+    Open the label store for a path, picking the backend from its extension.
+    
+    Args:
+        path: A .db/.sqlite/.sqlite3 file opens a SQLiteLabelStore, anything
+            else a CsvLabelStore
+        snapshot: Feather snapshot used to speed up loading a CSV store
+        **kwargs: Additional arguments for the store
+        
+    Returns:
+        Label store instance
+    """
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SQLiteLabelStore(path, **kwargs)
+    return CsvLabelStore(path, snapshot=snapshot, **kwargs)
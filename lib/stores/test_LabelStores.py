@@ -0,0 +1,132 @@
+import os
+import tempfile
+import threading
+from lib.stores.CsvLabelStore import CsvLabelStore
+from lib.stores.SQLiteLabelStore import SQLiteLabelStore
+from lib.stores.registry import open_label_store
+
+def _label(ticker: str, start_date: str, pattern: str = 'uptrend') -> dict:
+    return {
+        'ticker': ticker,
+        'start_date': start_date,
+        'end_date': start_date,
+        'pattern': pattern,
+        'timestamp': '2025-01-12T16:17:40.250107'
+    }
+
+def _exercise_store(store):
+    store.upsert('AAPL_1997-01-02', _label('AAPL', '1997-01-02'))
+    store.upsert('BRK_B_1997-01-02', _label('BRK_B', '1997-01-02'))
+    store.upsert('AAPL_1997-01-02', _label('AAPL', '1997-01-02', 'sideways'))
+    assert store.load() == {
+        'AAPL_1997-01-02': _label('AAPL', '1997-01-02', 'sideways'),
+        'BRK_B_1997-01-02': _label('BRK_B', '1997-01-02'),
+    }
+    assert list(store.labels_for_ticker('BRK_B')) == ['BRK_B_1997-01-02']
+
+    store.delete('BRK_B_1997-01-02')
+    store.delete('BRK_B_1997-01-02')
+    assert list(store.load()) == ['AAPL_1997-01-02']
+
+def test_csv_label_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'labels.csv')
+        _exercise_store(CsvLabelStore(filename))
+        assert list(CsvLabelStore(filename).load()) == ['AAPL_1997-01-02'], "Expected changes to be persisted"
+    print("CsvLabelStore test passed.")
+
+def test_sqlite_label_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'labels.db')
+        store = SQLiteLabelStore(filename)
+        _exercise_store(store)
+        assert store.get('AAPL_1997-01-02')['pattern'] == 'sideways'
+        assert store.get('MSFT_1997-01-02') is None
+        journal_mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        store.close()
+
+        reopened = SQLiteLabelStore(filename)
+        assert list(reopened.load()) == ['AAPL_1997-01-02'], "Expected changes to be persisted"
+        reopened.close()
+    assert journal_mode == 'wal', f"Expected WAL mode, got {journal_mode}"
+    print("SQLiteLabelStore test passed.")
+
+def test_sqlite_label_store_concurrent_writers():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'labels.db')
+        stores = [SQLiteLabelStore(filename) for _ in range(4)]
+
+        def annotate(store, ticker):
+            for day in range(1, 26):
+                store.upsert(f"{ticker}_1997-01-{day:02d}", _label(ticker, f"1997-01-{day:02d}"))
+
+        threads = [threading.Thread(target=annotate, args=(store, f"T{i}")) for i, store in enumerate(stores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        count = stores[0].count()
+        for store in stores:
+            store.close()
+    assert count == 100, f"Expected 100 labels, got {count}"
+    print("SQLiteLabelStore concurrent writers test passed.")
+
+def test_csv_import_export():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = CsvLabelStore(os.path.join(tmp, 'source.csv'))
+        source.upsert_many({
+            'AAPL_1997-01-02': _label('AAPL', '1997-01-02'),
+            'AAPL_1997-01-03': _label('AAPL', '1997-01-03', 'downtrend'),
+        })
+
+        store = open_label_store(os.path.join(tmp, 'labels.db'))
+        assert isinstance(store, SQLiteLabelStore)
+        assert store.import_csv(source.filename) == 2
+        assert store.export_csv(os.path.join(tmp, 'export.csv')) == 2
+        store.close()
+
+        exported = open_label_store(os.path.join(tmp, 'export.csv'))
+        assert isinstance(exported, CsvLabelStore)
+        assert exported.load() == source.load()
+    print("Label store CSV import/export test passed.")
+
+def test_sqlite_work_queue_leases():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteLabelStore(os.path.join(tmp, 'labels.db'))
+        days = [f"1997-01-{day:02d}" for day in range(1, 11)]
+        store.upsert('AAPL_1997-01-01', _label('AAPL', '1997-01-01'))
+        queued = store.enqueue_windows('AAPL', days)
+        assert queued == 9, f"Expected labelled windows to be skipped, got {queued}"
+
+        alice = store.lease_windows('alice', batch_size=3, lease_seconds=60, ticker='AAPL', now=0)
+        bob = store.lease_windows('bob', batch_size=3, lease_seconds=60, ticker='AAPL', now=0)
+        assert alice == ['AAPL_1997-01-02', 'AAPL_1997-01-03', 'AAPL_1997-01-04']
+        assert bob == ['AAPL_1997-01-05', 'AAPL_1997-01-06', 'AAPL_1997-01-07'], "Expected disjoint batches"
+
+        # Labelling leaves the queue; the batch is topped up and the lease renewed
+        store.upsert('AAPL_1997-01-02', _label('AAPL', '1997-01-02'))
+        alice = store.lease_windows('alice', batch_size=3, lease_seconds=60, ticker='AAPL', now=30)
+        assert alice == ['AAPL_1997-01-03', 'AAPL_1997-01-04', 'AAPL_1997-01-08']
+
+        # Bob's lease expires at 60; never leased windows go first, then his expired ones
+        carol = store.lease_windows('carol', batch_size=4, lease_seconds=60, ticker='AAPL', now=61)
+        assert carol == ['AAPL_1997-01-05', 'AAPL_1997-01-06', 'AAPL_1997-01-09', 'AAPL_1997-01-10']
+
+        # Deleting a label puts the window back in the queue
+        store.release_leases('carol')
+        store.delete('AAPL_1997-01-01')
+        dave = store.lease_windows('dave', batch_size=1, lease_seconds=60, ticker='AAPL', now=61)
+        store.close()
+    assert dave == ['AAPL_1997-01-01'], f"Expected the unlabelled window to be queued again, got {dave}"
+    print("SQLiteLabelStore work queue test passed.")
+
+def main():
+    test_csv_label_store()
+    test_sqlite_label_store()
+    test_sqlite_label_store_concurrent_writers()
+    test_csv_import_export()
+    test_sqlite_work_queue_leases()
+
+if __name__ == "__main__":
+    main()
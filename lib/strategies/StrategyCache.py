@@ -0,0 +1,123 @@
+from lib.index.WindowIndex import to_days
+from lib.strategies.vectorized import STRATEGIES, _window_starts
+from typing import Dict, List, Optional, Tuple
+import os
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+CACHE_COLUMNS = ['start_day', 'fingerprint', 'value']
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_PRIMES = np.array([0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9], dtype=np.uint64)
+
+def row_hashes(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """uint64 hash of every row's date and values in `columns`"""
+    h = to_days(df.index).astype(np.uint64) * _MIX
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+    bits = values.view(np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(bits.shape[1]):
+            h ^= bits[:, j] * _PRIMES[j % len(_PRIMES)] + np.uint64(j)
+            h = (h ^ (h >> np.uint64(31))) * _MIX
+    return h
+
+def window_fingerprints(df: pd.DataFrame, columns: List[str], window_size: int,
+                        starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    uint64 fingerprint of the input rows of every window.
+
+    The fingerprint is the wrapping sum of the row hashes in the window, so
+    all windows are fingerprinted with one cumulative sum. Rows hash their
+    date too, so a fingerprint changes when any input value of the window
+    changes or the window moves.
+    """
+    if starts is None:
+        starts = _window_starts(len(df), window_size)
+    cumulative = np.concatenate([[np.uint64(0)], np.cumsum(row_hashes(df, columns), dtype=np.uint64)])
+    with np.errstate(over='ignore'):
+        return cumulative[starts + window_size] - cumulative[starts]
+
+class StrategyCache:
+    """
+    On-disk cache of per-window strategy returns.
+
+    Entries are stored column-wise, one Feather file per
+    (strategy, strategy version, window size, ticker) holding the window
+    start day, the fingerprint of the window's input data and the return.
+    A window is recomputed when its entry is missing or its fingerprint no
+    longer matches the data, so bumping one strategy's version or adding
+    new days only recomputes what changed. Versions are the ones in
+    vectorized.STRATEGIES.
+    """
+    def __init__(self, directory: str = "strategy_cache"):
+        self.directory = directory
+
+    def _path(self, ticker: str, strategy: str, version: int, window_size: int) -> str:
+        safe_ticker = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+        return os.path.join(self.directory, f"{strategy}-v{version}", f"w{window_size}", f"{safe_ticker}.feather")
+
+    def load(self, ticker: str, strategy: str, version: int, window_size: int) -> Optional[pd.DataFrame]:
+        """Cached entries, or None if there are none"""
+        try:
+            return feather.read_feather(self._path(ticker, strategy, version, window_size), columns=CACHE_COLUMNS)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+
+    def store(self, ticker: str, strategy: str, version: int, window_size: int, entries: pd.DataFrame):
+        """Replace the cached entries; the file is swapped in atomically"""
+        path = self._path(ticker, strategy, version, window_size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        feather.write_feather(entries[CACHE_COLUMNS].reset_index(drop=True), f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    def strategy_returns(self, df: pd.DataFrame, ticker: str, window_size: int = 20,
+                         strategies: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        strategy_returns with every still-valid window read from the cache.
+
+        Args:
+            df: Date-indexed frame with the strategies' input columns
+            ticker: Stock ticker symbol
+            window_size: Trading days per window
+            strategies: Names in STRATEGIES to compute (default: all)
+
+        Returns:
+            Tuple of the frame strategy_returns would return and the number
+            of windows computed (not served from the cache) per strategy
+        """
+        starts = _window_starts(len(df), window_size)
+        days = to_days(df.index[starts])
+        returns = {}
+        computed = {}
+        for name in strategies or list(STRATEGIES):
+            version, columns, compute = STRATEGIES[name]
+            fingerprints = window_fingerprints(df, columns, window_size, starts)
+            values = np.full(len(starts), np.nan)
+            fresh = np.zeros(len(starts), dtype=bool)
+
+            cached = self.load(ticker, name, version, window_size)
+            if cached is not None and len(cached):
+                cached = cached.sort_values('start_day')
+                cached_days = cached['start_day'].to_numpy()
+                pos = np.minimum(np.searchsorted(cached_days, days), len(cached_days) - 1)
+                fresh = (cached_days[pos] == days) & (cached['fingerprint'].to_numpy()[pos] == fingerprints)
+                values[fresh] = cached['value'].to_numpy()[pos[fresh]]
+
+            stale = np.flatnonzero(~fresh)
+            if len(stale):
+                values[stale] = compute(df, window_size, starts[stale])
+                entries = pd.DataFrame({
+                    'start_day': days.astype(np.int32),
+                    'fingerprint': fingerprints,
+                    'value': values,
+                })
+                if cached is not None:
+                    # Keep entries outside this frame's date range, e.g. from a run over other dates
+                    outside = cached[~np.isin(cached['start_day'].to_numpy(), days)]
+                    entries = pd.concat([outside, entries], ignore_index=True).sort_values('start_day')
+                self.store(ticker, name, version, window_size, entries)
+            returns[name] = values
+            computed[name] = len(stale)
+        return pd.DataFrame(returns, index=df.index[starts]), computed
@@ -0,0 +1,158 @@
+from lib.agreement import PATTERNS
+from lib.index.WindowIndex import WindowIndex, pack_keys, to_days
+from lib.strategies.MeanReversionStrategy import Decision
+from lib.strategies.vectorized import (
+    DECISION_ORDER, RSI_COLUMNS, _window_starts, buy_and_hold_returns, mean_reversion_returns, sell_and_hold_returns
+)
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+GRID_COLUMNS = ['buy_threshold', 'sell_threshold', 'lookback', 'quorum']
+
+def parameter_grid(buy_thresholds: Iterable[float] = (30,), sell_thresholds: Iterable[float] = (70,),
+                   lookbacks: Iterable[int] = (20,), quorums: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """
+    Every combination of MeanReversionStrategy settings.
+
+    Args:
+        buy_thresholds: RSI at or below which a period votes BUY
+        sell_thresholds: RSI at or above which a period votes SELL
+        lookbacks: Number of RSI periods voting (rsi_1..rsi_<lookback>, at most 20)
+        quorums: Votes needed to act; None uses the strategy's majority rule
+            (more than half of the lookback). Quorums above a lookback are skipped.
+
+    Pairs with a buy threshold at or above the sell threshold are skipped:
+    a period could then vote both ways, which sweep_decisions does not model.
+
+    Returns:
+        Frame with GRID_COLUMNS, one row per setting
+    """
+    rows = []
+    for buy, sell, lookback in product(buy_thresholds, sell_thresholds, lookbacks):
+        if not 1 <= lookback <= len(RSI_COLUMNS):
+            raise ValueError(f"Lookback must be between 1 and {len(RSI_COLUMNS)}, got {lookback}")
+        if buy >= sell:
+            continue
+        for quorum in ([lookback // 2 + 1] if quorums is None else quorums):
+            if quorum <= lookback:
+                rows.append((buy, sell, lookback, quorum))
+    if not rows:
+        raise ValueError("Parameter grid is empty: no buy threshold below a sell threshold with a quorum within the lookback")
+    return pd.DataFrame(rows, columns=GRID_COLUMNS)
+
+def _cumulative_votes(rsi: np.ndarray, thresholds: np.ndarray, below: bool) -> np.ndarray:
+    """(n_thresholds, n_days, n_periods) running vote counts over rsi_1..rsi_k for every threshold"""
+    votes = rsi[None, :, :] <= thresholds[:, None, None] if below else rsi[None, :, :] >= thresholds[:, None, None]
+    return np.cumsum(votes, axis=2, dtype=np.int16)
+
+def sweep_decisions(rsi: np.ndarray, grid: pd.DataFrame) -> np.ndarray:
+    """
+    rsi_decisions of every day under every setting of the grid.
+
+    Votes are counted once per distinct threshold by broadcasting the RSI
+    matrix against the threshold array; a running count over the periods
+    gives the votes of every lookback at the same time.
+
+    Args:
+        rsi: (n_days, 20) matrix of rsi_1..rsi_20
+        grid: Output of parameter_grid
+
+    Returns:
+        (n_settings, n_days) int8 decisions
+    """
+    buy_values, buy_index = np.unique(grid['buy_threshold'].to_numpy(dtype=np.float64), return_inverse=True)
+    sell_values, sell_index = np.unique(grid['sell_threshold'].to_numpy(dtype=np.float64), return_inverse=True)
+    period = grid['lookback'].to_numpy() - 1
+    quorum = grid['quorum'].to_numpy()[:, None]
+
+    buy_votes = _cumulative_votes(rsi, buy_values, below=True)[buy_index, :, period]
+    sell_votes = _cumulative_votes(rsi, sell_values, below=False)[sell_index, :, period]
+    hold_votes = (period + 1)[:, None] - buy_votes - sell_votes
+
+    # Same precedence as rsi_decisions: BUY, then HOLD, then SELL
+    decisions = np.full(buy_votes.shape, Decision.HOLD, dtype=np.int8)
+    decisions[(sell_votes >= quorum) & (hold_votes < quorum)] = Decision.SELL
+    decisions[buy_votes >= quorum] = Decision.BUY
+    return decisions
+
+def sweep_ticker(df: pd.DataFrame, grid: pd.DataFrame, window_size: int = 20) -> np.ndarray:
+    """
+    Auto label of every full window of a ticker under every setting.
+
+    Buy-and-Hold and Sell-and-Hold do not depend on the settings and are
+    computed once; Mean Reversion is simulated for all settings together.
+
+    Returns:
+        (n_settings, n_windows) int8 index into vectorized.DECISION_ORDER
+    """
+    close = df['close'].to_numpy(dtype=np.float64)
+    starts = _window_starts(len(df), window_size)
+    decisions = sweep_decisions(df[RSI_COLUMNS].to_numpy(dtype=np.float64), grid)
+    returns = np.stack(np.broadcast_arrays(
+        buy_and_hold_returns(close, window_size, starts)[None, :],
+        mean_reversion_returns(close, decisions, window_size, starts),
+        sell_and_hold_returns(close, window_size, starts)[None, :],
+    ), axis=-1)
+    return np.argmax(returns, axis=-1).astype(np.int8) if len(starts) else np.empty((len(grid), 0), dtype=np.int8)
+
+def sweep(frames: Dict[str, pd.DataFrame], grid: pd.DataFrame, manual: Optional[pd.DataFrame] = None,
+          window_size: int = 20, max_workers: int = 4) -> pd.DataFrame:
+    """
+    Label distribution and agreement with manual labels of every setting.
+
+    Tickers are swept in parallel on a thread pool (the work is in NumPy,
+    which releases the GIL).
+
+    Args:
+        frames: Date-indexed close and rsi_1..rsi_20 frame of every ticker
+        grid: Output of parameter_grid
+        manual: Manual labels from agreement.read_label_file, or None
+        window_size: Trading days per window
+        max_workers: Threads sweeping tickers
+
+    Returns:
+        grid with the number of windows, the share of every pattern and, when
+        manual labels are given, the number of manually labelled windows
+        compared and the agreement rate, sorted by agreement
+    """
+    index = WindowIndex(frames)
+    manual_labels = None
+    if manual is not None and len(manual):
+        # Manual label codes follow agreement.PATTERNS; translate them to vectorized.DECISION_ORDER
+        to_sweep_codes = np.array([DECISION_ORDER.index(pattern) for pattern in PATTERNS] + [-1], dtype=np.int8)
+        manual_keys = index.window_keys(manual['ticker'].astype(str), manual['start_date'].to_numpy())
+        order = np.argsort(manual_keys)
+        manual_labels = (manual_keys[order], to_sweep_codes[manual['label'].to_numpy()[order]])
+
+    def sweep_one(ticker: str):
+        labels = sweep_ticker(frames[ticker], grid, window_size)
+        counts = np.stack([(labels == code).sum(axis=1) for code in range(len(DECISION_ORDER))], axis=1)
+        agreed = compared = np.zeros(len(grid), dtype=np.int64)
+        if manual_labels is not None and len(manual_labels[0]):
+            starts = _window_starts(len(frames[ticker]), window_size)
+            keys = pack_keys(np.full(len(starts), index.ticker_id(ticker)), to_days(frames[ticker].index[starts]))
+            pos = np.minimum(np.searchsorted(manual_labels[0], keys), len(manual_labels[0]) - 1)
+            found = (manual_labels[0][pos] == keys) & (manual_labels[1][pos] >= 0)
+            compared = np.full(len(grid), found.sum())
+            agreed = (labels[:, found] == manual_labels[1][pos[found]][None, :]).sum(axis=1)
+        return counts, compared, agreed
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(sweep_one, list(frames)))
+
+    counts = sum((result[0] for result in results), np.zeros((len(grid), len(DECISION_ORDER)), dtype=np.int64))
+    windows = counts.sum(axis=1)
+    report = grid.copy()
+    report['windows'] = windows
+    for code, pattern in enumerate(DECISION_ORDER):
+        report[pattern] = counts[:, code] / np.maximum(windows, 1)
+    if manual_labels is not None:
+        compared = sum(result[1] for result in results)
+        agreed = sum(result[2] for result in results)
+        report['compared'] = compared
+        report['agreement'] = agreed / np.maximum(compared, 1)
+        report = report.sort_values('agreement', ascending=False, kind='stable')
+    return report
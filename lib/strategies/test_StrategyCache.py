@@ -0,0 +1,70 @@
+import tempfile
+import numpy as np
+import pandas as pd
+from lib.strategies.StrategyCache import StrategyCache, window_fingerprints
+from lib.strategies.vectorized import RSI_COLUMNS, STRATEGIES, strategy_returns
+
+def _ticker_df(n: int = 80, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'close': 100 + rng.standard_normal(n).cumsum()},
+                      index=pd.bdate_range('2020-01-01', periods=n).date)
+    regime = rng.choice([10.0, 50.0, 90.0], size=n)
+    for column in RSI_COLUMNS:
+        df[column] = np.clip(regime + rng.normal(0, 15, n), 0, 100)
+    return df
+
+def test_window_fingerprints():
+    df = _ticker_df()
+    fingerprints = window_fingerprints(df, ['close'], 20)
+    assert len(fingerprints) == len(df) - 19
+    assert len(np.unique(fingerprints)) == len(fingerprints)
+
+    changed = df.copy()
+    changed.iloc[30, changed.columns.get_loc('close')] += 1
+    changed_fingerprints = window_fingerprints(changed, ['close'], 20)
+    differs = np.flatnonzero(changed_fingerprints != fingerprints)
+    assert list(differs) == list(range(11, 31)), "Only the windows containing row 30 should change"
+    assert np.array_equal(window_fingerprints(changed, RSI_COLUMNS, 20), window_fingerprints(df, RSI_COLUMNS, 20))
+    print("window_fingerprints test passed.")
+
+def test_strategy_cache_only_recomputes_stale_windows():
+    df = _ticker_df()
+    expected = strategy_returns(df, 20)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = StrategyCache(tmp)
+        returns, computed = cache.strategy_returns(df, 'AAPL', 20)
+        assert computed == {'buy_and_hold': 61, 'mean_reversion': 61, 'sell_and_hold': 61}
+        pd.testing.assert_frame_equal(returns, expected)
+
+        returns, computed = cache.strategy_returns(df, 'AAPL', 20)
+        assert sum(computed.values()) == 0, f"Expected everything cached, got {computed}"
+        pd.testing.assert_frame_equal(returns, expected)
+
+        # Changing an RSI value only invalidates the mean reversion windows that contain it
+        changed = df.copy()
+        changed.iloc[70, changed.columns.get_loc('rsi_5')] = 5.0
+        returns, computed = cache.strategy_returns(changed, 'AAPL', 20)
+        assert computed == {'buy_and_hold': 0, 'mean_reversion': 10, 'sell_and_hold': 0}
+        pd.testing.assert_frame_equal(returns, strategy_returns(changed, 20))
+
+        # A new strategy version starts from an empty cache without touching the others
+        version, columns, compute = STRATEGIES['mean_reversion']
+        STRATEGIES['mean_reversion'] = (version + 1, columns, compute)
+        try:
+            returns, computed = cache.strategy_returns(changed, 'AAPL', 20)
+        finally:
+            STRATEGIES['mean_reversion'] = (version, columns, compute)
+        assert computed == {'buy_and_hold': 0, 'mean_reversion': 61, 'sell_and_hold': 0}
+
+        # Windows outside a shorter date range stay cached
+        cache.strategy_returns(df.iloc[:40], 'AAPL', 20)
+        _, computed = cache.strategy_returns(df, 'AAPL', 20)
+        assert computed['buy_and_hold'] == 0
+    print("StrategyCache test passed.")
+
+def main():
+    test_window_fingerprints()
+    test_strategy_cache_only_recomputes_stale_windows()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from lib.agreement import PATTERNS
+from lib.strategies.sweep import parameter_grid, sweep, sweep_decisions, sweep_ticker
+from lib.strategies.test_vectorized import _ticker_df
+from lib.strategies.vectorized import DECISION_ORDER, RSI_COLUMNS, mean_reversion_returns, rsi_decisions, suggest_labels
+
+def test_parameter_grid():
+    grid = parameter_grid([25, 30], [70], [10, 20])
+    assert len(grid) == 4
+    assert grid['quorum'].tolist() == [6, 11, 6, 11]
+
+    grid = parameter_grid([30], [70], [3, 5], quorums=[2, 4])
+    assert grid[['lookback', 'quorum']].values.tolist() == [[3, 2], [5, 2], [5, 4]]
+
+    # Overlapping thresholds would count a period as both a BUY and a SELL vote
+    grid = parameter_grid([30, 50, 70], [50, 70], [20])
+    assert grid[['buy_threshold', 'sell_threshold']].values.tolist() == [[30, 50], [30, 70], [50, 70]]
+    try:
+        parameter_grid([70], [70], [20])
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("parameter_grid test passed.")
+
+def test_sweep_decisions_match_rsi_decisions():
+    rsi = _ticker_df()[RSI_COLUMNS].to_numpy()
+    grid = parameter_grid([20, 30, 40], [60, 70], [5, 20], quorums=[3, 11])
+    decisions = sweep_decisions(rsi, grid)
+
+    assert decisions.shape == (len(grid), len(rsi))
+    for g, setting in grid.iterrows():
+        expected = rsi_decisions(rsi[:, :setting['lookback']], setting['buy_threshold'],
+                                 setting['sell_threshold'], setting['quorum'])
+        assert np.array_equal(decisions[g], expected), f"Setting {g} differs"
+    print("sweep_decisions test passed.")
+
+def test_mean_reversion_returns_broadcast():
+    df = _ticker_df()
+    close = df['close'].to_numpy()
+    rsi = df[RSI_COLUMNS].to_numpy()
+    decisions = np.stack([rsi_decisions(rsi), rsi_decisions(rsi, 20, 80)])
+    returns = mean_reversion_returns(close, decisions)
+
+    assert returns.shape[0] == 2
+    assert np.allclose(returns[0], mean_reversion_returns(close, decisions[0]))
+    assert np.allclose(returns[1], mean_reversion_returns(close, decisions[1]))
+    print("Broadcast mean reversion test passed.")
+
+def test_sweep_ticker_default_setting_matches_suggest_labels():
+    df = _ticker_df()
+    labels = sweep_ticker(df, parameter_grid([30, 45], [70], [20]))
+
+    expected = suggest_labels(df)['pattern'].to_numpy()
+    assert np.array_equal(np.array(DECISION_ORDER)[labels[0]], expected)
+    assert labels.shape == (2, len(expected))
+    assert sweep_ticker(_ticker_df(n=10), parameter_grid()).shape == (1, 0)
+    print("sweep_ticker test passed.")
+
+def test_sweep_report():
+    frames = {'AAPL': _ticker_df(seed=1), 'MSFT': _ticker_df(seed=2)}
+    grid = parameter_grid([25, 30], [70, 75], [20])
+    expected = {ticker: suggest_labels(df)['pattern'] for ticker, df in frames.items()}
+
+    # Manual labels copy the default setting on AAPL; an unknown pattern and a ticker without data are ignored
+    msft = expected['MSFT'].index
+    manual = pd.DataFrame({
+        'ticker': ['AAPL'] * 5 + ['MSFT', 'MSFT', 'GE'],
+        'start_date': pd.to_datetime(list(expected['AAPL'].index[:5]) + [msft[1], msft[0], '2020-01-01']),
+        'label': np.array([PATTERNS.index(p) for p in expected['AAPL'].iloc[:5]] + [-1, 0, 0], dtype=np.int8),
+    })
+    report = sweep(frames, grid, manual, max_workers=2)
+
+    default = report[(report['buy_threshold'] == 30) & (report['sell_threshold'] == 70)].iloc[0]
+    windows = sum(len(labels) for labels in expected.values())
+    assert (report['windows'] == windows).all()
+    assert np.allclose(report[DECISION_ORDER].sum(axis=1), 1.0)
+    all_labels = pd.concat(expected.values())
+    for pattern in DECISION_ORDER:
+        assert np.isclose(default[pattern], (all_labels == pattern).mean())
+    assert (report['compared'] == 6).all()
+    msft_agrees = expected['MSFT'].iloc[0] == 'downtrend'
+    assert default['agreement'] == (5 + msft_agrees) / 6
+    assert report['agreement'].is_monotonic_decreasing
+
+    assert 'agreement' not in sweep(frames, grid).columns
+    print("Parameter sweep report test passed.")
+
+def main():
+    test_parameter_grid()
+    test_sweep_decisions_match_rsi_decisions()
+    test_mean_reversion_returns_broadcast()
+    test_sweep_ticker_default_setting_matches_suggest_labels()
+    test_sweep_report()
+
+if __name__ == "__main__":
+    main()
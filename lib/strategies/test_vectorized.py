@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from lib.strategies.BuyAndHoldStrategy import BuyAndHoldStrategy
+from lib.strategies.SellAndHoldStrategy import SellAndHoldStrategy
+from lib.strategies.MeanReversionStrategy import MeanReversionStrategy
+from lib.strategies.vectorized import RSI_COLUMNS, label_windows, strategy_returns, suggest_labels
+
+def _ticker_df(n: int = 120, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'close': 100 + rng.standard_normal(n).cumsum()},
+                      index=pd.bdate_range('2020-01-01', periods=n).date)
+    # Push whole days below 30 or above 70 so that windows actually trade
+    regime = rng.choice([10.0, 50.0, 90.0], size=n)
+    for column in RSI_COLUMNS:
+        df[column] = np.clip(regime + rng.normal(0, 15, n), 0, 100)
+    df.iloc[5, df.columns.get_loc('rsi_3')] = np.nan
+    return df
+
+def test_strategy_returns_match_strategies():
+    df = _ticker_df()
+    window_size = 20
+    returns = strategy_returns(df, window_size)
+
+    assert len(returns) == len(df) - window_size + 1
+    traded = 0
+    for offset in range(len(returns)):
+        window_df = df.iloc[offset:offset + window_size]
+        expected = [
+            BuyAndHoldStrategy().execute(window_df),
+            MeanReversionStrategy().execute(window_df),
+            SellAndHoldStrategy().execute(window_df),
+        ]
+        result = returns.iloc[offset][['buy_and_hold', 'mean_reversion', 'sell_and_hold']].tolist()
+        assert np.allclose(result, expected), f"Window {offset}: expected {expected}, got {result}"
+        traded += expected[1] != 0
+    assert traded > 0, "Expected some windows to trade on mean reversion"
+    print("Vectorized strategy returns test passed.")
+
+def test_suggest_labels():
+    df = _ticker_df()
+    suggestions = suggest_labels(df, uncertainty_margin=1.0)
+
+    for offset in range(len(suggestions)):
+        row = suggestions.iloc[offset]
+        values = [row['buy_and_hold'], row['mean_reversion'], row['sell_and_hold']]
+        expected = ["uptrend", "sideways", "downtrend"][np.argmax(values)]
+        assert row['pattern'] == expected, f"Window {offset}: expected {expected}, got {row['pattern']}"
+        assert row['uncertain'] == (row['margin'] < 1.0)
+    print("suggest_labels test passed.")
+
+def test_suggest_labels_short_history():
+    suggestions = suggest_labels(_ticker_df(n=10))
+    assert suggestions.empty
+    print("suggest_labels short history test passed.")
+
+def test_label_windows():
+    df = _ticker_df(n=30)
+    labels = label_windows(df, 'AAPL', window_size=20, timestamp='2025-01-01T00:00:00')
+
+    assert list(labels.columns) == ['key', 'ticker', 'start_date', 'end_date', 'pattern', 'timestamp']
+    assert len(labels) == 11
+    assert labels['key'].iloc[0] == f"AAPL_{df.index[0].strftime('%Y-%m-%d')}"
+    assert labels['end_date'].iloc[-1] == df.index[-1].strftime('%Y-%m-%d')
+    assert list(labels['pattern']) == list(suggest_labels(df)['pattern'])
+    assert label_windows(_ticker_df(n=10), 'AAPL').empty
+    print("label_windows test passed.")
+
+def main():
+    test_strategy_returns_match_strategies()
+    test_suggest_labels()
+    test_suggest_labels_short_history()
+    test_label_windows()
+
+if __name__ == "__main__":
+    main()
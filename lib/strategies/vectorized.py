@@ -0,0 +1,177 @@
+from lib.strategies.MeanReversionStrategy import Decision
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional, Tuple
+
+DECISION_ORDER = ['uptrend', 'sideways', 'downtrend']  # argmax order: Buy-and-Hold, Mean Reversion, Sell-and-Hold
+RSI_COLUMNS = [f'rsi_{i}' for i in range(1, 21)]
+
+def _window_starts(n_rows: int, window_size: int) -> np.ndarray:
+    return np.arange(max(n_rows - window_size + 1, 0))
+
+def buy_and_hold_returns(close: np.ndarray, window_size: int = 20, starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """BuyAndHoldStrategy return of every full window (or the windows at `starts`), indexed by window start"""
+    if starts is None:
+        starts = _window_starts(close.shape[-1], window_size)
+    first_close = close[..., starts]
+    last_close = close[..., starts + window_size - 1]
+    return ((last_close - first_close) / first_close) * 100
+
+def sell_and_hold_returns(close: np.ndarray, window_size: int = 20, starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """SellAndHoldStrategy return of every full window (or the windows at `starts`), indexed by window start"""
+    return -buy_and_hold_returns(close, window_size, starts)
+
+def rsi_decisions(rsi: np.ndarray, buy_threshold: float = 30, sell_threshold: float = 70,
+                  quorum: Optional[int] = None) -> np.ndarray:
+    """
+    MeanReversionStrategy vote of every day.
+
+    Args:
+        rsi: (n_days, lookback) matrix of RSI values, one column per period
+        buy_threshold: RSI at or below which a period votes BUY
+        sell_threshold: RSI at or above which a period votes SELL
+        quorum: Votes needed to act (default: more than half the periods)
+
+    Returns:
+        Decision per day as int8 (Decision.BUY, Decision.HOLD or Decision.SELL)
+    """
+    if quorum is None:
+        quorum = rsi.shape[1] // 2 + 1
+    # NaN compares false on both sides, so a missing RSI votes HOLD as in _interpretRSI
+    buy_votes = (rsi <= buy_threshold).sum(axis=1)
+    sell_votes = (rsi >= sell_threshold).sum(axis=1)
+    hold_votes = rsi.shape[1] - buy_votes - sell_votes
+    # Same precedence as iterating the vote map: BUY, then HOLD, then SELL
+    decisions = np.full(len(rsi), Decision.HOLD, dtype=np.int8)
+    decisions[(sell_votes >= quorum) & (hold_votes < quorum)] = Decision.SELL
+    decisions[buy_votes >= quorum] = Decision.BUY
+    return decisions
+
+def mean_reversion_returns(close: np.ndarray, decisions: np.ndarray, window_size: int = 20,
+                           starts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    MeanReversionStrategy return of every full window (or the windows at
+    `starts`), indexed by window start.
+
+    The per-day trading state is simulated for all windows at once, stepping
+    through the `window_size` days of every window together. `decisions` may
+    have leading axes (e.g. one row of decisions per parameter setting, or
+    one row of closes and decisions per ticker); the result then has the
+    same leading axes.
+    """
+    if starts is None:
+        starts = _window_starts(close.shape[-1], window_size)
+    shape = decisions.shape[:-1] + (len(starts),)
+    accumulated = np.zeros(shape)
+    has_bought = np.zeros(shape, dtype=bool)
+    buy_spot = np.zeros(shape)
+    for day in range(window_size):
+        spot = close[..., starts + day]
+        decision = decisions[..., starts + day]
+
+        buy = decision == Decision.BUY
+        buy_spot = np.where(buy, spot, buy_spot)
+        has_bought |= buy
+
+        sell = (decision == Decision.SELL) & has_bought
+        gain = np.divide(spot - buy_spot, buy_spot, out=np.zeros(shape), where=sell) * 100
+        accumulated += gain
+        has_bought &= ~sell
+    return accumulated
+
+def _close(df: pd.DataFrame) -> np.ndarray:
+    return df['close'].to_numpy(dtype=np.float64)
+
+def _mean_reversion(df: pd.DataFrame, window_size: int, starts: np.ndarray) -> np.ndarray:
+    decisions = rsi_decisions(df[RSI_COLUMNS].to_numpy(dtype=np.float64))
+    return mean_reversion_returns(_close(df), decisions, window_size, starts)
+
+# Labelling strategies in argmax order (see DECISION_ORDER): the version of
+# their results, the input columns they read and the vectorized implementation
+# computing the windows at `starts`. StrategyCache keys its entries by the
+# version, so bump it whenever `compute` (or a function it calls, e.g.
+# mean_reversion_returns) changes its results
+STRATEGIES: Dict[str, Tuple[int, list, Callable[[pd.DataFrame, int, np.ndarray], np.ndarray]]] = {
+    'buy_and_hold': (
+        1, ['close'],
+        lambda df, window_size, starts: buy_and_hold_returns(_close(df), window_size, starts)
+    ),
+    'mean_reversion': (1, ['close'] + RSI_COLUMNS, _mean_reversion),
+    'sell_and_hold': (
+        1, ['close'],
+        lambda df, window_size, starts: sell_and_hold_returns(_close(df), window_size, starts)
+    ),
+}
+
+def strategy_returns(df: pd.DataFrame, window_size: int = 20) -> pd.DataFrame:
+    """
+    Returns of the three labelling strategies for every full window of a ticker.
+
+    Args:
+        df: Date-indexed frame with close and rsi_1..rsi_20 columns
+        window_size: Trading days per window
+
+    Returns:
+        Frame indexed by window start date with buy_and_hold, mean_reversion
+        and sell_and_hold return percentages
+    """
+    starts = _window_starts(len(df), window_size)
+    return pd.DataFrame({
+        name: compute(df, window_size, starts)
+        for name, (_, _, compute) in STRATEGIES.items()
+    }, index=df.index[starts])
+
+def suggest_labels(df: pd.DataFrame, window_size: int = 20, uncertainty_margin: float = 1.0,
+                   returns: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Suggested pattern of every full window, as the auto labeller would pick it.
+
+    Args:
+        df: Date-indexed frame with close and rsi_1..rsi_20 columns
+        window_size: Trading days per window
+        uncertainty_margin: Windows whose best strategy beats the runner-up by
+            less than this many percentage points are flagged uncertain
+        returns: Precomputed strategy_returns (e.g. from a StrategyCache)
+
+    Returns:
+        Frame of strategy_returns plus the suggested `pattern`, the `margin`
+        between the two best returns and an `uncertain` flag
+    """
+    if returns is None:
+        returns = strategy_returns(df, window_size)
+    values = returns[list(STRATEGIES)].to_numpy()
+    ranked = np.sort(values, axis=1)
+
+    suggestions = returns.copy()
+    suggestions['pattern'] = np.array(DECISION_ORDER)[np.argmax(values, axis=1)] if len(values) else []
+    suggestions['margin'] = ranked[:, -1] - ranked[:, -2] if len(values) else []
+    suggestions['uncertain'] = ~(suggestions['margin'] >= uncertainty_margin)
+    return suggestions
+
+def label_windows(df: pd.DataFrame, ticker: str, window_size: int = 20, timestamp: str = '',
+                  returns: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Auto labels of every full window of a ticker, in the label CSV layout.
+
+    Args:
+        df: Date-indexed frame with close and rsi_1..rsi_20 columns
+        ticker: Stock ticker symbol
+        window_size: Trading days per window
+        timestamp: Value of the timestamp column
+        returns: Precomputed strategy_returns (e.g. from a StrategyCache)
+
+    Returns:
+        Frame with the LABEL_COLUMNS of lib.labeller, one row per window
+    """
+    suggestions = suggest_labels(df, window_size, returns=returns)
+    days = np.datetime_as_string(np.asarray(df.index, dtype='datetime64[D]'))
+    starts = _window_starts(len(df), window_size)
+    start_dates = days[starts]
+    return pd.DataFrame({
+        'key': np.char.add(f"{ticker}_", start_dates.astype(str)),
+        'ticker': ticker,
+        'start_date': start_dates,
+        'end_date': days[starts + window_size - 1],
+        'pattern': suggestions['pattern'].to_numpy(),
+        'timestamp': timestamp,
+    })
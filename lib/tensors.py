@@ -0,0 +1,251 @@
+from lib.strategies.vectorized import RSI_COLUMNS
+from typing import Callable, Iterable, List, Optional, Tuple
+import ast
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+FEATURE_COLUMNS = ['open', 'high', 'low', 'close', 'volume'] + RSI_COLUMNS + ['ema_20', 'ema_50', 'ema_200']
+NORMALIZATIONS = ['none', 'zscore', 'first']
+NPY_HEADER_SIZE = 128  # Reserved so the final shape can be written after streaming
+
+def sliding_windows(values: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Zero-copy (n_windows, window_size, n_features) view over a (n_days, n_features) array.
+
+    Window i covers rows i .. i + window_size - 1, so windows are indexed by
+    the row position of their start date.
+    """
+    if len(values) < window_size:
+        return np.empty((0, window_size, values.shape[1]), dtype=values.dtype)
+    # sliding_window_view puts the window axis last; swap it in front of the features
+    return np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0).transpose(0, 2, 1)
+
+def normalize_windows(windows: np.ndarray, method: str = 'zscore') -> np.ndarray:
+    """
+    Normalize every window and feature independently.
+
+    Args:
+        windows: (n_windows, window_size, n_features) array
+        method: 'zscore' to subtract the window mean and divide by its standard
+            deviation, 'first' to divide by the window's first value, or 'none'
+
+    Returns:
+        float32 array of the same shape
+    """
+    windows = windows.astype(np.float32, copy=False)
+    if method == 'none':
+        return windows
+    if method == 'zscore':
+        mean = windows.mean(axis=1, keepdims=True)
+        std = windows.std(axis=1, keepdims=True)
+        return (windows - mean) / np.where(std > 0, std, 1)
+    if method == 'first':
+        first = windows[:, :1, :]
+        return windows / np.where(first != 0, first, 1)
+    raise ValueError(f"Unknown normalization {method!r}, expected one of {NORMALIZATIONS}")
+
+def window_positions(dates: pd.Index, start_dates: np.ndarray, window_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row positions of labelled windows in a ticker's date index.
+
+    Args:
+        dates: Sorted trading dates of the ticker
+        start_dates: datetime64 window start dates
+        window_size: Trading days per window
+
+    Returns:
+        Tuple of the row positions and a mask over start_dates of the windows
+        that start on a trading day and fit before the end of the data
+    """
+    days = np.asarray(dates, dtype='datetime64[D]')
+    starts = np.asarray(start_dates, dtype='datetime64[D]')
+    positions = np.searchsorted(days, starts)
+    found = positions < len(days)
+    found[found] = days[positions[found]] == starts[found]
+    found &= positions + window_size <= len(days)
+    return positions[found], found
+
+class NpyAppender:
+    """
+    Stream rows into a .npy file without knowing the row count up front.
+
+    A fixed-size header is reserved when the file is opened and rewritten
+    with the final shape on close, so the result loads with
+    `np.load(filename, mmap_mode='r')`.
+    """
+    def __init__(self, filename: str, dtype, item_shape: Tuple[int, ...] = ()):
+        self.filename = filename
+        self.dtype = np.dtype(dtype)
+        self.item_shape = tuple(item_shape)
+        self.rows = 0
+        self._file = open(filename, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        header = repr({
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (self.rows,) + self.item_shape,
+        })
+        magic = np.lib.format.magic(1, 0)
+        # magic + 2-byte length + header padded with spaces and terminated by a newline
+        padding = NPY_HEADER_SIZE - len(magic) - 2 - len(header) - 1
+        if padding < 0:
+            raise ValueError(f"Shape {self.item_shape} does not fit in the reserved .npy header")
+        self._file.seek(0)
+        self._file.write(magic)
+        self._file.write((NPY_HEADER_SIZE - len(magic) - 2).to_bytes(2, 'little'))
+        self._file.write((header + ' ' * padding + '\n').encode('latin1'))
+
+    def append(self, rows: np.ndarray):
+        """Append rows of shape (n, *item_shape)"""
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        if rows.shape[1:] != self.item_shape:
+            raise ValueError(f"Expected rows of shape {self.item_shape}, got {rows.shape[1:]}")
+        self._file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self) -> "NpyAppender":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _ticker_groups(labels: pd.DataFrame, tickers: Optional[Iterable[str]]) -> List[Tuple[str, pd.DataFrame]]:
+    groups = dict(tuple(labels.groupby('ticker', sort=True, observed=True)))
+    if tickers is None:
+        tickers = groups.keys()
+    return [(ticker, groups[ticker]) for ticker in tickers if ticker in groups]
+
+def export_tensors(labels: pd.DataFrame, load_fn: Callable[[str], Optional[pd.DataFrame]], prefix: str,
+                   window_size: int = 20, features: List[str] = FEATURE_COLUMNS, normalize: str = 'none',
+                   fmt: str = 'npy', tickers: Optional[Iterable[str]] = None) -> int:
+    """
+    Export labelled windows as fixed-shape feature tensors, one ticker at a time.
+
+    Only one ticker's market data is held in memory at once. Each ticker's
+    feature matrix is converted to float32 once and windows are sliced from
+    it as a zero-copy sliding-window view; only the labelled windows are
+    copied out.
+
+    Args:
+        labels: Frame with ticker, start_date and integer label columns
+            (as written by upload.load_and_process_csv)
+        load_fn: Returns the date-indexed market data of a ticker (load_data)
+        prefix: Output path prefix. 'npy' writes <prefix>_X.npy (float32,
+            n_windows x window_size x n_features), <prefix>_y.npy (int8) and
+            <prefix>_windows.csv; 'arrow' writes a single <prefix>.arrow file
+        window_size: Trading days per window
+        features: Market data columns to export, in order
+        normalize: Per-window normalization, one of NORMALIZATIONS
+        fmt: 'npy' or 'arrow'
+        tickers: Tickers to export (default: every ticker in labels)
+
+    Returns:
+        Number of windows written
+    """
+    if fmt not in ('npy', 'arrow'):
+        raise ValueError(f"Unknown format {fmt!r}, expected 'npy' or 'arrow'")
+    if normalize not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization {normalize!r}, expected one of {NORMALIZATIONS}")
+
+    writer = _ArrowWriter(prefix, window_size, features) if fmt == 'arrow' \
+        else _NpyWriter(prefix, window_size, features)
+    total = 0
+    try:
+        for ticker, ticker_labels in _ticker_groups(labels, tickers):
+            df = load_fn(ticker)
+            if df is None:
+                print(f"[WARN] No market data for {ticker}, skipping {len(ticker_labels)} windows")
+                continue
+            df = df.sort_index()
+            positions, found = window_positions(df.index, ticker_labels['start_date'].to_numpy(), window_size)
+            if len(positions) == 0:
+                continue
+
+            values = df[features].to_numpy(dtype=np.float32)
+            windows = normalize_windows(sliding_windows(values, window_size)[positions], normalize)
+            writer.write(
+                ticker,
+                ticker_labels['start_date'].to_numpy()[found],
+                windows,
+                ticker_labels['label'].to_numpy()[found].astype(np.int8)
+            )
+            total += len(positions)
+    finally:
+        writer.close()
+    return total
+
+class _NpyWriter:
+    def __init__(self, prefix: str, window_size: int, features: List[str]):
+        self._x = NpyAppender(f"{prefix}_X.npy", np.float32, (window_size, len(features)))
+        self._y = NpyAppender(f"{prefix}_y.npy", np.int8)
+        self._index = open(f"{prefix}_windows.csv", 'w')
+        self._index.write('ticker,start_date\n')
+
+    def write(self, ticker: str, start_dates: np.ndarray, windows: np.ndarray, labels: np.ndarray):
+        self._x.append(windows)
+        self._y.append(labels)
+        days = np.datetime_as_string(np.asarray(start_dates, dtype='datetime64[D]'))
+        self._index.writelines(f"{ticker},{day}\n" for day in days)
+
+    def close(self):
+        self._x.close()
+        self._y.close()
+        self._index.close()
+
+class _ArrowWriter:
+    def __init__(self, prefix: str, window_size: int, features: List[str]):
+        self._item_size = window_size * len(features)
+        self._schema = pa.schema(
+            [
+                ('ticker', pa.string()),
+                ('start_date', pa.date32()),
+                ('label', pa.int8()),
+                ('features', pa.list_(pa.float32(), self._item_size)),
+            ],
+            metadata={'window_size': str(window_size), 'features': repr(list(features))}
+        )
+        self._sink = pa.OSFile(f"{prefix}.arrow", 'wb')
+        self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write(self, ticker: str, start_dates: np.ndarray, windows: np.ndarray, labels: np.ndarray):
+        flat = pa.array(np.ascontiguousarray(windows).reshape(-1))
+        self._writer.write_batch(pa.record_batch([
+            pa.array([ticker] * len(labels), pa.string()),
+            pa.array(np.asarray(start_dates, dtype='datetime64[D]')),
+            pa.array(labels),
+            pa.FixedSizeListArray.from_arrays(flat, self._item_size),
+        ], schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+def load_arrow_tensors(filename: str) -> Tuple[np.ndarray, np.ndarray, pd.DataFrame]:
+    """
+    Memory-map an .arrow export.
+
+    Returns:
+        Tuple of the (n_windows, window_size, n_features) float32 features, the
+        int8 labels and a frame with the ticker and start_date of every window.
+        Features and labels are zero-copy views of the mapped file when it has
+        a single record batch.
+    """
+    table = pa.ipc.open_file(pa.memory_map(filename, 'r')).read_all()
+    metadata = table.schema.metadata
+    window_size = int(metadata[b'window_size'])
+    n_features = len(ast.literal_eval(metadata[b'features'].decode()))
+
+    features = table.column('features').combine_chunks().flatten()
+    windows = features.to_numpy(zero_copy_only=False).reshape(-1, window_size, n_features)
+    labels = table.column('label').to_numpy()
+    index = table.select(['ticker', 'start_date']).to_pandas()
+    return windows, labels, index
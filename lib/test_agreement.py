@@ -0,0 +1,99 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from lib.agreement import agreement_by, confusion_matrix, disagreement_hot_spots, join_labels, read_label_file
+
+def _frame(rows):
+    return pd.DataFrame({
+        'ticker': pd.Categorical([row[0] for row in rows]),
+        'start_date': pd.to_datetime([row[1] for row in rows]),
+        'label': np.array([row[2] for row in rows], dtype=np.int8),
+    })
+
+def _manual():
+    return _frame([
+        ('AAPL', '2020-01-02', 2), ('AAPL', '2020-01-03', 1), ('AAPL', '2020-04-01', 0),
+        ('MSFT', '2020-01-02', 2), ('MSFT', '2021-01-04', 1),
+    ])
+
+def _auto():
+    # Shuffled, with a ticker and a window the manual labels do not have
+    return _frame([
+        ('MSFT', '2021-01-04', 0), ('AAPL', '2020-04-01', 0), ('IBM', '2020-01-02', 2),
+        ('AAPL', '2020-01-02', 2), ('AAPL', '2020-01-06', 1), ('AAPL', '2020-01-03', 2),
+    ])
+
+def test_join_labels():
+    joined = join_labels(_manual(), _auto())
+    assert len(joined) == 4, f"Expected 4 common windows, got {len(joined)}"
+    assert list(joined['ticker'].astype(str)) == ['AAPL', 'AAPL', 'AAPL', 'MSFT']
+    assert list(joined['start_date'].dt.strftime('%Y-%m-%d')) == ['2020-01-02', '2020-01-03', '2020-04-01', '2021-01-04']
+    assert list(joined['manual']) == [2, 1, 0, 1]
+    assert list(joined['auto']) == [2, 2, 0, 0]
+    print("join_labels test passed.")
+
+def test_confusion_matrix():
+    matrix = confusion_matrix(join_labels(_manual(), _auto()))
+    assert matrix.loc['uptrend', 'uptrend'] == 1
+    assert matrix.loc['sideways', 'uptrend'] == 1
+    assert matrix.loc['downtrend', 'downtrend'] == 1
+    assert matrix.loc['sideways', 'downtrend'] == 1
+    assert matrix.to_numpy().sum() == 4
+    print("confusion_matrix test passed.")
+
+def test_agreement_by():
+    joined = join_labels(_manual(), _auto())
+    by_ticker = agreement_by(joined, 'ticker')
+    assert list(by_ticker.index) == ['AAPL', 'MSFT'], "Tickers without common windows should be left out"
+    assert by_ticker.loc['AAPL', 'agreed'] == 2 and by_ticker.loc['AAPL', 'disagreed'] == 1
+    assert by_ticker.loc['MSFT', 'agreement'] == 0.0
+
+    by_quarter = agreement_by(joined, 'quarter')
+    assert list(by_quarter.index) == ['2020Q1', '2020Q2', '2021Q1']
+    assert list(by_quarter['windows']) == [2, 1, 1]
+
+    by_both = agreement_by(joined, ['ticker', 'year'])
+    assert list(by_both.index) == [('AAPL', '2020'), ('MSFT', '2021')]
+    print("agreement_by test passed.")
+
+def test_disagreement_hot_spots():
+    hot_spots = disagreement_hot_spots(join_labels(_manual(), _auto()), 'month', min_windows=1, top=2)
+    assert list(hot_spots.index) == [('MSFT', '2021-01'), ('AAPL', '2020-01')]
+    assert list(hot_spots['agreement']) == [0.0, 0.5]
+    print("disagreement_hot_spots test passed.")
+
+def test_agreement_by_skips_unknown_labels():
+    manual = _frame([('AAPL', '2020-01-02', -1), ('AAPL', '2020-01-03', 1), ('AAPL', '2020-01-06', 2)])
+    auto = _frame([('AAPL', '2020-01-02', -1), ('AAPL', '2020-01-03', -1), ('AAPL', '2020-01-06', 2)])
+    by_ticker = agreement_by(join_labels(manual, auto), 'ticker')
+    assert by_ticker.loc['AAPL', 'windows'] == 1 and by_ticker.loc['AAPL', 'unknown'] == 2
+    assert by_ticker.loc['AAPL', 'agreed'] == 1 and by_ticker.loc['AAPL', 'disagreed'] == 0
+    assert by_ticker.loc['AAPL', 'agreement'] == 1.0, "Two unknown labels should not count as agreement"
+    print("agreement_by unknown labels test passed.")
+
+def test_read_label_file():
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "labels.csv")
+        pd.DataFrame({
+            'key': ['AAPL_2020-01-02', 'AAPL_2020-01-03'],
+            'ticker': ['AAPL', 'AAPL'],
+            'start_date': ['2020-01-02', '2020-01-03'],
+            'end_date': ['2020-01-30', '2020-01-31'],
+            'pattern': ['uptrend', 'unknown'],
+            'timestamp': ['', ''],
+        }).to_csv(filename, index=False)
+        df = read_label_file(filename)
+    assert list(df['label']) == [2, -1], "Unknown patterns should map to -1"
+    print("read_label_file test passed.")
+
+def main():
+    test_join_labels()
+    test_confusion_matrix()
+    test_agreement_by()
+    test_agreement_by_skips_unknown_labels()
+    test_disagreement_hot_spots()
+    test_read_label_file()
+
+if __name__ == "__main__":
+    main()
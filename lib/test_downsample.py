@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from lib.downsample import bucket_starts, ohlc_downsample, label_bands
+
+def _ohlc(n: int) -> pd.DataFrame:
+    close = np.arange(n, dtype=float)
+    return pd.DataFrame({
+        'open': close + 0.5,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': np.ones(n, dtype=np.int64),
+        'ema_20': close * 2,
+    }, index=pd.Index(pd.bdate_range('2020-01-01', periods=n).date, name='date'))
+
+def test_bucket_starts():
+    assert list(bucket_starts(10, 3)) == [0, 3, 6]
+    assert list(bucket_starts(2, 5)) == [0, 1], "Expected no empty buckets"
+    print("bucket_starts test passed.")
+
+def test_ohlc_downsample_preserves_extremes():
+    df = _ohlc(10)
+    df.loc[df.index[4], 'high'] = 100
+    df.loc[df.index[7], 'low'] = -100
+    result = ohlc_downsample(df, 3)
+
+    assert len(result) == 3
+    assert list(result.index) == [df.index[0], df.index[3], df.index[6]]
+    assert list(result['open']) == [0.5, 3.5, 6.5]
+    assert list(result['close']) == [2, 5, 9]
+    assert result['high'].max() == 100 and result['low'].min() == -100
+    assert list(result['volume']) == [3, 3, 4]
+    assert list(result['rows']) == [3, 3, 4]
+    assert list(result['ema_20']) == [4, 10, 18]
+    print("ohlc_downsample test passed.")
+
+def test_label_bands():
+    buckets = pd.Index([date(2020, 1, 1), date(2020, 1, 10), date(2020, 1, 20)])
+    label_dates = [date(2020, 1, 2), date(2020, 1, 3), date(2020, 1, 4), date(2020, 1, 25)]
+    bands = label_bands(buckets, label_dates, [2, 2, 0, 1])
+
+    assert list(bands['total']) == [3, 0, 1]
+    assert list(bands['dominant']) == [2, -1, 1]
+    assert list(bands[2]) == [2, 0, 0]
+
+    # Unknown patterns (-1) are not counted, including in the first bucket
+    bands = label_bands(buckets, label_dates + [date(2020, 1, 1), date(2020, 1, 12)], [2, 2, 0, 1, -1, -1])
+    assert list(bands['total']) == [3, 0, 1]
+    assert list(bands['dominant']) == [2, -1, 1]
+    print("label_bands test passed.")
+
+def main():
+    test_bucket_starts()
+    test_ohlc_downsample_preserves_extremes()
+    test_label_bands()
+
+if __name__ == "__main__":
+    main()
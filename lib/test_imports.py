@@ -0,0 +1,71 @@
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['numpy', 'pandas', 'pyarrow', 'sqlalchemy', 'plotly']
+# Budget for importing the upload.py and auto_labeller.py entry points only; both took
+# ~850 ms when they loaded pandas and SQLAlchemy eagerly. The scripts import the lib
+# modules a command needs inside that command
+IMPORT_BUDGET_US = 150_000
+# Budget for the database layer `upload.py --file` imports (SQLAlchemy and one model);
+# it took ~1 s when create_env_db_engine came from lib.labeller
+COMMAND_IMPORT_BUDGET_US = 500_000
+UPLOAD_COMMAND_MODULES = ['dotenv', 'lib.db.session', 'lib.models.SupervisedClassifierDataset']
+
+def import_profile(*modules: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Import modules in a fresh interpreter under `python -X importtime`.
+
+    Returns:
+        Cumulative import time of the modules in microseconds, and the
+        cumulative time of every module they loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    loaded = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| +(\S+)', line)
+        if match:
+            loaded[match.group(2)] = int(match.group(1))
+    return sum(loaded[module] for module in modules), loaded
+
+def test_script_import_budget():
+    for script in ['upload', 'auto_labeller']:
+        elapsed, loaded = import_profile(script)
+        heavy = sorted({name.split('.')[0] for name in loaded} & set(HEAVY_MODULES))
+        assert not heavy, f"import {script} loads {', '.join(heavy)}"
+        assert elapsed < IMPORT_BUDGET_US, f"import {script} took {elapsed} us, budget {IMPORT_BUDGET_US} us"
+    print("Script import budget test passed.")
+
+def test_merge_skips_database_layer():
+    # `auto_labeller.py merge` only reads partition CSVs
+    _, loaded = import_profile('lib.sharding')
+    assert 'sqlalchemy' not in loaded and 'lib.labeller' not in loaded
+    print("Merge import test passed.")
+
+def test_upload_command_skips_labeller():
+    # The modules upload.main imports before it reads the CSV with pandas
+    elapsed, loaded = import_profile(*UPLOAD_COMMAND_MODULES)
+    unwanted = sorted({'lib.labeller', 'lib.indicators', 'lib.index.WindowIndex', 'pyarrow', 'plotly'} & set(loaded))
+    assert not unwanted, f"upload --file loads {', '.join(unwanted)}"
+    assert elapsed < COMMAND_IMPORT_BUDGET_US, f"upload --file imports took {elapsed} us, budget {COMMAND_IMPORT_BUDGET_US} us"
+    print("Upload command import test passed.")
+
+def test_labeller_defers_optional_modules():
+    _, loaded = import_profile('lib.labeller')
+    assert not {'pyarrow.feather', 'lib.indicators', 'lib.index.WindowIndex'} & set(loaded)
+    print("Labeller import test passed.")
+
+def main():
+    test_script_import_budget()
+    test_merge_skips_database_layer()
+    test_upload_command_skips_labeller()
+    test_labeller_defers_optional_modules()
+
+if __name__ == "__main__":
+    main()
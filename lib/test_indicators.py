@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from lib.indicators import compare_indicators, compute_indicators, ema, rsi, smooth
+
+def _close(n: int = 300, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    close[50:55] = close[49]  # A flat stretch
+    return close
+
+def _wilder_rsi(close, period):
+    """Reference loop implementation (TA-Lib convention)"""
+    change = np.diff(close)
+    result = np.full(len(close), np.nan)
+    if len(change) < period:
+        return result
+    gain = np.maximum(change[:period], 0).mean()
+    loss = np.maximum(-change[:period], 0).mean()
+    for t in range(period, len(close)):
+        if t > period:
+            gain = (gain * (period - 1) + max(change[t - 1], 0)) / period
+            loss = (loss * (period - 1) + max(-change[t - 1], 0)) / period
+        result[t] = 50.0 if gain + loss == 0 else 100 * gain / (gain + loss)
+    return result
+
+def _ema(close, period):
+    result = np.full(len(close), np.nan)
+    if len(close) < period:
+        return result
+    value = close[:period].mean()
+    result[period - 1] = value
+    alpha = 2 / (period + 1)
+    for t in range(period, len(close)):
+        value = alpha * close[t] + (1 - alpha) * value
+        result[t] = value
+    return result
+
+def test_smooth_matches_recurrence():
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal((150, 3))
+    alphas = np.array([1.0, 0.5, 0.01])
+    y = smooth(x, alphas, initial=np.array([0.0, 1.0, 2.0]))
+    expected = np.empty_like(x)
+    previous = np.array([0.0, 1.0, 2.0])
+    for t in range(len(x)):
+        previous = (1 - alphas) * previous + alphas * x[t]
+        expected[t] = previous
+    assert np.allclose(y, expected), "Blocked smoothing should match the day-by-day recurrence"
+    print("smooth test passed.")
+
+def test_rsi_matches_reference():
+    close = _close()
+    result = rsi(close)
+    assert result.shape == (300, 20)
+    for period in [1, 2, 14, 20]:
+        expected = _wilder_rsi(close, period)
+        assert np.allclose(result[:, period - 1], expected, equal_nan=True), f"RSI {period} differs"
+    assert np.isnan(rsi(close[:5])[:, 10]).all(), "Periods longer than the history are NaN"
+    print("rsi test passed.")
+
+def test_ema_matches_reference():
+    close = _close()
+    result = ema(close)
+    for column, period in enumerate([20, 50, 200]):
+        assert np.allclose(result[:, column], _ema(close, period), equal_nan=True), f"EMA {period} differs"
+    print("ema test passed.")
+
+def test_compute_and_compare_indicators():
+    df = pd.DataFrame({'close': _close()}, index=pd.bdate_range('2020-01-01', periods=300).date)
+    computed = compute_indicators(df)
+    assert list(computed.columns[:2]) == ['rsi_1', 'rsi_2'] and computed.columns[-1] == 'ema_200'
+
+    stored = computed.copy()
+    stored.iloc[250, stored.columns.get_loc('ema_20')] += 0.5
+    report = compare_indicators(stored.iloc[10:], computed)
+    assert report.loc['rsi_14', 'max_abs_diff'] == 0
+    assert report.loc['ema_20', 'max_abs_diff'] == 0.5
+    assert report.loc['ema_200', 'rows'] == 300 - 199 and report.loc['rsi_1', 'rows'] == 290
+    print("compute/compare indicators test passed.")
+
+def main():
+    test_smooth_matches_recurrence()
+    test_rsi_matches_reference()
+    test_ema_matches_reference()
+    test_compute_and_compare_indicators()
+
+if __name__ == "__main__":
+    main()
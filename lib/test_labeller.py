@@ -0,0 +1,101 @@
+import os
+import tempfile
+from datetime import date
+from lib.db.session import create_embedded_engine, create_engine_session
+from lib.db.snapshot import load_snapshot
+from lib.db.test_snapshot import _write_snapshot
+from lib.index.WindowIndex import WindowIndex
+from lib.labeller import get_bars, load_labels, save_labels
+
+def _labels():
+    return {
+        'AAPL_1997-01-02': {
+            'ticker': 'AAPL',
+            'start_date': '1997-01-02',
+            'end_date': '1997-01-29',
+            'pattern': 'downtrend',
+            'timestamp': '2025-01-12T16:17:40.250107'
+        },
+        'MSFT_1997-01-03': {
+            'ticker': 'MSFT',
+            'start_date': '1997-01-03',
+            'end_date': '1997-01-30',
+            'pattern': 'uptrend',
+            'timestamp': '2025-01-12T16:17:41.524781'
+        },
+    }
+
+def test_load_labels_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'labels.csv')
+        save_labels(_labels(), filename)
+        result = load_labels(filename)
+
+    assert result == _labels(), f"Expected {_labels()}, got {result}"
+    print("load_labels round trip test passed.")
+
+def test_save_packed_labels():
+    index = WindowIndex()
+    labels = index.pack_labels(_labels())
+    assert list(labels) == [index.window_key('AAPL', '1997-01-02'), index.window_key('MSFT', '1997-01-03')]
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'labels.csv')
+        save_labels(labels, filename, window_index=index)
+        result = load_labels(filename)
+
+    assert result == _labels(), f"Expected string keys in the CSV, got {result}"
+    print("save_labels packed key test passed.")
+
+def test_load_labels_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'labels.csv')
+        snapshot = os.path.join(tmp, 'labels.feather')
+        save_labels(_labels(), filename)
+
+        first = load_labels(filename, snapshot=snapshot)
+        assert os.path.exists(snapshot), "Expected the snapshot to be written"
+        second = load_labels(filename, snapshot=snapshot)
+
+        # A CSV rewritten within the same mtime tick as the snapshot must still win over it
+        labels = _labels()
+        del labels['MSFT_1997-01-03']
+        save_labels(labels, filename)
+        mtime_ns = os.stat(snapshot).st_mtime_ns
+        os.utime(filename, ns=(mtime_ns, mtime_ns))
+        third = load_labels(filename, snapshot=snapshot)
+
+    assert first == second == _labels()
+    assert third == labels, f"Expected the stale snapshot to be ignored, got {third}"
+    print("load_labels snapshot test passed.")
+
+def test_load_labels_missing_file():
+    assert load_labels('does-not-exist.csv') == {}
+    print("load_labels missing file test passed.")
+
+def test_get_bars_after_dates():
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_snapshot(tmp)
+        engine = create_embedded_engine(':memory:')
+        load_snapshot(engine, tmp)
+        with create_engine_session(engine)() as session:
+            after_dates = {'AAPL': date(2020, 2, 20), 'MSFT': date(2020, 2, 24), 'IBM': date(2020, 2, 20)}
+            bars = get_bars(session, list(after_dates), after_dates=after_dates)
+            assert get_bars(session, [], after_dates={}).empty
+    engine.dispose()
+
+    # Each ticker only returns the bars after its own date (the last bar is 2020-02-25)
+    assert bars.groupby('ticker')['date'].agg(['min', 'count']).to_dict('index') == {
+        'AAPL': {'min': date(2020, 2, 21), 'count': 3},
+        'MSFT': {'min': date(2020, 2, 25), 'count': 1},
+    }
+    print("get_bars after_dates test passed.")
+
+def main():
+    test_load_labels_round_trip()
+    test_get_bars_after_dates()
+    test_save_packed_labels()
+    test_load_labels_snapshot()
+    test_load_labels_missing_file()
+
+if __name__ == "__main__":
+    main()
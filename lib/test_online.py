@@ -0,0 +1,83 @@
+import os
+import tempfile
+import pandas as pd
+from lib.constants import LABEL_COLUMNS
+from lib.online import BAR_COLUMNS, DirectoryWatcher, OnlineLabeller, append_labels, read_bar_file
+from lib.strategies.test_vectorized import _ticker_df
+from lib.strategies.vectorized import label_windows
+
+def _bars(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+    bars = df.reset_index(names='date')
+    bars.insert(0, 'ticker', ticker)
+    bars['date'] = bars['date'].astype(str)
+    return bars[BAR_COLUMNS]
+
+def test_online_labels_match_batch():
+    frames = {'AAPL': _ticker_df(seed=1), 'MSFT': _ticker_df(n=90, seed=2)}
+    labeller = OnlineLabeller(window_size=20)
+    bars = pd.concat([_bars(ticker, df) for ticker, df in frames.items()]).sort_values('date', kind='stable')
+
+    emitted = []
+    for _, bar in bars.iterrows():
+        label = labeller.update(bar['ticker'], bar['date'], bar['close'], bar[BAR_COLUMNS[3:]], 'now')
+        # A bar completes a window only once 20 bars of its ticker have arrived
+        seen = (bars['ticker'] == bar['ticker']) & (bars['date'] <= bar['date'])
+        assert (label is not None) == (seen.sum() >= 20)
+        if label is not None:
+            assert label['end_date'] == bar['date']
+            emitted.append(label)
+
+    online = pd.DataFrame(emitted, columns=LABEL_COLUMNS).sort_values(['ticker', 'start_date'], ignore_index=True)
+    batch = pd.concat([label_windows(df, ticker, 20, 'now') for ticker, df in frames.items()]).sort_values(
+        ['ticker', 'start_date'], ignore_index=True)
+    pd.testing.assert_frame_equal(online, batch, check_dtype=False)
+    print("Online labels match batch test passed.")
+
+def test_online_ignores_replayed_bars():
+    bars = _bars('AAPL', _ticker_df(n=30))
+    labeller = OnlineLabeller(window_size=20)
+    # Seeding with the last 19 bars emits nothing; the next bar completes a window
+    assert labeller.update_bars(bars.iloc[:19]).empty
+    assert labeller.last_date('AAPL') == bars['date'].iloc[18]
+    labels = labeller.update_bars(bars.iloc[10:25])
+    assert labels['end_date'].tolist() == bars['date'].iloc[19:25].tolist()
+    assert labeller.update_bars(bars.iloc[:25]).empty
+    assert labeller.last_date('MSFT') is None
+    print("Online replay test passed.")
+
+def test_directory_watcher():
+    bars = _bars('AAPL', _ticker_df(n=22))
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, 'inbox')
+        os.makedirs(inbox)
+        watcher = DirectoryWatcher(inbox)
+        bars.iloc[:21].to_csv(os.path.join(inbox, '2020-01-30.csv'), index=False)
+        bars.iloc[21:].to_csv(os.path.join(inbox, '2020-01-31.csv'), index=False)
+        bars.to_csv(os.path.join(inbox, 'partial.csv.tmp'), index=False)
+        pd.DataFrame({'ticker': ['AAPL']}).to_csv(os.path.join(inbox, 'broken.csv'), index=False)
+        assert [os.path.basename(f) for f in watcher.pending()] == ['2020-01-30.csv', '2020-01-31.csv', 'broken.csv']
+
+        labeller = OnlineLabeller(window_size=20)
+        output = os.path.join(tmp, 'live_labels.csv')
+        for filename in watcher.pending():
+            try:
+                append_labels(labeller.update_bars(read_bar_file(filename)), output)
+                watcher.done(filename)
+            except ValueError:
+                watcher.done(filename, failed=True)
+
+        assert watcher.pending() == []
+        assert sorted(os.listdir(watcher.processed)) == ['2020-01-30.csv', '2020-01-31.csv']
+        assert os.listdir(watcher.failed) == ['broken.csv']
+        labels = pd.read_csv(output)
+        assert list(labels.columns) == LABEL_COLUMNS
+        assert labels['end_date'].tolist() == bars['date'].iloc[19:].tolist()
+    print("Directory watcher test passed.")
+
+def main():
+    test_online_labels_match_batch()
+    test_online_ignores_replayed_bars()
+    test_directory_watcher()
+
+if __name__ == "__main__":
+    main()
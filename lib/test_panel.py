@@ -0,0 +1,105 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from lib.panel import PANEL_FIELDS, Panel
+from lib.strategies.test_vectorized import _ticker_df
+from lib.strategies.vectorized import DECISION_ORDER, suggest_labels
+
+def _frames():
+    frames = {'AAPL': _ticker_df(seed=1), 'MSFT': _ticker_df(seed=2), 'GE': _ticker_df(seed=3)}
+    # GE misses one day and starts later
+    frames['GE'] = frames['GE'].drop(frames['GE'].index[60]).iloc[10:]
+    return frames
+
+def _float32(df: pd.DataFrame) -> pd.DataFrame:
+    return df[PANEL_FIELDS].astype(np.float32).astype(np.float64)
+
+def test_panel_from_frames():
+    frames = _frames()
+    panel = Panel.from_frames(frames)
+
+    assert panel.values.shape == (120, 3, len(PANEL_FIELDS)) and panel.values.dtype == np.float32
+    assert panel.valid.sum(axis=0).tolist() == [120, 120, 109]
+    assert np.isnan(panel.field('close')[60, 2])
+    pd.testing.assert_frame_equal(panel.frame('GE'), frames['GE'][PANEL_FIELDS].astype(np.float32), check_names=False)
+    assert panel.dates[0] == frames['AAPL'].index[0]
+    print("Panel construction test passed.")
+
+def test_panel_labels_match_per_ticker_labels():
+    frames = _frames()
+    panel = Panel.from_frames(frames)
+    labels = panel.label_windows(20)
+
+    validity = panel.window_validity(20)
+    assert labels.shape == (101, 3)
+    # GE windows must not start before its first day or span the missing day
+    assert validity[:, :2].all()
+    assert validity[:, 2].sum() == 101 - 10 - 20
+    assert (labels[~validity] == -1).all()
+
+    for t, ticker in enumerate(panel.tickers):
+        expected = suggest_labels(_float32(frames[ticker]))['pattern']
+        rows = np.flatnonzero(validity[:, t])
+        starts = expected.index.isin(panel.dates[rows])
+        assert np.array_equal(np.array(DECISION_ORDER)[labels[rows, t]], expected[starts].to_numpy()), ticker
+    print("Panel label test passed.")
+
+def test_panel_relative_labels_and_cross_section():
+    panel = Panel.from_frames(_frames())
+    returns = panel.strategy_returns(20, block=2)
+    assert np.allclose(returns, panel.strategy_returns(20), equal_nan=True)
+
+    relative = panel.label_windows(20, relative=True, returns=returns)
+    # Buy-and-Hold relative to the universe: above the mean for an uptrend and below it for a downtrend
+    excess = returns[:, :, 0] - np.nanmean(returns[:, :, 0], axis=1, keepdims=True)
+    assert (excess[relative == 0] >= 0).all() and (excess[relative == 2] <= 0).all()
+
+    labels = panel.label_windows(20, returns=returns)
+    report = panel.cross_section(labels)
+    assert list(report.columns) == ['tickers'] + DECISION_ORDER
+    assert report['tickers'].iloc[0] == 2 and report['tickers'].iloc[40] == 3
+    assert np.allclose(report[DECISION_ORDER].sum(axis=1), 1.0)
+    assert np.isclose(report['uptrend'].iloc[0], (labels[0, :2] == 0).mean())
+    print("Panel relative labels and cross-section test passed.")
+
+def test_panel_aggregate():
+    frames = _frames()
+    panel = Panel.from_frames(frames)
+    closes = pd.DataFrame({ticker: df['close'] for ticker, df in frames.items()})
+
+    assert panel.aggregate('close', 'count').tolist() == closes.count(axis=1).tolist()
+    assert np.allclose(panel.aggregate('close', 'mean'), closes.mean(axis=1), rtol=1e-6)
+    assert np.allclose(panel.aggregate('rsi_1', 'max'), pd.DataFrame(
+        {ticker: df['rsi_1'] for ticker, df in frames.items()}).max(axis=1), rtol=1e-6)
+    try:
+        panel.aggregate('close', 'mode')
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("Panel aggregate test passed.")
+
+def test_panel_memory_mapped():
+    frames = _frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, 'panel')
+        panel = Panel.from_frames(frames, directory=directory)
+        assert isinstance(panel.values, np.memmap)
+
+        reopened = Panel.open(directory)
+        assert isinstance(reopened.values, np.memmap)
+        assert reopened.tickers == ['AAPL', 'MSFT', 'GE'] and reopened.fields == PANEL_FIELDS
+        assert list(reopened.dates) == list(panel.dates)
+        assert np.array_equal(reopened.label_windows(20, relative=True), Panel.from_frames(frames).label_windows(20, relative=True))
+        del panel, reopened
+    print("Memory-mapped panel test passed.")
+
+def main():
+    test_panel_from_frames()
+    test_panel_labels_match_per_ticker_labels()
+    test_panel_relative_labels_and_cross_section()
+    test_panel_aggregate()
+    test_panel_memory_mapped()
+
+if __name__ == "__main__":
+    main()
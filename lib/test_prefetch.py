@@ -0,0 +1,66 @@
+import threading
+from lib.prefetch import Prefetcher
+
+def test_prefetcher_reuses_background_result():
+    calls = []
+    def job(value):
+        calls.append(value)
+        return value * 2
+
+    prefetcher = Prefetcher(max_workers=1)
+    prefetcher.submit('a', job, 21)
+    prefetcher.submit('a', job, 21)
+    result = prefetcher.get('a', job, 21)
+    prefetcher.shutdown()
+
+    assert result == 42, f"Expected 42, got {result}"
+    assert calls == [21], f"Expected the job to run once, got {calls}"
+    print("Prefetcher reuse test passed.")
+
+def test_prefetcher_computes_on_miss_and_evicts():
+    prefetcher = Prefetcher(max_workers=1, max_entries=2)
+    for key in ['a', 'b', 'c']:
+        prefetcher.get(key, str.upper, key)
+    prefetcher.shutdown()
+
+    assert len(prefetcher) == 2
+    assert 'a' not in prefetcher, "Expected the least recently used entry to be evicted"
+    assert 'c' in prefetcher
+    print("Prefetcher eviction test passed.")
+
+def test_prefetcher_retries_failed_job():
+    started = threading.Event()
+    def failing():
+        started.set()
+        raise RuntimeError("boom")
+
+    prefetcher = Prefetcher(max_workers=1)
+    prefetcher.submit('a', failing)
+    started.wait(timeout=5)
+    result = prefetcher.get('a', lambda: 'ok')
+    prefetcher.shutdown()
+
+    assert result == 'ok', f"Expected the foreground retry result, got {result}"
+    print("Prefetcher retry test passed.")
+
+def test_prefetcher_peek_keeps_entry():
+    prefetcher = Prefetcher(max_workers=1, max_entries=4)
+    prefetcher.get('suggestions', lambda: 'ready')
+    # Navigate far past max_entries, checking the long-lived entry on every step like the sidebar does
+    for step in range(20):
+        prefetcher.get(('figure', step), str, step)
+        assert prefetcher.peek('suggestions') == 'ready', f"Expected the peeked entry to survive step {step}"
+    prefetcher.shutdown()
+
+    assert len(prefetcher) == 4
+    assert ('figure', 0) not in prefetcher
+    print("Prefetcher peek recency test passed.")
+
+def main():
+    test_prefetcher_reuses_background_result()
+    test_prefetcher_computes_on_miss_and_evicts()
+    test_prefetcher_retries_failed_job()
+    test_prefetcher_peek_keeps_entry()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import pandas as pd
+from lib.constants import LABEL_COLUMNS
+from lib.sharding import (
+    assign_shards, merge_partitions, parse_shard, partition_filename, universe_hash, write_manifest
+)
+
+def test_parse_shard():
+    assert parse_shard('2/8') == (2, 8)
+    for spec in ['8/8', '-1/2', '1', 'a/b', '0/0']:
+        try:
+            parse_shard(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected {spec!r} to be rejected")
+    print("parse_shard test passed.")
+
+def test_assign_shards_is_balanced_and_deterministic():
+    row_counts = {f"T{i:03d}": 1000 + (i * 7919) % 5000 for i in range(300)}
+    shards = assign_shards(row_counts, 4)
+
+    assert sorted(t for shard in shards for t in shard) == sorted(row_counts), "Every ticker is assigned once"
+    loads = [sum(row_counts[t] for t in shard) for shard in shards]
+    assert max(loads) - min(loads) <= max(row_counts.values()), f"Unbalanced loads {loads}"
+    assert assign_shards(dict(reversed(list(row_counts.items()))), 4) == shards, "Input order should not matter"
+    print("assign_shards test passed.")
+
+def _write_partition(output, index, count, windows, tickers_total=3):
+    partition = partition_filename(output, index, count)
+    rows = [
+        [f"{ticker}_2020-01-0{day}", ticker, f"2020-01-0{day}", f"2020-01-2{day}", 'uptrend', '']
+        for ticker, n in windows.items() for day in range(1, n + 1)
+    ]
+    pd.DataFrame(rows, columns=LABEL_COLUMNS).to_csv(partition, index=False)
+    write_manifest(partition, {
+        'universe': universe_hash(['AAPL', 'IBM', 'MSFT']),
+        'tickers_total': tickers_total,
+        'shard': index,
+        'shards': count,
+        'date_range': [None, None],
+        'window_size': 20,
+        'windows': windows,
+    })
+
+def test_merge_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'auto_labels.csv')
+        assert partition_filename(output, 1, 2).endswith('auto_labels.part-001-of-002.csv')
+        _write_partition(output, 0, 2, {'MSFT': 2})
+
+        labels, problems = merge_partitions(output, 2)
+        assert len(labels) == 2
+        assert any('Shard 1/2' in problem for problem in problems), f"Missing shard not reported: {problems}"
+
+        _write_partition(output, 1, 2, {'AAPL': 3, 'IBM': 1})
+        labels, problems = merge_partitions(output, 2)
+        assert problems == [], f"Unexpected problems {problems}"
+        assert list(labels['ticker']) == ['AAPL'] * 3 + ['IBM', 'MSFT', 'MSFT']
+
+        # A partition with fewer rows than its manifest claims is incomplete
+        partition = partition_filename(output, 1, 2)
+        pd.read_csv(partition).iloc[:-1].to_csv(partition, index=False)
+        labels, problems = merge_partitions(output, 2)
+        assert problems == ['IBM: expected 1 windows, found 0'], f"Unexpected problems {problems}"
+    print("merge_partitions test passed.")
+
+def main():
+    test_parse_shard()
+    test_assign_shards_is_balanced_and_deterministic()
+    test_merge_partitions()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from lib.tensors import NpyAppender, export_tensors, load_arrow_tensors, normalize_windows, sliding_windows
+
+FEATURES = ['close', 'volume']
+
+def _market_data(ticker):
+    if ticker == 'NONE':
+        return None
+    dates = pd.bdate_range('2020-01-01', periods=30).date
+    offset = 1000 if ticker == 'MSFT' else 0
+    return pd.DataFrame({
+        'close': np.arange(30, dtype=float) + offset,
+        'volume': np.arange(30, dtype=float) * 10,
+    }, index=pd.Index(dates, name='date'))
+
+def _labels():
+    dates = pd.bdate_range('2020-01-01', periods=30)
+    return pd.DataFrame({
+        'ticker': ['MSFT', 'AAPL', 'AAPL', 'AAPL', 'NONE'],
+        # The last AAPL window runs past the end of the data, the second does not start on a trading day
+        'start_date': [dates[0], dates[3], pd.Timestamp('2020-01-04'), dates[26], dates[0]],
+        'label': [2, 0, 1, 1, 2],
+    })
+
+def test_sliding_windows_is_a_view():
+    values = np.arange(12, dtype=np.float32).reshape(6, 2)
+    windows = sliding_windows(values, 3)
+    assert windows.shape == (4, 3, 2), f"Expected (4, 3, 2), got {windows.shape}"
+    assert np.shares_memory(windows, values), "Windows should not copy the feature matrix"
+    assert np.array_equal(windows[1], values[1:4])
+    assert sliding_windows(values[:2], 3).shape == (0, 3, 2)
+    print("sliding_windows test passed.")
+
+def test_normalize_windows():
+    windows = np.array([[[1.0, 5.0], [3.0, 5.0]]], dtype=np.float32)
+    zscore = normalize_windows(windows, 'zscore')
+    assert np.allclose(zscore[0, :, 0], [-1, 1]) and np.allclose(zscore[0, :, 1], [0, 0])
+    assert np.allclose(normalize_windows(windows, 'first')[0], [[1, 1], [3, 1]])
+    assert normalize_windows(windows, 'none').dtype == np.float32
+    print("normalize_windows test passed.")
+
+def test_npy_appender():
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'rows.npy')
+        with NpyAppender(filename, np.float32, (2,)) as appender:
+            appender.append(np.ones((3, 2)))
+            appender.append(np.zeros((1, 2)))
+        result = np.load(filename, mmap_mode='r')
+        assert result.shape == (4, 2) and result.dtype == np.float32
+        assert result[:3].sum() == 6 and result[3].sum() == 0
+        del result
+    print("NpyAppender test passed.")
+
+def test_export_tensors_npy():
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, 'dataset')
+        count = export_tensors(_labels(), _market_data, prefix, window_size=5, features=FEATURES)
+        X = np.load(f"{prefix}_X.npy", mmap_mode='r')
+        y = np.load(f"{prefix}_y.npy")
+        windows = pd.read_csv(f"{prefix}_windows.csv")
+
+        assert count == 2, f"Expected 2 windows, got {count}"
+        assert X.shape == (2, 5, 2) and X.dtype == np.float32
+        assert list(y) == [0, 2], "Tickers are exported in sorted order"
+        assert list(windows['ticker']) == ['AAPL', 'MSFT']
+        assert list(windows['start_date']) == ['2020-01-06', '2020-01-01']
+        assert np.array_equal(X[0, :, 0], np.arange(3, 8))
+        assert np.array_equal(X[1, :, 0], np.arange(5) + 1000)
+        del X
+    print("export_tensors npy test passed.")
+
+def test_export_tensors_arrow():
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, 'dataset')
+        count = export_tensors(_labels(), _market_data, prefix, window_size=5, features=FEATURES,
+                               normalize='first', fmt='arrow')
+        X, y, index = load_arrow_tensors(f"{prefix}.arrow")
+
+        assert count == 2
+        assert X.shape == (2, 5, 2) and X.dtype == np.float32
+        assert list(y) == [0, 2]
+        assert list(index['ticker']) == ['AAPL', 'MSFT']
+        assert np.allclose(X[0, :, 0], np.arange(3, 8) / 3)
+        del X, y, index
+    print("export_tensors arrow test passed.")
+
+def main():
+    test_sliding_windows_is_a_view()
+    test_normalize_windows()
+    test_npy_appender()
+    test_export_tensors_npy()
+    test_export_tensors_arrow()
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,71 @@
-from lib.labeller import load_data, save_labels
+from lib.labeller import load_data
+from lib.db.session import create_engine_session, create_env_db_engine
+from lib.index.LabelIndex import LabelIndex
+from lib.index.WindowIndex import WindowIndex
+from lib.prefetch import Prefetcher
+from lib.stores.BaseLabelStore import BaseLabelStore
+from lib.stores.registry import open_label_store
+from lib.strategies.vectorized import suggest_labels
+from lib.charts import build_subplot_layout, figure_from_layout, subplot_axes, volume_colors
 
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import numpy as np
 import os
+import uuid
+from dotenv import load_dotenv
 from datetime import datetime
+from typing import Optional
 
 
-def plot_price_and_ema(df: pd.DataFrame, ticker: str, start_idx: int, window_size: int = 20):
-    window_df = df.iloc[start_idx:start_idx + window_size]
+def _style_price_and_ema(fig: go.Figure):
+    """Static layout and axis styling shared by every window"""
+    # Update layout
+    fig.update_layout(
+        title=dict(font=dict(size=24)),
+        plot_bgcolor='white',
+        height=800,
+        margin=dict(t=50, b=30),
+        xaxis_rangeslider_visible=False  # Disable rangeslider
+    )
+    
+    # Update y-axes labels
+    fig.update_yaxes(title_text="Price", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+    
+    # Update x-axis
+    fig.update_xaxes(
+        showgrid=True,
+        gridcolor='lightgrey',
+        gridwidth=0.5,
+        row=2, col=1
+    )
     
-    # Create figure with secondary y-axis
-    fig = make_subplots(
-        rows=2, cols=1,
-        row_heights=[0.7, 0.3],
-        vertical_spacing=0.05,
-        shared_xaxes=True
+    # Update y-axes grids
+    fig.update_yaxes(
+        showgrid=True,
+        gridcolor='lightgrey',
+        gridwidth=0.5,
+        row=1, col=1
+    )
+    fig.update_yaxes(
+        showgrid=True,
+        gridcolor='lightgrey',
+        gridwidth=0.5,
+        row=2, col=1
     )
+
+# st.cache_resource, unlike a cache in this script, survives reruns
+@st.cache_resource(show_spinner=False)
+def _price_and_ema_layout() -> dict:
+    return build_subplot_layout([0.7, 0.3], _style_price_and_ema)
+
+def plot_price_and_ema(df: pd.DataFrame, ticker: str, start_idx: int, window_size: int = 20):
+    window_df = df.iloc[start_idx:start_idx + window_size]
     
-    # Add candlestick chart
-    fig.add_trace(
+    # Candlestick chart
+    traces = [
         go.Candlestick(
             x=window_df.index,
             open=window_df['open'],
@@ -28,12 +73,12 @@ def plot_price_and_ema(df: pd.DataFrame, ticker: str, start_idx: int, window_siz
             low=window_df['low'],
             close=window_df['close'],
             name='OHLC',
-            showlegend=False
-        ),
-        row=1, col=1
-    )
+            showlegend=False,
+            **subplot_axes(1)
+        )
+    ]
     
-    # Add EMAs
+    # EMAs
     colors = {
         'ema_20': '#FF4500',
         'ema_50': '#9370DB',
@@ -41,99 +86,154 @@ def plot_price_and_ema(df: pd.DataFrame, ticker: str, start_idx: int, window_siz
     }
     
     for ema in ['ema_20', 'ema_50', 'ema_200']:
-        fig.add_trace(
+        traces.append(
             go.Scatter(
                 x=window_df.index,
                 y=window_df[ema],
                 name=ema.upper(),
                 line=dict(color=colors[ema], width=1),
-                showlegend=True
-            ),
-            row=1, col=1
+                showlegend=True,
+                **subplot_axes(1)
+            )
         )
     
-    # Add volume bars
-    colors = ['red' if row['close'] < row['open'] else 'green' 
-             for _, row in window_df.iterrows()]
-    
-    fig.add_trace(
+    # Volume bars
+    traces.append(
         go.Bar(
             x=window_df.index,
             y=window_df['volume'],
             name='Volume',
-            marker_color=colors,
+            marker_color=volume_colors(window_df),
             opacity=0.3,
-            showlegend=False
-        ),
-        row=2, col=1
+            showlegend=False,
+            **subplot_axes(2)
+        )
     )
     
-    # Update layout
-    fig.update_layout(
-        title=dict(
-            text=f'{ticker} Price and EMAs',
-            font=dict(size=24)
-        ),
-        plot_bgcolor='white',
-        height=800,
-        margin=dict(t=50, b=30),
-        xaxis_rangeslider_visible=False  # Disable rangeslider
+    layout = _price_and_ema_layout()
+    return figure_from_layout(
+        layout,
+        traces,
+        title={**layout['title'], 'text': f'{ticker} Price and EMAs'}
     )
+
+def find_earliest_unlabeled_index(label_index: LabelIndex, start_idx: int = 0) -> int:
+    """Find the earliest unlabeled date index at or after start_idx"""
+    next_unlabeled = label_index.next_unlabelled(start_idx)
+    return next_unlabeled if next_unlabeled is not None else 0  # Return 0 if all dates are labeled
+
+def next_window_index(label_index: LabelIndex, start_idx: int, ticker: str, annotator: str, batch_size: int,
+                      among: Optional[np.ndarray] = None) -> int:
+    """
+    Pick the next window to label.
     
-    # Update y-axes labels
-    fig.update_yaxes(title_text="Price", row=1, col=1)
-    fig.update_yaxes(title_text="Volume", row=2, col=1)
+    When `among` is given, the next unlabeled window where it is True is
+    used. Otherwise, with a store that has a work queue, the first unlabeled
+    window leased to the annotator is used so concurrent annotators never get
+    the same window; failing both, the earliest unlabeled window at or after
+    start_idx.
+    """
+    if among is not None:
+        next_unlabeled = label_index.next_unlabelled(start_idx, among)
+        if next_unlabeled is not None:
+            return next_unlabeled
+    window_index = st.session_state['window_index']
+    for key in get_label_store().lease_windows(annotator, batch_size, ticker=ticker):
+        pos = window_index.position(window_index.parse_key(key))
+        if pos is not None and not label_index.is_labelled(pos):
+            return pos
+    return find_earliest_unlabeled_index(label_index, start_idx)
+
+@st.cache_resource
+def get_db_context():
+    """Session context bound to one engine shared by every rerun and browser session"""
+    return create_engine_session(create_env_db_engine())
+
+@st.cache_resource
+def get_label_store() -> BaseLabelStore:
+    """Label store named by LABEL_STORE (labels.csv by default), shared by every session"""
+    load_dotenv()
+    path = os.getenv("LABEL_STORE", "labels.csv")
+    return open_label_store(path, snapshot=os.path.splitext(path)[0] + ".feather")
+
+@st.cache_resource
+def get_prefetcher() -> Prefetcher:
+    """Thread pool and bounded cache of ticker data and window figures shared by every session"""
+    return Prefetcher(max_workers=2, max_entries=64)
+
+@st.cache_resource
+def get_suggestion_prefetcher() -> Prefetcher:
+    """Suggestion passes, one per ticker, kept apart so figure prefetches cannot evict them"""
+    return Prefetcher(max_workers=1, max_entries=16)
+
+def load_ticker_data(ticker: str) -> Optional[pd.DataFrame]:
+    """Market data for a ticker, served from the prefetch cache when it was preloaded"""
+    df = get_prefetcher().get(('data', ticker), load_data, ticker, get_db_context())
+    if df is None:
+        get_prefetcher().discard(('data', ticker))  # Don't remember unknown tickers
+    return df
+
+def get_window_figure(df: pd.DataFrame, ticker: str, start_idx: int):
+    """Figure for the window starting at start_idx, built ahead of time when prefetched"""
+    return get_prefetcher().get(('figure', ticker, start_idx), plot_price_and_ema, df, ticker, start_idx)
+
+def prefetch_upcoming(df: pd.DataFrame, ticker: str, label_index: LabelIndex, start_idx: int,
+                      max_idx: int, window_count: int, ticker_queue: list):
+    """
+    Queue background work for what the annotator is likely to view next.
     
-    # Update x-axis
-    fig.update_xaxes(
-        showgrid=True,
-        gridcolor='lightgrey',
-        gridwidth=0.5,
-        row=2, col=1
-    )
+    Args:
+        df: Market data of the current ticker
+        ticker: Current ticker symbol
+        label_index: Label index of the current ticker
+        start_idx: Start index of the window on screen
+        max_idx: Largest valid window start index
+        window_count: Number of upcoming unlabeled windows to build figures for
+        ticker_queue: Work queue of tickers; the one after the current ticker is preloaded
+    """
+    prefetcher = get_prefetcher()
     
-    # Update y-axes grids
-    fig.update_yaxes(
-        showgrid=True,
-        gridcolor='lightgrey',
-        gridwidth=0.5,
-        row=1, col=1
-    )
-    fig.update_yaxes(
-        showgrid=True,
-        gridcolor='lightgrey',
-        gridwidth=0.5,
-        row=2, col=1
-    )
+    pos = start_idx + 1
+    for _ in range(window_count):
+        next_idx = label_index.next_unlabelled(pos)
+        if next_idx is None or next_idx < pos or next_idx > max_idx:
+            break
+        prefetcher.submit(('figure', ticker, next_idx), plot_price_and_ema, df, ticker, next_idx)
+        pos = next_idx + 1
     
-    return fig
-
-def load_labels(filename: str = "labels.csv") -> dict:
-    """Load labels from a CSV file"""
-    try:
-        df = pd.read_csv(filename)
-        # Convert DataFrame back to dictionary
-        labels = {}
-        for _, row in df.iterrows():
-            key = row['key']
-            labels[key] = {
-                'ticker': row['ticker'],
-                'start_date': row['start_date'],
-                'end_date': row['end_date'],
-                'pattern': row['pattern'],
-                'timestamp': row['timestamp']
-            }
-        return labels
-    except FileNotFoundError:
-        return {}
-
-def find_earliest_unlabeled_index(df: pd.DataFrame, labels: dict, ticker: str) -> int:
-    """Find the earliest unlabeled date index in the dataframe"""
-    for idx, date in enumerate(df.index):
-        key = f"{ticker}_{date.strftime('%Y-%m-%d')}"
-        if key not in labels:
-            return idx
-    return 0  # Return 0 if all dates are labeled
+    if ticker in ticker_queue:
+        queue_pos = ticker_queue.index(ticker)
+        if queue_pos + 1 < len(ticker_queue):
+            next_ticker = ticker_queue[queue_pos + 1]
+            prefetcher.submit(('data', next_ticker), load_data, next_ticker, get_db_context())
+
+def get_suggestions(ticker: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Auto-label suggestions of a ticker, or None while the background pass is still running.
+
+    The pass is (re)submitted if it is not cached, e.g. after being evicted.
+    """
+    prefetcher = get_suggestion_prefetcher()
+    prefetcher.submit(ticker, suggest_labels, df)
+    return prefetcher.peek(ticker)
+
+def uncertain_windows(suggestions: Optional[pd.DataFrame], n_rows: int, margin: float) -> Optional[np.ndarray]:
+    """Mask over row positions of windows whose suggestion wins by less than `margin` percentage points"""
+    if suggestions is None:
+        return None
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[:len(suggestions)] = ~(suggestions['margin'].to_numpy() >= margin)
+    return mask
+
+def get_label_stats(ticker: str) -> pd.Series:
+    """Pattern distribution for a ticker, recomputed only after labels change"""
+    cached = st.session_state['label_stats'].get(ticker)
+    if cached is not None and cached[0] == st.session_state['labels_version']:
+        return cached[1]
+    patterns = [value['pattern'] for value in st.session_state['labels'].values() if value['ticker'] == ticker]
+    stats = pd.Series(patterns, dtype=object).value_counts()
+    st.session_state['label_stats'][ticker] = (st.session_state['labels_version'], stats)
+    return stats
 
 def main():
     # Initialize session state
@@ -143,23 +243,36 @@ def main():
         st.session_state['df'] = None
     if 'max_idx' not in st.session_state:
         st.session_state['max_idx'] = 0
+    if 'window_index' not in st.session_state:
+        st.session_state['window_index'] = WindowIndex()
     if 'labels' not in st.session_state:
-        st.session_state['labels'] = load_labels()
+        # Keyed by packed WindowIndex keys; string keys are only used with the label store
+        st.session_state['labels'] = st.session_state['window_index'].pack_labels(get_label_store().load())
     if 'current_ticker' not in st.session_state:
         st.session_state['current_ticker'] = None
+    if 'label_indexes' not in st.session_state:
+        st.session_state['label_indexes'] = {}
+    if 'labels_version' not in st.session_state:
+        st.session_state['labels_version'] = 0
+    if 'label_stats' not in st.session_state:
+        st.session_state['label_stats'] = {}
+    if 'annotator_id' not in st.session_state:
+        # Leases are owned per annotator, so each browser session defaults to its own name
+        st.session_state['annotator_id'] = uuid.uuid4().hex[:8]
 
-    def get_nearby_labels(current_date, ticker, window=5):
-        """Get labels for dates before and after the current date"""
+    def get_nearby_labels(current_date, window=5):
+        """Get labels for dates before and after the current date of the loaded ticker"""
         current_idx = st.session_state['df'].index.get_loc(current_date)
         start_idx = max(0, current_idx - window)
         end_idx = min(len(st.session_state['df']), current_idx + window + 1)
         
-        nearby_dates = st.session_state['df'].index[start_idx:end_idx]
+        label_index = st.session_state['label_indexes'][st.session_state['current_ticker']]
         nearby_labels = {}
         
-        for date in nearby_dates:
-            key = f"{ticker}_{date.strftime('%Y-%m-%d')}"
-            if key in st.session_state['labels']:
+        for idx in range(start_idx, end_idx):
+            if label_index.is_labelled(idx):
+                date = st.session_state['df'].index[idx]
+                key = st.session_state['window_index'].position_key(st.session_state['current_ticker'], idx)
                 nearby_labels[date] = st.session_state['labels'][key]['pattern']
         
         return nearby_labels
@@ -172,117 +285,150 @@ def main():
         st.title('Stock Price Pattern Labeling')
         ticker = st.text_input('Enter ticker symbol:', 'AAPL').upper()
     
+    with st.sidebar:
+        st.subheader('Prefetch')
+        prefetch_windows = st.slider('Windows to prefetch', min_value=0, max_value=10, value=3)
+        ticker_queue = [
+            t.strip().upper()
+            for t in st.text_input('Ticker queue (comma separated):', '').split(',')
+            if t.strip()
+        ]
+        st.subheader('Team labeling')
+        annotator = st.text_input('Annotator name:', st.session_state['annotator_id']).strip() or st.session_state['annotator_id']
+        lease_batch = st.number_input('Windows leased per batch', min_value=1, max_value=200, value=20)
+        st.subheader('Suggestions')
+        uncertainty_margin = st.slider('Uncertainty margin (% points)', min_value=0.0, max_value=10.0, value=1.0, step=0.5)
+        only_uncertain = st.checkbox('Only show windows with an uncertain suggestion')
+    
     if st.button('Show Data') or (ticker != st.session_state['current_ticker'] and st.session_state['current_ticker'] is not None):
-        df = load_data(ticker)
+        df = load_ticker_data(ticker)
         if df is not None:
             st.session_state['df'] = df
             st.session_state['max_idx'] = len(df) - 20
+            if st.session_state['current_ticker'] is not None:
+                get_label_store().release_leases(annotator, ticker=st.session_state['current_ticker'])
             st.session_state['current_ticker'] = ticker
+            if ticker not in st.session_state['label_indexes']:
+                st.session_state['window_index'].add_calendar(ticker, df.index)
+                st.session_state['label_indexes'][ticker] = LabelIndex.from_labels(
+                    df.index, st.session_state['labels'], ticker
+                )
+            label_index = st.session_state['label_indexes'][ticker]
+            get_suggestion_prefetcher().submit(ticker, suggest_labels, df)
+            get_label_store().enqueue_windows(
+                ticker,
+                label_index.start_dates(label_index.unlabelled_positions(st.session_state['max_idx'] + 1))
+            )
             
-            # Find the earliest unlabeled date
-            earliest_unlabeled = find_earliest_unlabeled_index(df, st.session_state['labels'], ticker)
+            # Find the earliest unlabeled date, or the first one leased to this annotator
+            among = uncertain_windows(get_suggestions(ticker, df), len(df), uncertainty_margin) if only_uncertain else None
+            earliest_unlabeled = next_window_index(label_index, 0, ticker, annotator, lease_batch, among)
             st.session_state['current_idx'] = earliest_unlabeled
             
             # Show information about where we're starting
             if earliest_unlabeled > 0:
-                st.info(f"Continuing from the earliest unlabeled date: {df.index[earliest_unlabeled].strftime('%Y-%m-%d')}")
+                st.info(f"Continuing from the next unlabeled date: {df.index[earliest_unlabeled].strftime('%Y-%m-%d')}")
     
     # Display the graph
     with graph_container:
         if st.session_state['df'] is not None:
+            # The loaded ticker; the text input may already hold one that failed to load
+            current_ticker = st.session_state['current_ticker']
+            label_index = st.session_state['label_indexes'][current_ticker]
+            suggestions = get_suggestions(st.session_state['current_ticker'], st.session_state['df'])
 
-            # Display the plot
-            fig = plot_price_and_ema(
+            # Display the plot, with the auto-label suggestion next to it
+            chart_col, suggestion_col = st.columns([4, 1])
+            with chart_col:
+                fig = get_window_figure(
+                    st.session_state['df'],
+                    st.session_state['current_ticker'],
+                    st.session_state['current_idx']
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            prefetch_upcoming(
                 st.session_state['df'],
-                ticker,
-                st.session_state['current_idx']
+                st.session_state['current_ticker'],
+                label_index,
+                st.session_state['current_idx'],
+                st.session_state['max_idx'],
+                prefetch_windows,
+                ticker_queue
             )
-            st.plotly_chart(fig, use_container_width=True)
             
-            start_date = st.session_state['df'].index[st.session_state['current_idx']].strftime('%Y-%m-%d')
-            end_date = st.session_state['df'].index[
-                min(st.session_state['current_idx'] + 19, len(st.session_state['df']) - 1)
-            ].strftime('%Y-%m-%d')
+            start_date = label_index.start_date(st.session_state['current_idx'])
+            end_date = label_index.start_date(min(st.session_state['current_idx'] + 19, len(st.session_state['df']) - 1))
             
             # Show progress information
             total_days = len(st.session_state['df'])
-            labeled_days = sum(1 for date in st.session_state['df'].index 
-                             if f"{ticker}_{date.strftime('%Y-%m-%d')}" in st.session_state['labels'])
+            labeled_days = label_index.labelled_count
             progress = (labeled_days / total_days) * 100
             
             st.info(f'Window: {start_date} to {end_date} | Progress: {labeled_days}/{total_days} ({progress:.1f}%)')
 
             # Get current label if it exists
-            key = f"{ticker}_{start_date}"
+            window_index = st.session_state['window_index']
+            key = window_index.position_key(current_ticker, st.session_state['current_idx'])
             current_label = st.session_state['labels'].get(key, None)
             if current_label:
                 st.write(f"Current label: {current_label['pattern']}")
 
+            def apply_label(pattern):
+                st.session_state['labels'][key] = {
+                    'ticker': current_ticker,
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'pattern': pattern,
+                    'timestamp': datetime.now().isoformat()
+                }
+                label_index.mark(st.session_state['current_idx'])
+                st.session_state['labels_version'] += 1
+                get_label_store().upsert(window_index.key_string(key), st.session_state['labels'][key])
+                if not current_label:  # Only auto-advance if this was a new label
+                    among = uncertain_windows(suggestions, len(st.session_state['df']), uncertainty_margin) \
+                        if only_uncertain else None
+                    next_unlabeled = next_window_index(
+                        label_index, st.session_state['current_idx'], current_ticker, annotator, lease_batch, among
+                    )
+                    st.session_state['current_idx'] = min(next_unlabeled, st.session_state['max_idx'])
+                st.rerun()
+
+            with suggestion_col:
+                st.subheader('Suggestion')
+                if suggestions is None:
+                    st.write("Computing suggestions...")
+                elif st.session_state['current_idx'] < len(suggestions):
+                    suggestion = suggestions.iloc[st.session_state['current_idx']]
+                    certainty = 'uncertain' if not suggestion['margin'] >= uncertainty_margin else 'confident'
+                    st.write(f"**{suggestion['pattern']}** ({certainty}, margin {suggestion['margin']:.2f})")
+                    st.write(f"Buy and Hold: {suggestion['buy_and_hold']:+.2f}%")
+                    st.write(f"Mean Reversion: {suggestion['mean_reversion']:+.2f}%")
+                    st.write(f"Sell and Hold: {suggestion['sell_and_hold']:+.2f}%")
+                    if st.button('✅ Accept suggestion', key='accept_suggestion'):
+                        apply_label(suggestion['pattern'])
+
             # Labeling buttons
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 if st.button('⬆️ Uptrend', key='uptrend'):
-                    st.session_state['labels'][key] = {
-                        'ticker': ticker,
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'pattern': 'uptrend',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    save_labels(st.session_state['labels'])
-                    if not current_label:  # Only auto-advance if this was a new label
-                        next_unlabeled = find_earliest_unlabeled_index(
-                            st.session_state['df'],
-                            st.session_state['labels'],
-                            ticker
-                        )
-                        st.session_state['current_idx'] = min(next_unlabeled, st.session_state['max_idx'])
-                    st.rerun()
+                    apply_label('uptrend')
 
             with col2:
                 if st.button('➡️ Sideways', key='sideways'):
-                    st.session_state['labels'][key] = {
-                        'ticker': ticker,
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'pattern': 'sideways',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    save_labels(st.session_state['labels'])
-                    if not current_label:
-                        next_unlabeled = find_earliest_unlabeled_index(
-                            st.session_state['df'],
-                            st.session_state['labels'],
-                            ticker
-                        )
-                        st.session_state['current_idx'] = min(next_unlabeled, st.session_state['max_idx'])
-                    st.rerun()
+                    apply_label('sideways')
 
             with col3:
                 if st.button('⬇️ Downtrend', key='downtrend'):
-                    st.session_state['labels'][key] = {
-                        'ticker': ticker,
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'pattern': 'downtrend',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    save_labels(st.session_state['labels'])
-                    if not current_label:
-                        next_unlabeled = find_earliest_unlabeled_index(
-                            st.session_state['df'],
-                            st.session_state['labels'],
-                            ticker
-                        )
-                        st.session_state['current_idx'] = min(next_unlabeled, st.session_state['max_idx'])
-                    st.rerun()
+                    apply_label('downtrend')
 
             # Add delete button for existing labels
             if current_label:
                 if st.button('🗑️ Delete Label'):
                     del st.session_state['labels'][key]
-                    save_labels(st.session_state['labels'])
+                    label_index.unmark(st.session_state['current_idx'])
+                    st.session_state['labels_version'] += 1
+                    get_label_store().delete(window_index.key_string(key))
                     st.rerun()
 
             # Historical labels display with compact layout
@@ -291,7 +437,7 @@ def main():
             with col1:
                 st.subheader('Nearby Labels')
                 current_date = st.session_state['df'].index[st.session_state['current_idx']]
-                nearby_labels = get_nearby_labels(current_date, ticker)
+                nearby_labels = get_nearby_labels(current_date)
                 
                 if nearby_labels:
                     history_df = pd.DataFrame(
@@ -313,10 +459,7 @@ def main():
             
             with col2:
                 st.subheader('Quick Jump')
-                all_labeled_dates = [
-                    date for date in st.session_state['df'].index
-                    if f"{ticker}_{date.strftime('%Y-%m-%d')}" in st.session_state['labels']
-                ]
+                all_labeled_dates = label_index.labelled_dates()
                 
                 if all_labeled_dates:
                     selected_date = st.selectbox(
@@ -334,10 +477,8 @@ def main():
             # Display current statistics
             st.subheader('Labeling Statistics')
             if st.session_state['labels']:
-                labels_df = pd.DataFrame(st.session_state['labels'].values())
-                ticker_labels = labels_df[labels_df['ticker'] == ticker]
-                stats = ticker_labels['pattern'].value_counts()
-                st.write(f"Total labels for {ticker}: {len(ticker_labels)}")
+                stats = get_label_stats(current_ticker)
+                st.write(f"Total labels for {current_ticker}: {int(stats.sum())}")
                 st.write("Pattern distribution:")
                 st.write(stats)
 
@@ -0,0 +1,70 @@
+import argparse
+import os
+import pandas as pd
+from auto_labeller import parse_date_range, ticker_list, window_size
+from lib.agreement import read_label_file
+from lib.db.session import create_engine_session, create_env_db_engine
+from lib.labeller import load_data
+from lib.strategies.sweep import parameter_grid, sweep
+
+def parse_values(spec: str, cast=float) -> list:
+    """Comma-separated values; 'start:stop:step' expands to a range (stop included)"""
+    values = []
+    for part in spec.split(','):
+        if ':' in part:
+            start, stop, step = (cast(value) for value in part.split(':'))
+            while start <= stop:
+                values.append(start)
+                start += step
+        elif part.strip():
+            values.append(cast(part))
+    return values
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep MeanReversionStrategy thresholds, lookbacks and quorums over all windows')
+    parser.add_argument('--buy', type=str, default='30', help='Buy thresholds, e.g. 20,25,30 or 20:40:5')
+    parser.add_argument('--sell', type=str, default='70', help='Sell thresholds, e.g. 70,75 or 60:80:5')
+    parser.add_argument('--lookback', type=str, default='20', help='Numbers of RSI periods voting (1-20)')
+    parser.add_argument('--quorum', type=str, help='Votes needed to act (default: more than half the lookback)')
+    parser.add_argument('--manual', type=str, default='manual_labels.csv', help='Manual labels to measure agreement against')
+    parser.add_argument('--tickers', type=str, help='Comma-separated tickers (default: the Dow tickers)')
+    parser.add_argument('--date-range', type=str, help='START:END dates (YYYY-MM-DD), either side may be empty')
+    parser.add_argument('--window-size', type=int, default=window_size, help='Trading days per window')
+    parser.add_argument('--workers', type=int, default=4, help='Tickers swept in parallel')
+    parser.add_argument('--top', type=int, default=20, help='Settings to print')
+    parser.add_argument('--csv', type=str, help='Write the full report to this CSV')
+
+    args = parser.parse_args()
+
+    try:
+        grid = parameter_grid(
+            parse_values(args.buy), parse_values(args.sell), parse_values(args.lookback, int),
+            parse_values(args.quorum, int) if args.quorum else None
+        )
+        tickers = [t.strip().upper() for t in args.tickers.split(',') if t.strip()] if args.tickers else ticker_list
+        start_date, end_date = parse_date_range(args.date_range)
+        manual = read_label_file(args.manual) if os.path.exists(args.manual) else None
+        if manual is None:
+            print(f"[WARN] {args.manual} not found, reporting label distributions only")
+
+        db_context = create_engine_session(create_env_db_engine())
+        frames = {}
+        for ticker in tickers:
+            df = load_data(ticker, db_context, start_date, end_date)
+            if df is not None:
+                frames[ticker] = df
+        print(f"Sweeping {len(grid)} settings over {len(frames)} tickers")
+
+        report = sweep(frames, grid, manual, args.window_size, args.workers)
+        with pd.option_context('display.float_format', '{:.3f}'.format, 'display.width', 120):
+            print(report.head(args.top).to_string(index=False))
+        if args.csv:
+            report.to_csv(args.csv, index=False)
+            print(f"Wrote {len(report)} settings to {args.csv}")
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
-import pandas as pd
+from __future__ import annotations
 import argparse
-import os
-from dotenv import load_dotenv
-from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
-from lib.db.session import create_db_session
+from typing import TYPE_CHECKING
+
+# pandas and the database layer are imported where they are used, so argument
+# errors and `--help` do not wait for them
+if TYPE_CHECKING:
+    import pandas as pd
 
 def pattern_to_label(pattern: str) -> int:
     """Convert pattern string to numeric label."""
@@ -16,6 +18,8 @@ def pattern_to_label(pattern: str) -> int:
 
 def load_and_process_csv(file_path: str) -> pd.DataFrame:
     """Load and process the CSV file."""
+    import pandas as pd
+
     # Read CSV
     df = pd.read_csv(file_path)
     
@@ -30,6 +34,8 @@ def load_and_process_csv(file_path: str) -> pd.DataFrame:
 
 def upload_to_database(df: pd.DataFrame, session_maker) -> None:
     """Upload data to database."""
+    from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+
     with session_maker() as session:
         try:
             # Delete existing records
@@ -60,6 +66,9 @@ def main():
     
     args = parser.parse_args()
     
+    from dotenv import load_dotenv
+    from lib.db.session import create_engine_session, create_env_db_engine
+
     try:
         # Load environment variables
         load_dotenv()
@@ -70,13 +79,7 @@ def main():
         
         # Create database session using environment variables
         print("Creating database session...")
-        session_maker = create_db_session(
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT", "5432"),
-            database=os.getenv("DB_NAME", "postgres")
-        )
+        session_maker = create_engine_session(create_env_db_engine())
         
         # Upload to database
         print("Uploading to database...")
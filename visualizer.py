@@ -1,101 +1,133 @@
 import streamlit as st
-from lib.db.session import create_db_session
-from lib.models.MarketData import MarketData
-from lib.models.EquityIndicators import EquityIndicators
-from lib.models.SupervisedClassifierDataset import SupervisedClassifierDataset
+from lib.db.session import create_engine_session, create_env_db_engine
+from lib.db.pages import (count_market_rows, get_label_counts, get_label_points, get_market_history,
+                          get_market_window, get_previous_start, get_window_labels)
+from lib.labeller import get_market_data, indicator_source
+from lib.indicators import EMA_COLUMNS, ema
+from lib.charts import build_subplot_layout, figure_from_layout, label_colors, subplot_axes, volume_colors
+from lib.downsample import label_bands, ohlc_downsample
 
-from dotenv import load_dotenv
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import os
-from typing import List, Tuple
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Dict, Optional, Tuple
 import pandas as pd
 
-def get_data(db_session: Session, ticker: str) -> tuple[List[Tuple], List[SupervisedClassifierDataset]]:
-    """Get market data and labels for a specific ticker."""
-    # Market data query
-    market_query = (
-        select(MarketData, EquityIndicators)
-        .join(
-            EquityIndicators,
-            (MarketData.ticker == EquityIndicators.ticker) &
-            (MarketData.report_date == EquityIndicators.report_date)
-        )
-        .where(MarketData.ticker == ticker)
-        .order_by(MarketData.report_date)
+def computed_emas(market_df: pd.DataFrame) -> pd.DataFrame:
+    """EMA columns computed from the closes of a full, date-indexed history."""
+    return pd.DataFrame(ema(market_df['close'].to_numpy()), index=market_df.index, columns=EMA_COLUMNS)
+
+OVERVIEW_POINTS = 1000
+
+@st.cache_resource
+def get_db_context():
+    """Session context bound to one engine shared by every rerun and browser session."""
+    return create_engine_session(create_env_db_engine())
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_computed_emas(ticker: str, data_version: int = 0) -> pd.DataFrame:
+    """EMAs computed from the ticker's market_data closes, cached until data_version changes."""
+    with get_db_context()() as session:
+        return computed_emas(get_market_data(session, ticker))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_market_window(ticker: str, start_date: Optional[date], window_size: int, data_version: int = 0):
+    """Page of market data and its labels, cached until data_version changes."""
+    stored = indicator_source() == 'stored'
+    with get_db_context()() as session:
+        market_df, next_start = get_market_window(session, ticker, start_date, window_size, with_indicators=stored)
+        if not stored:
+            market_df = market_df.join(load_computed_emas(ticker, data_version))
+        if market_df.empty:
+            return market_df, pd.DataFrame(), next_start, 0
+        labels_df = get_window_labels(session, ticker, market_df.index[0], market_df.index[-1])
+        day_offset = count_market_rows(session, ticker, before=market_df.index[0], with_indicators=stored)
+        return market_df, labels_df, next_start, day_offset
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_previous_start(ticker: str, start_date: date, window_size: int, data_version: int = 0) -> Optional[date]:
+    """Start date of the previous page, cached until data_version changes."""
+    stored = indicator_source() == 'stored'
+    with get_db_context()() as session:
+        return get_previous_start(session, ticker, start_date, window_size, with_indicators=stored)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_ticker_stats(ticker: str, data_version: int = 0) -> Tuple[int, Dict[int, int]]:
+    """Market row count and label counts of a ticker, cached until data_version changes."""
+    stored = indicator_source() == 'stored'
+    with get_db_context()() as session:
+        return count_market_rows(session, ticker, with_indicators=stored), get_label_counts(session, ticker)
+
+@st.cache_data(max_entries=32, show_spinner="Building overview...")
+def load_overview(ticker: str, n_points: int = OVERVIEW_POINTS, data_version: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Downsampled full history and label bands of a ticker, cached until data_version changes."""
+    stored = indicator_source() == 'stored'
+    with get_db_context()() as session:
+        market_df = get_market_history(session, ticker, with_indicators=stored)
+        label_points = get_label_points(session, ticker)
+    if not stored:
+        market_df = market_df.join(computed_emas(market_df))
+    overview_df = ohlc_downsample(market_df, n_points)
+    bands_df = label_bands(overview_df.index, label_points['end_date'], label_points['label'])
+    return overview_df, bands_df
+
+def _style_plot_data(fig: go.Figure):
+    """Static layout and axis styling shared by every window."""
+    # Update layout
+    fig.update_layout(
+        height=1000,
+        showlegend=True,
+        xaxis_rangeslider_visible=False
     )
     
-    # Labels query
-    labels_query = (
-        select(SupervisedClassifierDataset)
-        .where(SupervisedClassifierDataset.ticker == ticker)
-        .order_by(SupervisedClassifierDataset.start_date)
-    )
+    # Update axes labels
+    fig.update_yaxes(title_text="Price", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+    fig.update_yaxes(title_text="Labels", row=3, col=1)
     
-    market_data = db_session.execute(market_query).all()
-    labels = db_session.execute(labels_query).scalars().all()
+    # Update grids
+    for i in range(1, 4):
+        fig.update_xaxes(showgrid=True, gridcolor='lightgrey', gridwidth=0.5, row=i, col=1)
+        fig.update_yaxes(showgrid=True, gridcolor='lightgrey', gridwidth=0.5, row=i, col=1)
     
-    return market_data, labels
+    # Set y-axis range and ticks for labels, only showing on right side
+    fig.update_yaxes(
+        range=[-0.5, 2.5], 
+        tickmode='array', 
+        tickvals=[0, 1, 2],
+        title_text='Labels',  
+        side='left',     # Move ticks to right side
+        showgrid=True,
+        row=3, col=1
+    )
 
-def prepare_data(market_data, labels):
-    """Prepare market data and labels for plotting."""
-    # Convert market data to DataFrame
-    records = []
-    for market, indicators in market_data:
-        record = {
-            'date': market.report_date,
-            'close': market.close,
-            'open': market.open,
-            'high': market.high,
-            'low': market.low,
-            'volume': market.volume,
-            'ema_20': indicators.ema_20,
-            'ema_50': indicators.ema_50,
-            'ema_200': indicators.ema_200
-        }
-        records.append(record)
-    
-    market_df = pd.DataFrame(records)
-    market_df.set_index('date', inplace=True)
-    
-    # Convert labels to DataFrame
-    labels_df = pd.DataFrame([{
-        'start_date': label.start_date,
-        'end_date': label.end_date,
-        'label': label.label
-    } for label in labels])
-    
-    return market_df, labels_df
+# st.cache_resource, unlike a cache in this script, survives reruns
+@st.cache_resource(show_spinner=False)
+def _plot_data_layout() -> dict:
+    return build_subplot_layout([0.6, 0.2, 0.2], _style_plot_data)
 
-def plot_data(market_df: pd.DataFrame, labels_df: pd.DataFrame, ticker: str, start_idx: int, window_size: int = 100):
-    """Create a plot with market data and labels."""
+def plot_data(market_df: pd.DataFrame, labels_df: pd.DataFrame, ticker: str, start_idx: int, window_size: int = 100, day_offset: int = 0):
+    """Create a plot with market data and labels.
+
+    day_offset is the day number of the first row of market_df, used when
+    market_df only holds a page of the ticker's history.
+    """
     # Get the window of data to display
     window_df = market_df.iloc[start_idx:start_idx + window_size]
     
-    # Create figure with subplots
-    fig = make_subplots(
-        rows=3, cols=1,
-        row_heights=[0.6, 0.2, 0.2],
-        vertical_spacing=0.05,
-        shared_xaxes=True
-    )
-    
-    # Add candlestick chart
-    fig.add_trace(
+    # Candlestick chart
+    traces = [
         go.Candlestick(
             x=window_df.index,
             open=window_df['open'],
             high=window_df['high'],
             low=window_df['low'],
             close=window_df['close'],
-            name='OHLC'
-        ),
-        row=1, col=1
-    )
+            name='OHLC',
+            **subplot_axes(1)
+        )
+    ]
     
-    # Add EMAs
+    # EMAs
     colors = {
         'ema_20': '#FF4500',
         'ema_50': '#9370DB',
@@ -103,33 +135,30 @@ def plot_data(market_df: pd.DataFrame, labels_df: pd.DataFrame, ticker: str, sta
     }
     
     for ema in ['ema_20', 'ema_50', 'ema_200']:
-        fig.add_trace(
+        traces.append(
             go.Scatter(
                 x=window_df.index,
                 y=window_df[ema],
                 name=ema.upper(),
-                line=dict(color=colors[ema], width=1)
-            ),
-            row=1, col=1
+                line=dict(color=colors[ema], width=1),
+                **subplot_axes(1)
+            )
         )
     
-    # Add volume
-    colors = ['red' if row['close'] < row['open'] else 'green' 
-             for _, row in window_df.iterrows()]
-    
-    fig.add_trace(
+    # Volume
+    traces.append(
         go.Bar(
             x=window_df.index,
             y=window_df['volume'],
             name='Volume',
-            marker_color=colors,
-            opacity=0.3
-        ),
-        row=2, col=1
+            marker_color=volume_colors(window_df),
+            opacity=0.3,
+            **subplot_axes(2)
+        )
     )
     
     # Add labels visualization: use end_date labels
-    if not labels_df.empty:
+    if not labels_df.empty and not window_df.empty:
         window_start_date = window_df.index[0]
         window_end_date = window_df.index[-1]
         
@@ -137,68 +166,109 @@ def plot_data(market_df: pd.DataFrame, labels_df: pd.DataFrame, ticker: str, sta
         window_labels = labels_df[
             (labels_df['end_date'] >= window_start_date) & 
             (labels_df['end_date'] <= window_end_date)
-        ].copy()
+        ]
         
-        label_colors = {
-            0: 'red',    # downtrend
-            1: 'gray',   # sideways
-            2: 'green'   # uptrend
-        }
-        
-        # Create points for each end_date
-        for _, row in window_labels.iterrows():
-            fig.add_trace(
-                go.Scatter(
-                    x=[row['end_date']],
-                    y=[row['label']],
-                    mode='markers',
-                    marker=dict(
-                        color=label_colors[row['label']],
-                        size=10
-                    ),
-                    showlegend=False  # Remove from legend
+        # One marker trace for every end_date in the window
+        traces.append(
+            go.Scatter(
+                x=window_labels['end_date'],
+                y=window_labels['label'],
+                mode='markers',
+                marker=dict(
+                    color=label_colors(window_labels['label']),
+                    size=10
                 ),
-                row=3, col=1
+                name='Labels',
+                showlegend=False,  # Remove from legend
+                **subplot_axes(3)
             )
+        )
     
-    # Update layout
-    fig.update_layout(
-        title=f'{ticker} Price, Volume, and Labels (Days {start_idx} to {start_idx + window_size})',
-        height=1000,
-        showlegend=True,
-        xaxis_rangeslider_visible=False
+    return figure_from_layout(
+        _plot_data_layout(),
+        traces,
+        title=f'{ticker} Price, Volume, and Labels (Days {day_offset + start_idx} to {day_offset + start_idx + window_size})'
     )
+
+def plot_overview(overview_df: pd.DataFrame, bands_df: pd.DataFrame, ticker: str):
+    """Create a plot of a ticker's downsampled full history with its label bands."""
+    traces = [
+        go.Candlestick(
+            x=overview_df.index,
+            open=overview_df['open'],
+            high=overview_df['high'],
+            low=overview_df['low'],
+            close=overview_df['close'],
+            name='OHLC',
+            **subplot_axes(1)
+        ),
+        go.Bar(
+            x=overview_df.index,
+            y=overview_df['volume'],
+            name='Volume',
+            marker_color=volume_colors(overview_df),
+            opacity=0.3,
+            **subplot_axes(2)
+        )
+    ]
     
-    # Update axes labels
-    fig.update_yaxes(title_text="Price", row=1, col=1)
-    fig.update_yaxes(title_text="Volume", row=2, col=1)
-    fig.update_yaxes(title_text="Labels", row=3, col=1)
-    
-    # Update grids
-    for i in range(1, 4):
-        fig.update_xaxes(showgrid=True, gridcolor='lightgrey', gridwidth=0.5, row=i, col=1)
-        fig.update_yaxes(showgrid=True, gridcolor='lightgrey', gridwidth=0.5, row=i, col=1)
+    colors = {
+        'ema_20': '#FF4500',
+        'ema_50': '#9370DB',
+        'ema_200': '#CD853F'
+    }
+    for ema in ['ema_20', 'ema_50', 'ema_200']:
+        traces.append(
+            go.Scatter(
+                x=overview_df.index,
+                y=overview_df[ema],
+                name=ema.upper(),
+                line=dict(color=colors[ema], width=1),
+                **subplot_axes(1)
+            )
+        )
     
-    # Set y-axis range and ticks for labels, only showing on right side
-    fig.update_yaxes(
-        range=[-0.5, 2.5], 
-        tickmode='array', 
-        tickvals=[0, 1, 2],
-        title_text='Labels',  
-        side='left',     # Move ticks to right side
-        showgrid=True,
-        row=3, col=1
+    # Dominant label of each bucket, one marker trace for the whole history
+    labelled = bands_df[bands_df['dominant'] >= 0]
+    traces.append(
+        go.Scatter(
+            x=labelled.index,
+            y=labelled['dominant'],
+            mode='markers',
+            marker=dict(color=label_colors(labelled['dominant']), size=6),
+            customdata=labelled[[0, 1, 2]].to_numpy(),
+            hovertemplate='%{x}<br>Down %{customdata[0]} / Side %{customdata[1]} / Up %{customdata[2]}<extra></extra>',
+            name='Labels',
+            showlegend=False,
+            **subplot_axes(3)
+        )
     )
     
-    return fig
+    days = int(overview_df['rows'].sum())
+    return figure_from_layout(
+        _plot_data_layout(),
+        traces,
+        title=f'{ticker} Overview ({days} days in {len(overview_df)} buckets)'
+    )
+
+def _open_window():
+    """Drill down from the overview into the windowed view at the selected bucket."""
+    st.session_state.window_start = st.session_state.overview_date
+    st.session_state.view_mode = "Window"
 
 def main():
     st.set_page_config(layout="wide")
     st.title("Stock Data Visualization with Labels")
 
-    # Initialize session state for current index if it doesn't exist
-    if 'current_idx' not in st.session_state:
-        st.session_state.current_idx = 0
+    # Initialize session state for the current page if it doesn't exist
+    if 'window_start' not in st.session_state:
+        st.session_state.window_start = None
+    if 'next_start' not in st.session_state:
+        st.session_state.next_start = None
+    if 'window_ticker' not in st.session_state:
+        st.session_state.window_ticker = None
+    if 'data_version' not in st.session_state:
+        st.session_state.data_version = 0
 
     # Sidebar for ticker input
     with st.sidebar:
@@ -209,73 +279,91 @@ def main():
         st.markdown("🟢 2 = Uptrend")
         
         window_size = st.slider("Window Size (days)", min_value=50, max_value=200, value=100)
+        view_mode = st.radio("View", ["Window", "Overview"], key="view_mode", horizontal=True)
 
-    load_dotenv()
+        # Labels are uploaded out-of-band, so cached pages are only dropped on request
+        if st.button("🔄 Reload data"):
+            load_market_window.clear()
+            load_previous_start.clear()
+            load_ticker_stats.clear()
+            load_overview.clear()
+            st.session_state.data_version += 1
 
-    db_config = {
-        'user': os.getenv("DB_USER"),
-        'password': os.getenv("DB_PASSWORD"),
-        'host': os.getenv("DB_HOST"),
-        'database': os.getenv("DB_NAME"),
-        'port': os.getenv("DB_PORT", "5432")
-    }
+    if ticker != st.session_state.window_ticker:
+        st.session_state.window_start = None
+        st.session_state.next_start = None
+        st.session_state.window_ticker = ticker
+        st.session_state.pop('overview_date', None)
 
     try:
-        db_context = create_db_session(
-            user=db_config['user'],
-            password=db_config['password'],
-            host=db_config['host'],
-            port=db_config['port'],
-            database=db_config['database']
-        )
+        total_rows, label_counts = load_ticker_stats(ticker, st.session_state.data_version)
         
-        with db_context() as session:
-            market_data, labels = get_data(session, ticker)
+        if total_rows and view_mode == "Overview":
+            overview_df, bands_df = load_overview(ticker, OVERVIEW_POINTS, st.session_state.data_version)
+            
+            fig = plot_overview(overview_df, bands_df, ticker)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Drill down into the windowed view
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.select_slider(
+                    "Open window at:",
+                    options=list(overview_df.index),
+                    format_func=lambda x: x.strftime('%Y-%m-%d'),
+                    key="overview_date"
+                )
+            with col2:
+                st.button("🔍 Open window", on_click=_open_window)
+        
+        elif total_rows:
+            # Navigation controls
+            col1, col2, col3, col4 = st.columns([1, 1, 2, 1])
+            
+            with col1:
+                if st.button("⏮️ Start"):
+                    st.session_state.window_start = None
+            
+            with col2:
+                if st.button("⬅️ Previous") and st.session_state.window_start is not None:
+                    st.session_state.window_start = load_previous_start(
+                        ticker, st.session_state.window_start, window_size, st.session_state.data_version
+                    )
             
-            if market_data:
-                market_df, labels_df = prepare_data(market_data, labels)
-                
-                # Navigation controls
-                col1, col2, col3, col4 = st.columns([1, 1, 2, 1])
-                
-                with col1:
-                    if st.button("⏮️ Start"):
-                        st.session_state.current_idx = 0
-                
-                with col2:
-                    if st.button("⬅️ Previous") and st.session_state.current_idx >= window_size:
-                        st.session_state.current_idx -= window_size
-                
-                with col3:
-                    st.write(f"Showing days {st.session_state.current_idx} to {st.session_state.current_idx + window_size}")
-                
-                with col4:
-                    if st.button("Next ➡️") and st.session_state.current_idx + window_size < len(market_df):
-                        st.session_state.current_idx += window_size
-                
-                # Display data statistics
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Total Market Data Points", len(market_data))
-                with col2:
-                    st.metric("Total Labels", len(labels))
+            with col4:
+                if st.button("Next ➡️") and st.session_state.next_start is not None:
+                    st.session_state.window_start = st.session_state.next_start
+            
+            market_df, labels_df, next_start, day_offset = load_market_window(
+                ticker, st.session_state.window_start, window_size, st.session_state.data_version
+            )
+            st.session_state.next_start = next_start
+            
+            with col3:
+                st.write(f"Showing days {day_offset} to {day_offset + window_size}")
+            
+            # Display data statistics
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Market Data Points", total_rows)
+            with col2:
+                st.metric("Total Labels", sum(label_counts.values()))
 
-                # Create and display plot
-                fig = plot_data(market_df, labels_df, ticker, st.session_state.current_idx, window_size)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Display label distribution if there are labels
-                if not labels_df.empty:
-                    st.subheader("Label Distribution")
-                    label_counts = labels_df['label'].value_counts().sort_index()
-                    label_names = {0: "Downtrend", 1: "Sideways", 2: "Uptrend"}
-                    cols = st.columns(3)
-                    for i, (label, count) in enumerate(label_counts.items()):
-                        with cols[i]:
-                            st.metric(label_names[label], count)
-                
-            else:
-                st.error(f"No data found for ticker {ticker}")
+            # Create and display plot
+            fig = plot_data(market_df, labels_df, ticker, 0, window_size, day_offset)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Display label distribution if there are labels
+            if label_counts:
+                st.subheader("Label Distribution")
+                label_names = {0: "Downtrend", 1: "Sideways", 2: "Uptrend"}
+                cols = st.columns(3)
+                for i, (label, count) in enumerate(label_counts.items()):
+                    with cols[i]:
+                        st.metric(label_names[label], count)
+            
+        else:
+            st.error(f"No data found for ticker {ticker}")
 
     except Exception as e:
         st.error(f"Error: {str(e)}")